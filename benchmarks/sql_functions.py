@@ -0,0 +1,104 @@
+"""
+Benchmark: sqtab SQL functions vs. export + Python.
+
+Fills a temporary database with random measurements and computes a
+median, 90th percentile, standard deviation, mode, distinct count and
+regex match count two ways: in SQL with sqtab's functions, and by
+exporting the table to CSV and computing the same in Python. Both sides
+are checked to agree.
+
+Usage:
+    python benchmarks/sql_functions.py [ROWS]
+"""
+
+import csv
+import random
+import re
+import statistics
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+from time import perf_counter
+
+import sqtab.db
+from sqtab.exporter import export_csv
+
+SQL = {
+    "median": "SELECT median(value) FROM bench",
+    "p90": "SELECT percentile(value, 90) FROM bench",
+    "stddev": "SELECT stddev(value) FROM bench",
+    "mode": "SELECT mode(sensor) FROM bench",
+    "distinct": "SELECT approx_count_distinct(sensor) FROM bench",
+    "regexp": "SELECT COUNT(*) FROM bench WHERE sensor REGEXP '^s-1[0-9]{2}$'",
+}
+
+
+def fill(conn, rows: int) -> None:
+    rng = random.Random(42)
+    conn.execute("CREATE TABLE bench (id INTEGER, sensor TEXT, value REAL)")
+    conn.executemany(
+        "INSERT INTO bench VALUES (?, ?, ?)",
+        ((i, f"s-{rng.randrange(5000)}", rng.gauss(20, 5)) for i in range(rows)),
+    )
+    conn.commit()
+
+
+def in_sql(conn) -> dict:
+    return {name: conn.execute(sql).fetchone()[0] for name, sql in SQL.items()}
+
+
+def in_python(csv_path: Path) -> dict:
+    export_csv("bench", csv_path)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        values, sensors = [], []
+        for row in reader:
+            values.append(float(row["value"]))
+            sensors.append(row["sensor"])
+
+    pattern = re.compile(r"^s-1[0-9]{2}$")
+    quantiles = statistics.quantiles(values, n=10, method="inclusive")
+    return {
+        "median": statistics.median(values),
+        "p90": quantiles[8],
+        "stddev": statistics.stdev(values),
+        "mode": Counter(sensors).most_common(1)[0][0],
+        "distinct": len(set(sensors)),
+        "regexp": sum(1 for s in sensors if pattern.search(s)),
+    }
+
+
+def timed(fn, *args):
+    t = perf_counter()
+    result = fn(*args)
+    return result, perf_counter() - t
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        sqtab.db.DB_PATH = tmp / "bench.db"
+        conn = sqtab.db.get_conn()
+        fill(conn, rows)
+
+        sql_result, sql_seconds = timed(in_sql, conn)
+        conn.close()
+        py_result, py_seconds = timed(in_python, tmp / "bench.csv")
+
+    print(f"{rows:,} rows")
+    print(f"{'result':<10}{'SQL':>16}{'export + Python':>18}")
+    for name in SQL:
+        a, b = sql_result[name], py_result[name]
+        if isinstance(a, float):
+            assert abs(a - b) < 1e-6 * max(1, abs(b)), (name, a, b)
+        elif name != "distinct":
+            assert a == b, (name, a, b)
+        print(f"{name:<10}{a!s:>16.12}{b!s:>18.12}")
+    print(f"{'seconds':<10}{sql_seconds:>16.2f}{py_seconds:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: default vs typed (--typed) CSV storage.
+
+Generates a CSV file with an id, a boolean flag, a date, a timestamp and an
+amount, imports it once with default inference and once in typed mode into
+two temporary databases, and compares database size and the time of a date
+range query.
+
+Usage:
+    python benchmarks/typed_storage.py [ROWS]
+"""
+
+import csv
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+
+import sqtab.db
+from sqtab.importer import import_file
+
+QUERIES = {
+    False: "SELECT COUNT(*), SUM(amount) FROM bench WHERE day BETWEEN '2024-03-01' AND '2024-03-31'",
+    True: "SELECT COUNT(*), SUM(amount) FROM bench "
+          "WHERE day BETWEEN CAST(strftime('%s', '2024-03-01') AS INTEGER) "
+          "AND CAST(strftime('%s', '2024-03-31') AS INTEGER)",
+}
+
+
+def write_csv(path: Path, rows: int) -> None:
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "active", "day", "created_at", "amount"])
+        for i in range(rows):
+            moment = start + timedelta(seconds=rng.randrange(365 * 86400))
+            writer.writerow([
+                i,
+                rng.choice(("true", "false")),
+                date.fromordinal(moment.toordinal()).isoformat(),
+                moment.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                round(rng.uniform(1, 1000), 2),
+            ])
+
+
+def run(csv_path: Path, db_path: Path, typed: bool) -> dict:
+    sqtab.db.DB_PATH = db_path
+
+    t = perf_counter()
+    import_file(csv_path, "bench", typed=typed)
+    import_seconds = perf_counter() - t
+
+    conn = sqtab.db.get_conn()
+    conn.execute("VACUUM")
+    best = float("inf")
+    for _ in range(5):
+        t = perf_counter()
+        conn.execute(QUERIES[typed]).fetchone()
+        best = min(best, perf_counter() - t)
+    conn.close()
+
+    return {"import_s": import_seconds, "query_ms": best * 1000, "size_mb": db_path.stat().st_size / 2**20}
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        csv_path = tmp / "bench.csv"
+        write_csv(csv_path, rows)
+
+        results = {mode: run(csv_path, tmp / f"{mode}.db", mode == "typed") for mode in ("default", "typed")}
+
+    print(f"{rows:,} rows")
+    print(f"{'mode':<10}{'size MB':>10}{'import s':>10}{'range query ms':>16}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['size_mb']:>10.2f}{r['import_s']:>10.2f}{r['query_ms']:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
 """
 sqtab package initializer.
 """
+
+from sqtab.session import Session
+
+__all__ = ["Session"]
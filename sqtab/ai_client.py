@@ -0,0 +1,117 @@
+"""
+Shared AI transport for sqtab.
+
+``sql-ai`` and ``analyze --ai`` send their requests through ``chat()``:
+
+- one OpenAI client per process, so its HTTP connection pool is reused
+  across requests;
+- a per-request timeout (SQTAB_AI_TIMEOUT);
+- retries with exponential backoff and jitter on 429, 5xx, timeouts and
+  connection errors (SQTAB_AI_MAX_RETRIES), honouring ``Retry-After``;
+- any OpenAI-compatible endpoint via SQTAB_AI_BASE_URL, e.g. a local
+  server or a stub in tests.
+
+Latency, attempts and token usage of every request are logged at debug
+level and printed to stderr when SQTA_DEBUG is on.
+"""
+
+import random
+import sys
+import time
+from typing import List, Optional
+
+import openai
+from openai import OpenAI
+
+from sqtab.config import get_ai_model, get_ai_settings, get_debug, require_api_key
+from sqtab.logger import log
+
+# First backoff delay in seconds; doubled after every failed attempt.
+BACKOFF_BASE = 0.5
+
+# Upper bound for a single backoff delay, in seconds.
+BACKOFF_MAX = 20.0
+
+_client: Optional[OpenAI] = None
+_client_key: Optional[tuple] = None
+
+
+def get_client() -> OpenAI:
+    """Return the process-wide client, rebuilt only when the settings change."""
+    global _client, _client_key
+
+    settings = get_ai_settings()
+    key = (require_api_key(), settings["base_url"], settings["timeout"])
+    if _client is None or key != _client_key:
+        # Retries are done by chat() so they can be logged and tuned.
+        _client = OpenAI(api_key=key[0], base_url=key[1], timeout=key[2], max_retries=0)
+        _client_key = key
+    return _client
+
+
+def chat(messages: List[dict], model: Optional[str] = None) -> str:
+    """
+    Send a chat completion request and return the reply text.
+
+    Raises RuntimeError when the request fails for good (after retries, or
+    at once for errors that retrying cannot fix).
+    """
+    client = get_client()
+    model = model or get_ai_model()
+    max_retries = get_ai_settings()["max_retries"]
+
+    start = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            response = client.chat.completions.create(model=model, messages=messages)
+            break
+        except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as exc:
+            if attempt > max_retries:
+                raise RuntimeError(f"AI request failed after {attempt} attempts: {exc}") from exc
+            delay = _retry_delay(exc, attempt)
+            _debug(f"AI request attempt {attempt} failed ({_describe(exc)}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+        except openai.APIError as exc:
+            raise RuntimeError(f"AI request failed: {exc}") from exc
+
+    seconds = time.perf_counter() - start
+    usage = getattr(response, "usage", None)
+    metrics = {
+        "model": model,
+        "seconds": round(seconds, 3),
+        "attempts": attempt,
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    }
+    log("AI request", level="debug", **metrics)
+    _debug(
+        f"AI request: {seconds:.2f}s, {attempt} attempt(s), "
+        f"prompt tokens {metrics['prompt_tokens']}, completion tokens {metrics['completion_tokens']}"
+    )
+
+    return (response.choices[0].message.content or "").strip()
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Seconds to wait before the next attempt."""
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass  # an HTTP date; fall back to backoff
+    delay = min(BACKOFF_BASE * 2 ** (attempt - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _describe(exc: Exception) -> str:
+    status = getattr(exc, "status_code", None)
+    return f"HTTP {status}" if status else type(exc).__name__
+
+
+def _debug(message: str) -> None:
+    if get_debug():
+        print(f"[sqtab] {message}", file=sys.stderr)
@@ -0,0 +1,182 @@
+"""
+Few-shot memory for sql-ai.
+
+Every question whose generated SQL ran successfully is stored with that
+SQL in an internal table, together with the tables it reads and a
+fingerprint of their schema. For a new question:
+
+- a near-exact match (same words, ignoring case, punctuation and filler
+  words) whose tables are unchanged is answered from memory, without an
+  API call;
+- otherwise the most similar stored questions are passed to the model as
+  examples. Similarity is the cosine of TF-IDF vectors over words and
+  word pairs, computed over the stored questions.
+
+Only entries whose tables still exist are used.
+"""
+
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import Counter
+from typing import List, Optional
+
+from sqtab.db import INTERNAL_PREFIX, get_conn, list_tables
+
+MEMORY_TABLE = f"{INTERNAL_PREFIX}ai_memory"
+
+# Entries kept; the least recently used ones are removed beyond this.
+MEMORY_MAX_ENTRIES = 500
+
+# Minimum similarity for a stored question to be used as an example.
+MIN_SIMILARITY = 0.2
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+# Words that do not change what a question asks for.
+_FILLER = {"a", "an", "the", "please", "me", "can", "you"}
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase words without punctuation and filler words."""
+    return " ".join(w for w in _WORD.findall(question.lower()) if w not in _FILLER)
+
+
+def remember(question: str, sql: str) -> None:
+    """Store a question with the SQL that answered it (replacing an older answer)."""
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+        tables = _referenced_tables(conn, sql)
+        now = time.time()
+        conn.execute(
+            f"""
+            INSERT INTO "{MEMORY_TABLE}" (normalized, question, sql, tables, schema_hash, uses, last_used)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT (normalized) DO UPDATE SET
+                question = excluded.question, sql = excluded.sql, tables = excluded.tables,
+                schema_hash = excluded.schema_hash, last_used = excluded.last_used
+            """,
+            (normalize_question(question), question, sql, json.dumps(tables),
+             _schema_hash(conn, tables), now),
+        )
+        conn.execute(
+            f'DELETE FROM "{MEMORY_TABLE}" WHERE id NOT IN '
+            f'(SELECT id FROM "{MEMORY_TABLE}" ORDER BY last_used DESC LIMIT ?)',
+            (MEMORY_MAX_ENTRIES,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def recall(question: str) -> Optional[str]:
+    """Return stored SQL for a near-exact question if its tables are unchanged."""
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+        row = conn.execute(
+            f'SELECT id, sql, tables, schema_hash FROM "{MEMORY_TABLE}" WHERE normalized = ?',
+            (normalize_question(question),),
+        ).fetchone()
+        if row is None or _schema_hash(conn, json.loads(row[2])) != row[3]:
+            return None
+        conn.execute(
+            f'UPDATE "{MEMORY_TABLE}" SET uses = uses + 1, last_used = ? WHERE id = ?',
+            (time.time(), row[0]),
+        )
+        conn.commit()
+        return row[1]
+    finally:
+        conn.close()
+
+
+def similar_examples(question: str, limit: int = 3) -> List[dict]:
+    """
+    Return up to ``limit`` stored ``{"question", "sql", "score"}`` entries
+    most similar to ``question``, best first.
+    """
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+        existing = set(list_tables(conn))
+        entries = [
+            {"question": q, "sql": sql}
+            for q, sql, tables in conn.execute(f'SELECT question, sql, tables FROM "{MEMORY_TABLE}"')
+            if set(json.loads(tables)) <= existing
+        ]
+    finally:
+        conn.close()
+    if not entries:
+        return []
+
+    docs = [Counter(_terms(e["question"])) for e in entries]
+    query = Counter(_terms(question))
+    df = Counter(term for doc in docs + [query] for term in doc)
+    n = len(docs) + 1
+    idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+
+    query_vec = _tfidf(query, idf)
+    for entry, doc in zip(entries, docs):
+        entry["score"] = _cosine(query_vec, _tfidf(doc, idf))
+
+    ranked = sorted(entries, key=lambda e: e["score"], reverse=True)
+    return [e for e in ranked[:limit] if e["score"] >= MIN_SIMILARITY]
+
+
+def clear_memory() -> None:
+    """Forget all stored questions."""
+    conn = get_conn()
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS "{MEMORY_TABLE}"')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _terms(text: str) -> List[str]:
+    words = [w for w in _WORD.findall(text.lower()) if w not in _FILLER]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _tfidf(counts: Counter, idf: dict) -> dict:
+    return {term: count * idf[term] for term, count in counts.items()}
+
+
+def _cosine(a: dict, b: dict) -> float:
+    dot = sum(weight * b.get(term, 0.0) for term, weight in a.items())
+    norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def _referenced_tables(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """User tables whose names appear as words in ``sql``."""
+    words = set(re.findall(r"[a-z0-9_]+", sql.lower()))
+    return [t for t in list_tables(conn) if t.lower() in words]
+
+
+def _schema_hash(conn: sqlite3.Connection, tables: List[str]) -> str:
+    """Fingerprint of the columns of ``tables``; missing tables change it."""
+    digest = hashlib.sha256()
+    for table in sorted(tables):
+        info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        digest.update(json.dumps([table, info]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _ensure_table(conn: sqlite3.Connection) -> None:
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{MEMORY_TABLE}" (
+            id INTEGER PRIMARY KEY,
+            normalized TEXT NOT NULL UNIQUE,
+            question TEXT NOT NULL,
+            sql TEXT NOT NULL,
+            tables TEXT NOT NULL,
+            schema_hash TEXT NOT NULL,
+            uses INTEGER NOT NULL DEFAULT 0,
+            last_used REAL NOT NULL
+        )
+    ''')
@@ -2,9 +2,12 @@ import os
 import json
 import re
 from textwrap import dedent
-from openai import OpenAI
+from typing import List, Optional
 from pygments.lexers import sql
-from sqtab.db import get_conn
+from sqtab.db import get_conn, list_tables
+from sqtab.ai_client import chat
+from sqtab.functions import FUNCTION_DOCS
+from sqtab.json_index import json_indexes
 from sqtab.config import require_api_key, get_ai_model, get_debug
 
 
@@ -13,28 +16,38 @@ def _get_schema() -> dict:
     conn = get_conn()
     cur = conn.cursor()
 
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [row[0] for row in cur.fetchall()]
+    tables = list_tables(conn)
 
     schema = {}
 
     for table in tables:
-        cur.execute(f"PRAGMA table_info('{table}')")
-        cols = cur.fetchall()
+        # table_xinfo includes generated columns; hidden = 1 marks hidden
+        # columns of virtual tables.
+        cur.execute(f"PRAGMA table_xinfo('{table}')")
+        cols = [c for c in cur.fetchall() if c[6] != 1]
+        indexed = {entry["column"]: entry for entry in json_indexes(table, conn)}
         schema[table] = [
             {"name": c[1], "type": c[2], "not_null": bool(c[3]), "pk": bool(c[5])}
             for c in cols
         ]
+        for entry in schema[table]:
+            if entry["name"] in indexed:
+                json_field = indexed[entry["name"]]
+                entry["indexed_json_path"] = f"{json_field['source']} {json_field['path']}"
 
     conn.close()
     return schema
 
 
-def generate_sql_from_nl(question: str) -> str:
-    """Convert natural-language question into a valid SQLite SQL query."""
-    api_key = require_api_key()
+def generate_sql_from_nl(question: str, examples: Optional[List[dict]] = None) -> str:
+    """
+    Convert natural-language question into a valid SQLite SQL query.
+
+    ``examples`` are earlier ``{"question", "sql"}`` pairs (see
+    sqtab.ai_memory) shown to the model as few-shot context.
+    """
+    require_api_key()
 
-    client = OpenAI(api_key=api_key)
     schema = _get_schema()
     model = get_ai_model()
 
@@ -53,10 +66,13 @@ def generate_sql_from_nl(question: str) -> str:
     - Do not invent tables or columns.
     - Use simple SQLite syntax that works everywhere.
     - If ambiguous, choose the most reasonable interpretation.
+    - Besides SQLite's built-in functions you may use: {"; ".join(FUNCTION_DOCS)}.
+    - Columns with "indexed_json_path" hold that JSON field of another column and are
+      indexed; filter on them instead of calling json_extract on the source column.
 
     SCHEMA:
     {json.dumps(schema, indent=2)}
-
+    {_examples_block(examples)}
     USER QUESTION:
     "{question}"
 
@@ -65,16 +81,23 @@ def generate_sql_from_nl(question: str) -> str:
 
     print(f"[sqtab] Using AI model: {model}")
 
-    res = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    sql = res.choices[0].message.content.strip()
+    sql = chat([{"role": "user", "content": prompt}], model=model)
 
     return clean_sql(sql)
 
 
+def _examples_block(examples: Optional[List[dict]]) -> str:
+    """Render few-shot examples for the prompt ('' when there are none)."""
+    if not examples:
+        return ""
+    lines = ["", "EXAMPLES (questions answered correctly before on this database):"]
+    for example in examples:
+        sql = " ".join(example["sql"].split())
+        lines.append(f"Q: {example['question']}")
+        lines.append(f"SQL: {sql}")
+    return "\n    ".join(lines) + "\n"
+
+
 def clean_sql(sql: str) -> str:
     """
     Extract pure SQL from model output.
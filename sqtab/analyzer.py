@@ -7,10 +7,29 @@ about the dataset.
 
 This is the initial skeleton; full implementation will follow.
 """
+import sqlite3
+import sys
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 from sqtab.db import get_conn
-from openai import OpenAI
+from sqtab.ai_client import chat
+
+# Default size limit for the analysis prompt, in estimated tokens.
+DEFAULT_TOKEN_BUDGET = 3_000
+
+# Column statistics are computed over at most this many rows.
+STATS_SAMPLE_ROWS = 100_000
+
+# Rows compared to find columns that duplicate another column.
+DUPLICATE_CHECK_ROWS = 1_000
+
+# Sample rows and cell width tried in turn until the prompt fits the budget.
+_COMPRESSION_LEVELS = (
+    {"sample_rows": 5, "max_cell": 80, "top_values": True},
+    {"sample_rows": 3, "max_cell": 40, "top_values": True},
+    {"sample_rows": 0, "max_cell": 40, "top_values": True},
+    {"sample_rows": 0, "max_cell": 24, "top_values": False},
+)
 
 SYSTEM_PROMPT = """
 You are an expert data analyst. 
@@ -24,6 +43,8 @@ from .prompt_utils import (
     load_prompt_template,
     schema_to_markdown,
     samples_to_markdown,
+    stats_to_markdown,
+    estimate_tokens,
     validate_list,
 )
 from sqtab.config import require_api_key, get_ai_model, get_debug, is_ai_available
@@ -81,50 +102,200 @@ def analyze_table(table: str) -> dict:
     }
 
 
-def run_ai_analysis(table: str, info: dict, tasks: List[str], rules: List[str]) -> str:
+def column_stats(
+    table: str,
+    schema: List[dict],
+    limit: int = STATS_SAMPLE_ROWS,
+    conn: Optional[sqlite3.Connection] = None,
+) -> dict:
+    """
+    Summarize every column of ``table`` over its first ``limit`` rows.
+
+    Returns ``{"rows", "columns", "constant", "duplicates"}``: per column
+    the non-null and distinct counts, min, max, average text length, median
+    and standard deviation of numeric columns (see sqtab.functions) and the
+    most frequent values of repetitive columns; columns holding a single
+    value (``{name: value}``); and columns equal to an earlier column in
+    the first DUPLICATE_CHECK_ROWS rows (``{name: earlier name}``).
+    Uses ``conn`` if given, otherwise its own connection.
+    """
+    names = [c["name"] for c in schema]
+    own_conn = conn is None
+    conn = conn or get_conn()
+    try:
+        sample = f'(SELECT * FROM "{table}" LIMIT {int(limit)})'
+        rows = conn.execute(f"SELECT COUNT(*) FROM {sample}").fetchone()[0]
+
+        columns = []
+        # Six aggregates per column; stay well below SQLite's column limit.
+        for start in range(0, len(names), 100):
+            chunk = names[start:start + 100]
+            exprs = ", ".join(
+                f'COUNT("{n}"), COUNT(DISTINCT "{n}"), MIN("{n}"), MAX("{n}"), '
+                f'AVG(CASE WHEN typeof("{n}") = \'text\' THEN LENGTH("{n}") END), '
+                f'stddev(CASE WHEN typeof("{n}") IN (\'integer\', \'real\') THEN "{n}" END)'
+                for n in chunk
+            )
+            values = conn.execute(f"SELECT {exprs} FROM {sample}").fetchone()
+            for i, name in enumerate(chunk):
+                non_null, distinct, low, high, avg_len, stddev = values[i * 6:i * 6 + 6]
+                columns.append({
+                    "name": name, "non_null": non_null, "distinct": distinct,
+                    "min": low, "max": high, "avg_len": avg_len,
+                    "median": None, "stddev": stddev, "top": [],
+                })
+
+        for col in columns:
+            # Text sorts after numbers, so a numeric maximum means a numeric column.
+            if isinstance(col["max"], (int, float)) and col["distinct"] > 2:
+                col["median"] = conn.execute(
+                    f'SELECT median("{col["name"]}") FROM {sample}'
+                ).fetchone()[0]
+
+        for col in columns:
+            if 1 < col["distinct"] and col["distinct"] * 2 <= col["non_null"]:
+                col["top"] = conn.execute(
+                    f'SELECT "{col["name"]}", COUNT(*) AS n FROM {sample} '
+                    f'WHERE "{col["name"]}" IS NOT NULL GROUP BY 1 ORDER BY n DESC LIMIT 3'
+                ).fetchall()
+
+        head = conn.execute(f'SELECT * FROM "{table}" LIMIT {DUPLICATE_CHECK_ROWS}').fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    constant = {
+        c["name"]: c["min"] for c in columns
+        if rows and c["distinct"] <= 1 and c["non_null"] in (0, rows)
+    }
+    duplicates = {}
+    first_seen = {}
+    for i, name in enumerate(names):
+        if name in constant:
+            continue
+        values = tuple(row[i] for row in head)
+        if values in first_seen:
+            duplicates[name] = first_seen[values]
+        else:
+            first_seen[values] = name
+
+    return {"rows": rows, "columns": columns, "constant": constant, "duplicates": duplicates}
+
+
+def build_analysis_prompt(
+    table: str,
+    info: dict,
+    stats: dict,
+    tasks: List[str],
+    rules: List[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+) -> Tuple[str, dict]:
+    """
+    Render the analysis prompt within ``token_budget`` estimated tokens.
+
+    Constant and duplicate columns are listed once instead of being shown
+    with statistics and samples. Sample rows and cell widths are then
+    reduced step by step (see _COMPRESSION_LEVELS); if the prompt is still
+    too large, statistics rows are left out from the last column backwards.
+
+    Returns ``(prompt, report)`` where ``report`` holds the estimated
+    ``tokens``, the ``budget``, the ``sample_rows`` and ``max_cell`` used,
+    the ``dropped`` redundant columns and columns whose statistics were
+    ``omitted``.
+    """
+    template = load_prompt_template(Path(__file__).parent / "prompts" / "default.md")
+    dropped = {**stats["constant"], **stats["duplicates"]}
+    kept = [c for c in info["schema"] if c["name"] not in dropped]
+    kept_names = [c["name"] for c in kept]
+    kept_stats = [c for c in stats["columns"] if c["name"] not in dropped]
+
+    notes = []
+    if stats["constant"]:
+        notes.append("Constant columns (same value in every row): " + ", ".join(
+            f"{name} = {value!r}" for name, value in stats["constant"].items()
+        ))
+    if stats["duplicates"]:
+        notes.append("Duplicate columns: " + ", ".join(
+            f"{name} = {same}" for name, same in stats["duplicates"].items()
+        ))
+    schema_md = "\n\n".join([schema_to_markdown(kept), *notes])
+
+    def render(level: dict, stat_rows: List[dict]) -> str:
+        stats_md = stats_to_markdown(stat_rows, level["max_cell"], level["top_values"])
+        omitted = len(kept_stats) - len(stat_rows)
+        if omitted:
+            stats_md += f"\n\n({omitted} more columns without statistics)"
+        if stats["rows"] < info["row_count"]:
+            stats_md += f"\n\n(statistics over the first {stats['rows']} of {info['row_count']} rows)"
+        return template.substitute(
+            table=table,
+            schema=schema_md,
+            stats=stats_md,
+            samples=samples_to_markdown(info["samples"], kept_names, level["sample_rows"], level["max_cell"]),
+            tasks="\n".join(f"- {t}" for t in tasks),
+            rules="\n".join(f"- {r}" for r in rules),
+        )
+
+    for level in _COMPRESSION_LEVELS:
+        prompt = render(level, kept_stats)
+        if estimate_tokens(prompt) <= token_budget:
+            break
+
+    stat_rows = kept_stats
+    while estimate_tokens(prompt) > token_budget and stat_rows:
+        stat_rows = stat_rows[:len(stat_rows) * 3 // 4]
+        prompt = render(level, stat_rows)
+
+    report = {
+        "tokens": estimate_tokens(prompt),
+        "budget": token_budget,
+        "sample_rows": level["sample_rows"],
+        "max_cell": level["max_cell"],
+        "dropped": list(dropped),
+        "omitted": [c["name"] for c in kept_stats[len(stat_rows):]],
+    }
+    return prompt, report
+
+
+def run_ai_analysis(
+    table: str,
+    info: dict,
+    tasks: List[str],
+    rules: List[str],
+    token_budget: Optional[int] = None,
+) -> str:
     """
     Perform AI analysis using prompt templates, markdown formatting,
     and validated tasks/rules.
+
+    The prompt summarizes columns with statistics and is kept within
+    ``token_budget`` estimated tokens (see build_analysis_prompt).
     """
-    api_key = require_api_key()
-    client = OpenAI(api_key=api_key)
+    require_api_key()
     model = get_ai_model()
 
     # Debug output
     if get_debug():
-        import sys
         print(f"[sqtab] Using AI model: {model}", file=sys.stderr)
 
     # Validate inputs
     tasks = validate_list("Tasks", tasks)
     rules = validate_list("Rules", rules)
 
-    # Load prompt template
-    template_path = Path(__file__).parent / "prompts" / "default.md"
-    template = load_prompt_template(template_path)
-
-    # Prepare variables
-    schema_md = schema_to_markdown(info["schema"])
-    samples_md = samples_to_markdown(info["samples"])
-
-    context = {
-        "table": table,
-        "schema": schema_md,
-        "samples": samples_md,
-        "tasks": "\n".join(f"- {t}" for t in tasks),
-        "rules": "\n".join(f"- {r}" for r in rules),
-    }
-
-    # Fill template
-    user_prompt = template.substitute(**context)
+    stats = column_stats(table, info["schema"])
+    user_prompt, report = build_analysis_prompt(
+        table, info, stats, tasks, rules, token_budget or DEFAULT_TOKEN_BUDGET
+    )
     print(f"[sqtab] Using AI model: {model}")
+    # On stderr, so the report does not mix with the analysis on stdout.
+    print(f"[sqtab] Prompt: ~{report['tokens']} tokens (budget {report['budget']})", file=sys.stderr)
+    if report["dropped"]:
+        print(f"[sqtab] Summarized redundant columns: {', '.join(report['dropped'])}", file=sys.stderr)
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return chat(
+        [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
-        ]
+        ],
+        model=model,
     )
-
-    return response.choices[0].message.content.strip()
@@ -0,0 +1,192 @@
+"""
+Query result cache for sqtab.
+
+Results of read-only statements are stored compressed in a separate SQLite
+file next to the database (``sqtab.cache.db`` for ``sqtab.db``), keyed by
+the normalized SQL text and its parameters.
+
+Each entry remembers the database version it was computed from: the file
+change counter in the database header (bumped on every committed write),
+``PRAGMA schema_version``, and the size/mtime of a WAL file if one exists.
+``PRAGMA data_version`` cannot be used for this because its value is only
+meaningful within a single connection, while CLI invocations each open a
+new one. When the version differs, the entry is recomputed. The cache is
+capped in size and evicts least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from sqtab.config import get_cache_max_bytes
+from sqtab.db import DB_PATH
+from sqtab.guard import fetch_rows
+
+_READ_ONLY_START = re.compile(r"^\s*(select|with|values)\b", re.IGNORECASE)
+
+# Functions whose result changes between runs; queries using them are not cached.
+_VOLATILE = re.compile(
+    r"\b(random|randomblob|changes|total_changes|last_insert_rowid)\s*\(|"
+    r"\bcurrent_(date|time|timestamp)\b|'now'",
+    re.IGNORECASE,
+)
+
+# String literals and quoted identifiers, which must be kept verbatim.
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+
+
+def cache_path() -> Path:
+    """Return the cache file used for the current database."""
+    return DB_PATH.with_name(DB_PATH.stem + ".cache.db")
+
+
+def is_cacheable(sql: str) -> bool:
+    """True for SELECT/WITH/VALUES statements without volatile functions."""
+    return bool(_READ_ONLY_START.match(sql)) and not _VOLATILE.search(sql)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside quotes and drop trailing semicolons."""
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i])
+    return "".join(parts).strip()
+
+
+def cached_query(
+    conn: sqlite3.Connection, sql: str, params: Sequence = (), max_rows: Optional[int] = None
+) -> Tuple[List[str], list, bool, bool]:
+    """
+    Run a query through the result cache.
+
+    Returns ``(columns, rows, hit, truncated)``. At most ``max_rows`` rows
+    are fetched (see guard.fetch_rows); a result cut off there is returned
+    but not stored. Statements that are not cacheable are executed normally
+    and reported as a miss. Cached statements run with ``PRAGMA query_only``
+    so they cannot modify the database.
+    """
+    db_file = _database_file(conn)
+    if db_file is None or not is_cacheable(sql):
+        cur = conn.execute(sql, params)
+        rows, truncated = fetch_rows(cur, max_rows)
+        return _columns(cur), rows, False, truncated
+
+    key = hashlib.sha256(
+        json.dumps([normalize_sql(sql), list(params)], default=str).encode("utf-8")
+    ).hexdigest()
+    # Taken before running the query, so a concurrent write can only make
+    # the stored entry look older than it is, never newer.
+    version = _database_version(conn, db_file)
+
+    store = _open_store()
+    try:
+        row = store.execute(
+            "SELECT version, columns, payload FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row and row[0] == version:
+            store.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            store.commit()
+            rows = [tuple(r) for r in json.loads(zlib.decompress(row[2]))]
+            truncated = bool(max_rows) and len(rows) > max_rows
+            return json.loads(row[1]), rows[:max_rows] if truncated else rows, True, truncated
+
+        conn.execute("PRAGMA query_only = ON")
+        try:
+            cur = conn.execute(sql, params)
+            columns = _columns(cur)
+            rows, truncated = fetch_rows(cur, max_rows)
+        finally:
+            conn.execute("PRAGMA query_only = OFF")
+
+        if not truncated:
+            _store(store, key, version, columns, rows)
+        return columns, rows, False, truncated
+    finally:
+        store.close()
+
+
+def clear_cache() -> None:
+    """Delete the cache file of the current database."""
+    path = cache_path()
+    if path.exists():
+        path.unlink()
+
+
+def _store(store: sqlite3.Connection, key: str, version: str, columns: List[str], rows: list) -> None:
+    try:
+        payload = zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+    except TypeError:
+        return  # BLOB values are not cached
+
+    max_bytes = get_cache_max_bytes()
+    if len(payload) > max_bytes:
+        return
+
+    store.execute(
+        "INSERT OR REPLACE INTO entries (key, version, columns, payload, size, last_used) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (key, version, json.dumps(columns), payload, len(payload), time.time()),
+    )
+
+    # Evict least recently used entries above the size cap.
+    total = store.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total > max_bytes:
+        evict = []
+        for old_key, size in store.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if total <= max_bytes:
+                break
+            evict.append((old_key,))
+            total -= size
+        store.executemany("DELETE FROM entries WHERE key = ?", evict)
+
+    store.commit()
+
+
+def _open_store() -> sqlite3.Connection:
+    store = sqlite3.connect(cache_path())
+    store.execute('''
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            columns TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        )
+    ''')
+    return store
+
+
+def _database_file(conn: sqlite3.Connection) -> Optional[str]:
+    """Return the file behind the main database, or None for in-memory ones."""
+    for _, name, file in conn.execute("PRAGMA database_list"):
+        if name == "main":
+            return file or None
+    return None
+
+
+def _database_version(conn: sqlite3.Connection, db_file: str) -> str:
+    """Return a string that changes whenever the database content changes."""
+    schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+
+    with open(db_file, "rb") as f:
+        header = f.read(100)
+    change_counter = int.from_bytes(header[24:28], "big")
+
+    wal = Path(db_file + "-wal")
+    wal_state = ""
+    if wal.exists():
+        st = wal.stat()
+        wal_state = f"{st.st_size}:{st.st_mtime_ns}"
+
+    return f"{os.stat(db_file).st_ino}:{change_counter}:{schema_version}:{wal_state}"
+
+
+def _columns(cur: sqlite3.Cursor) -> List[str]:
+    return [col[0] for col in cur.description] if cur.description else []
@@ -0,0 +1,95 @@
+"""
+Import checkpoints for sqtab.
+
+Large imports are committed in chunks. After each chunk a checkpoint is
+written in the same transaction, recording which file is being loaded and
+how far the load got, so an interrupted import can be resumed.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from sqtab.db import INTERNAL_PREFIX
+
+CHECKPOINT_TABLE = f"{INTERNAL_PREFIX}import_checkpoints"
+
+
+def file_identity(path: str) -> dict:
+    """Return the values that identify one version of an input file."""
+    st = os.stat(path)
+    return {
+        "path": str(Path(path).resolve()),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def _ensure_table(cur: sqlite3.Cursor) -> None:
+    cur.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{CHECKPOINT_TABLE}" (
+            table_name TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            row_number INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''')
+
+
+def load_checkpoint(cur: sqlite3.Cursor, table: str) -> Optional[dict]:
+    """Return the unfinished import checkpoint for ``table``, if any."""
+    _ensure_table(cur)
+    cur.execute(
+        f'SELECT path, size, mtime_ns, offset, row_number FROM "{CHECKPOINT_TABLE}" '
+        "WHERE table_name = ?",
+        (table,),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+
+    path, size, mtime_ns, offset, row_number = row
+    return {
+        "path": path,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "offset": offset,
+        "row_number": row_number,
+    }
+
+
+def save_checkpoint(
+    cur: sqlite3.Cursor, table: str, identity: dict, offset: int, row_number: int
+) -> None:
+    """
+    Record progress for ``table``.
+
+    Call this before committing the chunk it describes, so data and
+    checkpoint become durable together.
+    """
+    _ensure_table(cur)
+    cur.execute(
+        f'INSERT OR REPLACE INTO "{CHECKPOINT_TABLE}" '
+        "(table_name, path, size, mtime_ns, offset, row_number, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            table,
+            identity["path"],
+            identity["size"],
+            identity["mtime_ns"],
+            offset,
+            row_number,
+            datetime.now().isoformat(timespec="seconds"),
+        ),
+    )
+
+
+def clear_checkpoint(cur: sqlite3.Cursor, table: str) -> None:
+    """Remove the checkpoint of a finished import."""
+    _ensure_table(cur)
+    cur.execute(f'DELETE FROM "{CHECKPOINT_TABLE}" WHERE table_name = ?', (table,))
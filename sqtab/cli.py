@@ -14,14 +14,28 @@ import typer
 
 from datetime import datetime
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 from pathlib import Path
-from sqtab.importer import import_file
-from sqtab.exporter import export_csv, export_json
-from sqtab.analyzer import analyze_table, run_ai_analysis
-from sqtab.logger import log
-from sqtab.db import DB_PATH, get_conn
+from sqtab.importer import import_file, merge_file, normalize_column
+from sqtab.exporter import export_csv, export_json, export_partitioned, export_shards, row_count
+from sqtab.metrics import Metrics
+from sqtab.progress import import_progress, export_progress
+from sqtab.analyzer import DEFAULT_TOKEN_BUDGET, analyze_table, run_ai_analysis
+from sqtab.logger import log, log_command
+from sqtab.db import DB_PATH, get_conn, list_tables
 from sqtab.ai_sql import generate_sql_from_nl
+from sqtab.ai_memory import recall, remember, similar_examples
+from sqtab.cache import cached_query, clear_cache, is_cacheable
+from sqtab.guard import QueryCancelled, QueryGuard, fetch_rows, plan_warnings
+from sqtab.fts import build_index, drop_index, ensure_index, search
+from sqtab.maintenance import optimize, reclaim_space
+from sqtab.encoding import size_report
+from sqtab.keys import table_key
+from sqtab.diff import DIFF_CHUNK_ROWS, diff_tables
+from sqtab.flatten import FLATTEN_DEPTH
+from sqtab.json_index import create_json_index
+from sqtab.schema import default_reject_path
 
 # Load configuration FIRST
 from sqtab.config import load_env, is_ai_available
@@ -30,6 +44,8 @@ from sqtab.config import load_env, is_ai_available
 load_env()
 
 app = typer.Typer(help="sqtab - Minimal CLI for tabular data (CSV/JSON + SQLite).")
+fts_app = typer.Typer(help="Manage full-text (FTS5) indexes.")
+app.add_typer(fts_app, name="fts")
 console = Console()
 
 EXPORT_DIR = Path("exports")
@@ -49,111 +65,316 @@ def version():
 
 
 @app.command("import")
-def import_command(path: str, table: str):
+def import_command(
+    path: str,
+    table: str,
+    key: Optional[str] = typer.Option(None, "--key", help="Comma-separated key column(s); merges instead of appending"),
+    mode: str = typer.Option("upsert", "--mode", help="Merge mode used with --key: upsert, replace or insert-ignore"),
+    resume: bool = typer.Option(False, "--resume", help="Continue an interrupted CSV import from its last checkpoint"),
+    workers: int = typer.Option(1, "--workers", min=1, help="Parse a UTF-8 CSV file with N memory-mapped worker processes"),
+    show_progress: bool = typer.Option(True, "--progress/--no-progress", help="Show a live progress bar on stderr"),
+    metrics_json: Optional[Path] = typer.Option(None, "--metrics-json", help="Write phase timings and peak memory to this JSON file"),
+    fts: Optional[str] = typer.Option(None, "--fts", help="Comma-separated text column(s) to full-text index after the load"),
+    typed: bool = typer.Option(False, "--typed", help="Create a STRICT table with boolean, date and timestamp columns (CSV)"),
+    dict_encode: bool = typer.Option(False, "--dict-encode", help="Store repetitive text columns as dictionary codes behind a view (CSV)"),
+    primary_key: Optional[str] = typer.Option(None, "--primary-key", help="Comma-separated primary key column(s) of a new table (CSV)"),
+    auto_key: bool = typer.Option(False, "--auto-key", help="Make a unique, non-null column the primary key of a new table (CSV)"),
+    schema: Optional[Path] = typer.Option(None, "--schema", help="JSON schema (names, types, nullability, key); skips type inference (CSV)"),
+    rejects: Optional[Path] = typer.Option(None, "--rejects", help="File for records violating --schema (default: <input>.rejects.csv)"),
+    flatten: bool = typer.Option(False, "--flatten", help="Stream JSON and store nested objects as parent__child columns and arrays as child tables"),
+    flatten_depth: int = typer.Option(FLATTEN_DEPTH, "--flatten-depth", min=0, help="Nested levels expanded by --flatten; deeper values stay JSON text"),
+):
     """
     Import a CSV or JSON file into a SQLite table.
-    (Skeleton implementation.)
+
+    With --key, rows are merged on the key column(s) instead of appended.
+    Large CSV files are committed in chunks; use --resume after an interruption.
+    With --fts, the listed columns are indexed for `sqtab search`.
+    With --typed, booleans are stored as 0/1 and dates/timestamps as Unix seconds.
+    With --dict-encode, the size saved per encoded column is reported.
+    With --auto-key, the primary key that was chosen is reported.
+    With --schema, records that do not fit are written to a reject file.
+    With --flatten, the child tables created from JSON arrays are listed.
     """
-    result = import_file(path, table)
-    log(f"Import called for path={path}, table={table}")
-    typer.echo(f"Import command executed (rows imported: {result}).")
+    metrics = Metrics()
+    options = dict(
+        resume=resume, workers=workers, metrics=metrics, typed=typed, dict_encode=dict_encode,
+        primary_key=_split_columns(primary_key) if primary_key else None, auto_key=auto_key,
+        schema=schema, rejects=rejects, flatten=flatten_depth if flatten else None,
+    )
+
+    with log_command("import", path=path, table=table, key=key, mode=mode if key else None) as stats:
+        try:
+            with import_progress(f"Importing {table}", os.path.getsize(path), enabled=show_progress) as update:
+                if key is None:
+                    result = import_file(path, table, progress=update, **options)
+                else:
+                    counts = merge_file(path, table, key=key, mode=mode, progress=update, **options)
+
+            if fts:
+                with metrics.phase("fts"):
+                    ensure_index(table, _split_columns(fts))
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+
+        if metrics_json:
+            metrics.write_json(metrics_json)
+
+        stats["rows"] = metrics.counters.get("rows", 0)
+        stats["bytes"] = metrics.counters.get("bytes", 0)
+
+        rejected = metrics.counters.get("rejected", 0)
+        if rejected:
+            stats["rejected"] = rejected
+            typer.echo(f"Rejected {rejected} record(s); see {rejects or default_reject_path(path)}.")
+
+        if flatten:
+            _print_child_tables(metrics.details.get("child_tables", {}))
+        if dict_encode:
+            _print_encoding_report(table)
+        if auto_key:
+            found = table_key(table)
+            if found:
+                typer.echo(f"Primary key: {', '.join(found['columns'])} ({found['kind']})")
+            else:
+                typer.echo("No unique, non-null column found; no primary key declared.")
+
+        if key is None:
+            typer.echo(f"Import command executed (rows imported: {result}).")
+            return
+
+        stats.update(inserted=counts["inserted"], updated=counts["updated"], unchanged=counts["unchanged"])
+        typer.echo(
+            f"Import command executed (rows: {counts['rows']}, inserted: {counts['inserted']}, "
+            f"updated: {counts['updated']}, unchanged: {counts['unchanged']})."
+        )
 
 
 
 @app.command("export")
-def export_cmd(table: str, path: str = None):
+def export_cmd(
+    table: Optional[str] = typer.Argument(None, help="Table to export (omit when using --query)"),
+    path: Optional[str] = typer.Argument(None, help="Output .csv/.json file, or directory with --partition-by"),
+    path_option: Optional[str] = typer.Option(None, "--path", help="Output path (same as the PATH argument)"),
+    query: Optional[str] = typer.Option(None, "--query", help="Export the result of this SELECT instead of a table"),
+    partition_by: Optional[str] = typer.Option(None, "--partition-by", help="Write one file per distinct value of this column"),
+    shards: Optional[int] = typer.Option(None, "--shards", min=1, help="Write N shard files in parallel by rowid range, plus manifest.json"),
+    show_progress: bool = typer.Option(True, "--progress/--no-progress", help="Show a live progress bar on stderr"),
+    metrics_json: Optional[Path] = typer.Option(None, "--metrics-json", help="Write phase timings and peak memory to this JSON file"),
+):
     """
-    Export a SQLite table to CSV or JSON. (CSV implemented)
+    Export a SQLite table or query result to CSV or JSON.
+
+    With --partition-by, PATH is a directory (out/ or out.csv -> out/) that
+    receives one file per value, e.g. out/region=EU.csv.
+    With --shards, PATH is a directory that receives part-00000.csv, ... and
+    a manifest.json with row counts and checksums.
     """
+    # `sqtab export --query "..." out.csv`: the only positional is the path.
+    if query and path is None and path_option is None:
+        table, path = None, table
+    path = path_option or path
+    if table is None and not query:
+        typer.echo("Error: give a table name or --query.")
+        raise typer.Exit(code=1)
+    if shards and (query or partition_by):
+        typer.echo("Error: --shards exports a whole table and cannot be combined with --query or --partition-by.")
+        raise typer.Exit(code=1)
+
+    name = table or "query"
+
     # If no output path is provided, generate one automatically.
     if path is None:
-        path = EXPORT_DIR / f"{table}.csv"
+        path = EXPORT_DIR / (name if partition_by or shards else f"{name}.csv")
     else:
         path = Path(path)
 
     lower = str(path).lower()
+    fmt = "json" if lower.endswith(".json") else "csv"
 
-    if lower.endswith(".csv"):
-        rows = export_csv(table, path)
-        print(f"Exported {rows} rows to {path}.")
+    if partition_by or shards:
+        if path.suffix.lower() in (".csv", ".json"):
+            path = path.with_suffix("")
+    elif not lower.endswith((".csv", ".json")):
+        print("Unsupported export format. Use .csv or .json.")
         return
 
-    if lower.endswith(".json"):
-        rows = export_json(table, path)
+    metrics = Metrics()
+
+    with log_command(
+        "export", table=table, query=query, path=str(path), partition_by=partition_by, shards=shards
+    ) as stats:
+        try:
+            total = row_count(table) if show_progress and table and not query else None
+            with export_progress(f"Exporting {name}", total, enabled=show_progress) as update:
+                if shards:
+                    manifest = export_shards(table, path, shards, fmt=fmt, progress=update, metrics=metrics)
+                    rows = manifest["rows"]
+                elif partition_by:
+                    files = export_partitioned(
+                        table, path, partition_by, fmt=fmt, progress=update, metrics=metrics, query=query
+                    )
+                    rows = sum(files.values())
+                else:
+                    exporter = export_json if fmt == "json" else export_csv
+                    rows = exporter(table, path, progress=update, metrics=metrics, query=query)
+        except (ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+
+        if metrics_json:
+            metrics.write_json(metrics_json)
+
+        stats["rows"] = rows
+        stats["bytes"] = metrics.counters.get("bytes", 0)
+
+    if shards:
+        print(f"Exported {rows} rows to {len(manifest['shards'])} shards in {path} (see manifest.json).")
+    elif partition_by:
+        print(f"Exported {rows} rows to {len(files)} files in {path}.")
+    else:
         print(f"Exported {rows} rows to {path}.")
+
+
+def _print_encoding_report(table: str):
+    """Print the estimated size saved by each dictionary-encoded column."""
+    report = size_report(table)
+    if not report:
+        typer.echo("No low-cardinality text columns found; table stored without encoding.")
         return
 
-    print("Unsupported export format. Use .csv or .json.")
+    for col in report:
+        typer.echo(
+            f"Encoded '{col['column']}' ({col['values']} values): "
+            f"{_format_bytes(col['text_bytes'])} -> {_format_bytes(col['encoded_bytes'])} "
+            f"({col['saved_pct']}% smaller)"
+        )
+
+
+def _print_child_tables(children: dict):
+    """List the child tables written by a flattened import (see JsonFlattener.child_tables)."""
+    for child, info in children.items():
+        typer.echo(f"Child table '{child}': {info['rows']} rows (linked by _parent_id -> {info['parent']}._id)")
+
+
+def _split_columns(value: str) -> List[str]:
+    """Parse a comma-separated column list given on the command line."""
+    return [normalize_column(c) for c in value.split(",") if c.strip()]
 
 
 @app.command("sql")
-def sql_command(query: str):
+def sql_command(
+    query: str,
+    cache: bool = typer.Option(False, "--cache", help="Serve read-only queries from the result cache while the data is unchanged"),
+    timeout: Optional[float] = typer.Option(None, "--timeout", min=0, help="Cancel the statement after this many seconds"),
+    max_rows: Optional[int] = typer.Option(None, "--max-rows", min=1, help="Stop after fetching this many rows"),
+):
     """
     Execute a raw SQL query on the SQLite database.
 
     - For SELECT-like statements, prints a formatted table of results.
     - For modification statements (INSERT/UPDATE/DELETE/etc.), prints affected row count.
+    - With --cache, results of read-only statements are reused until the database changes.
+    - With --timeout or on Ctrl-C, the statement is cancelled and rolled back.
     """
     conn = get_conn()
     cur = conn.cursor()
 
     try:
-        cur.execute(query)
-        stripped = query.strip().lower()
+        with log_command("sql", sql=query) as stats, QueryGuard(conn, timeout):
+            if cache and is_cacheable(query):
+                headers, rows, hit, truncated = cached_query(conn, query, max_rows=max_rows)
+                stats["cache"] = "hit" if hit else "miss"
+                stats["rows"] = len(rows)
+                _print_rows(headers, rows, max_rows if truncated else None)
+                return
+
+            cur.execute(query)
+            stripped = query.strip().lower()
+
+            if stripped.startswith("select"):
+                rows, truncated = fetch_rows(cur, max_rows)
+                stats["rows"] = len(rows)
+                _print_rows([col[0] for col in cur.description], rows, max_rows if truncated else None)
+            else:
+                conn.commit()
+                affected = cur.rowcount
+                stats["rows_affected"] = affected
+                typer.echo(f"Query executed. Rows affected: {affected}")
+
+    except QueryCancelled as exc:
+        typer.echo(f"Error executing SQL: {exc}" if exc.timed_out else str(exc))
+        raise typer.Exit(code=1 if exc.timed_out else 130)
+    except sqlite3.Error as exc:
+        log("SQL error", level="error", sql=query, error=str(exc))
+        typer.echo(f"Error executing SQL: {exc}")
+        raise typer.Exit(code=1)
+    finally:
+        conn.close()
 
-        if stripped.startswith("select"):
-            rows = cur.fetchall()
 
-            if not rows:
-                typer.echo("No rows returned.")
-            else:
-                headers = [col[0] for col in cur.description]
+def _print_rows(headers: List[str], rows: list, limit: Optional[int] = None):
+    """
+    Print query results as a table, as used by the sql command.
 
-                table = Table(show_header=True, header_style="bold")
-                for h in headers:
-                    table.add_column(h)
+    ``limit`` is the --max-rows value when the results were cut off there.
+    """
+    if not rows:
+        typer.echo("No rows returned.")
+        return
 
-                for row in rows:
-                    table.add_row(*[str(value) for value in row])
+    table = Table(show_header=True, header_style="bold")
+    for h in headers:
+        table.add_column(h)
 
-                console.print(table)
-        else:
-            conn.commit()
-            affected = cur.rowcount
-            typer.echo(f"Query executed. Rows affected: {affected}")
+    for row in rows:
+        table.add_row(*[escape(str(value)) for value in row])
 
-        log(f"SQL executed successfully: {query}")
+    console.print(table)
+    if limit:
+        typer.echo(f"Showing the first {limit} rows (--max-rows).")
 
-    except sqlite3.Error as exc:
-        log(f"SQL error for query={query!r}: {exc}")
-        typer.echo(f"Error executing SQL: {exc}")
-        raise typer.Exit(code=1)
-    finally:
-        conn.close()
 
 @app.command("sql-ai")
 def sql_ai(
     question: str = typer.Argument(..., help="Natural language query"),
-    execute: bool = typer.Option(True, "--exec/--no-exec", help="Execute the generated SQL")
+    execute: bool = typer.Option(True, "--exec/--no-exec", help="Execute the generated SQL"),
+    timeout: float = typer.Option(30.0, "--timeout", min=0, help="Cancel the statement after this many seconds (0 = no limit)"),
+    max_rows: int = typer.Option(1000, "--max-rows", min=0, help="Stop after fetching this many rows (0 = no limit)"),
+    force: bool = typer.Option(False, "--force", help="Run the SQL even if its plan contains a cartesian product"),
+    memory: bool = typer.Option(True, "--memory/--no-memory", help="Reuse and learn from earlier questions that ran successfully"),
 ):
     """
     Generate SQL from a natural-language question using AI.
     Example: sqtab sql-ai "show users older than 30"
+
+    Before running, the query plan is checked: full scans are reported and
+    cartesian products are refused unless --force is given.
+
+    Questions whose SQL ran successfully are remembered: a repeated question
+    is answered without an API call, and similar ones are sent as examples.
     """
-    if not is_ai_available():
-        console.print("[bold red]AI features require OpenAI API key.[/]")
-        console.print("\nSet your API key in .env file:")
-        console.print("OPENAI_API_KEY=sk-...")
-        raise typer.Exit(1)
+    sql = recall(question) if memory else None
+    from_memory = sql is not None
+    if from_memory:
+        console.print("[bold cyan]SQL from memory:[/]")
+        console.print(sql)
+    else:
+        if not is_ai_available():
+            console.print("[bold red]AI features require OpenAI API key.[/]")
+            console.print("\nSet your API key in .env file:")
+            console.print("OPENAI_API_KEY=sk-...")
+            raise typer.Exit(1)
 
-    try:
-        sql = generate_sql_from_nl(question)
-    except RuntimeError as e:
-        console.print(f"[bold red]Error:[/] {e}")
-        raise typer.Exit(1)
+        try:
+            sql = generate_sql_from_nl(question, examples=similar_examples(question) if memory else None)
+        except RuntimeError as e:
+            console.print(f"[bold red]Error:[/] {e}")
+            raise typer.Exit(1)
 
-    console.print("[bold cyan]Generated SQL:[/]")
-    console.print(sql)
+        console.print("[bold cyan]Generated SQL:[/]")
+        console.print(sql)
 
     if not execute:
         return
@@ -162,12 +383,28 @@ def sql_ai(
     cur = conn.cursor()
 
     try:
-        cur.execute(sql)
-        rows = cur.fetchall()
-        conn.close()
-    except Exception as e:
+        warnings, dangerous = plan_warnings(conn, sql)
+        for warning in warnings:
+            console.print(f"[yellow]Warning:[/] {escape(warning)}")
+        if dangerous and not force:
+            console.print("[bold red]Refusing to run this query; use --force to run it anyway.[/]")
+            raise typer.Exit(1)
+
+        with log_command("sql-ai", sql=sql) as stats, QueryGuard(conn, timeout):
+            cur.execute(sql)
+            rows, truncated = fetch_rows(cur, max_rows)
+            stats["rows"] = len(rows)
+    except QueryCancelled as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1 if e.timed_out else 130)
+    except sqlite3.Error as e:
         console.print(f"[red]Error executing SQL: {e}[/red]")
         return
+    finally:
+        conn.close()
+
+    if memory and not from_memory:
+        remember(question, sql)
 
     # Pretty print results
     if rows:
@@ -176,6 +413,8 @@ def sql_ai(
         for row in rows:
             table.add_row(*[str(x) for x in row])
         console.print(table)
+        if truncated:
+            console.print(f"[yellow]Showing the first {max_rows} rows (--max-rows).[/yellow]")
     else:
         console.print("[yellow]No results.[/yellow]")
 
@@ -191,8 +430,7 @@ def tables_command(schema: bool = typer.Option(False, "--schema", help="Show tab
     cur = conn.cursor()
 
     # Get all table names
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
-    tables = [row[0] for row in cur.fetchall()]
+    tables = list_tables(conn)
 
     if not tables:
         typer.echo("No tables found.")
@@ -230,6 +468,187 @@ def describe(table: str):
     describe_table(table)
 
 
+@app.command("materialize")
+def materialize_command(
+    name: str = typer.Argument(..., help="Name of the table to create"),
+    query: str = typer.Argument(..., help="SELECT statement that defines the view"),
+    incremental: bool = typer.Option(False, "--incremental", help="Append only new source rows on refresh (append-only sources)"),
+):
+    """
+    Create a materialized view: a table filled from QUERY and refreshed
+    automatically after imports into its source tables.
+    """
+    from .materialize import create_materialized_view
+
+    mode = "incremental" if incremental else "full"
+    try:
+        with log_command("materialize", view=name, mode=mode) as stats:
+            result = create_materialized_view(name, query, mode=mode)
+            stats["rows"] = result["rows"]
+    except (sqlite3.Error, ValueError) as exc:
+        typer.echo(f"Error: {exc}")
+        raise typer.Exit(code=1)
+
+    typer.echo(
+        f"Materialized view '{name}' created ({mode}, sources: {', '.join(result['sources'])}, "
+        f"rows: {result['rows']})."
+    )
+
+
+@app.command("refresh")
+def refresh_command(
+    name: Optional[str] = typer.Argument(None, help="View to refresh (default: all)"),
+    full: bool = typer.Option(False, "--full", help="Rebuild from scratch even for incremental views"),
+):
+    """
+    Refresh one or all materialized views.
+    """
+    from .materialize import list_materialized_views, refresh
+
+    names = [name] if name else [v["name"] for v in list_materialized_views()]
+    if not names:
+        typer.echo("No materialized views found.")
+        return
+
+    for view in names:
+        try:
+            with log_command("refresh", view=view) as stats:
+                result = refresh(view, full=full)
+                stats["rows"] = result["rows_added"]
+        except (sqlite3.Error, ValueError) as exc:
+            typer.echo(f"Error refreshing '{view}': {exc}")
+            raise typer.Exit(code=1)
+
+        typer.echo(f"Refreshed '{view}' ({result['mode']}, rows added: {result['rows_added']}).")
+
+
+@fts_app.command("build")
+def fts_build_command(
+    table: str = typer.Argument(..., help="Table to index"),
+    columns: str = typer.Argument(..., help="Comma-separated text column(s)"),
+):
+    """
+    Create or rebuild the full-text index of a table.
+
+    The index is kept in sync with later inserts, updates and deletes.
+    """
+    with log_command("fts build", table=table, columns=columns) as stats:
+        try:
+            rows = build_index(table, _split_columns(columns))
+        except (ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+        stats["rows"] = rows
+
+    typer.echo(f"Full-text index built on '{table}' ({rows} rows).")
+
+
+@fts_app.command("drop")
+def fts_drop_command(table: str = typer.Argument(..., help="Table whose index to remove")):
+    """
+    Remove the full-text index of a table.
+    """
+    drop_index(table)
+    typer.echo(f"Full-text index dropped from '{table}'.")
+
+
+@app.command("search")
+def search_command(
+    table: str = typer.Argument(..., help="Table with a full-text index"),
+    query: str = typer.Argument(..., help='FTS5 query, e.g. \'error AND "disk full"\''),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum number of results"),
+):
+    """
+    Full-text search a table, best matches (BM25) first.
+    """
+    with log_command("search", table=table, query=query) as stats:
+        try:
+            headers, rows = search(table, query, limit=limit)
+        except (ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+        stats["rows"] = len(rows)
+
+    _print_rows(headers, [(*row[:-2], round(row[-2], 3), row[-1]) for row in rows])
+
+
+@app.command("json-index")
+def json_index_command(
+    table: str = typer.Argument(..., help="Table with a JSON text column"),
+    column: str = typer.Argument(..., help="Column holding the JSON documents"),
+    path: str = typer.Argument(..., help="JSON path of the field, e.g. '$.user.id'"),
+    name: Optional[str] = typer.Option(None, "--name", help="Name of the generated column (default: COLUMN_path_parts)"),
+):
+    """
+    Index a field of a JSON column.
+
+    Adds a virtual generated column holding the field and an index on it;
+    filter on that column to get index lookups instead of json_extract scans.
+    """
+    with log_command("json-index", table=table, column=column, path=path) as stats:
+        try:
+            result = create_json_index(table, column, path, name=name)
+        except (ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+        stats["rows"] = result["rows"]
+
+    typer.echo(
+        f"Column '{result['column']}' = {column} {path} added to '{table}' "
+        f"and indexed ({result['rows']} non-null values)."
+    )
+    typer.echo(f"Query it with: WHERE \"{result['column']}\" = ...")
+
+
+@app.command("diff")
+def diff_command(
+    table_a: str = typer.Argument(..., help="Old table"),
+    table_b: str = typer.Argument(..., help="New table"),
+    key: Optional[str] = typer.Option(None, "--key", help="Comma-separated key column(s) (default: primary key of TABLE_A, else whole rows)"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the differing rows to a .csv or .json file"),
+    chunk_rows: int = typer.Option(DIFF_CHUNK_ROWS, "--chunk-rows", min=1, help="Rows per compared chunk"),
+):
+    """
+    Show rows added, removed and changed from TABLE_A to TABLE_B.
+
+    Both tables are read once in key order; only chunks that
+    differ are compared row by row.
+    """
+    with log_command("diff", table_a=table_a, table_b=table_b, key=key) as stats:
+        try:
+            result = diff_tables(
+                table_a, table_b, key=_split_columns(key) if key else None,
+                output=output, chunk_rows=chunk_rows,
+            )
+        except (ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+        stats["rows"] = result["added"] + result["removed"] + result["changed"]
+
+    by = f"key {', '.join(result['key'])}" if result["key"] else "whole rows"
+    typer.echo(f"Compared '{table_a}' ({result['rows_a']} rows) with '{table_b}' ({result['rows_b']} rows) by {by}.")
+    if result["columns_added"]:
+        typer.echo(f"Columns only in '{table_b}': {', '.join(result['columns_added'])}")
+    if result["columns_removed"]:
+        typer.echo(f"Columns only in '{table_a}': {', '.join(result['columns_removed'])}")
+    typer.echo(
+        f"Added: {result['added']}, removed: {result['removed']}, changed: {result['changed']}, "
+        f"unchanged: {result['unchanged']} ({result['chunks_differing']} of {result['chunks']} chunks differ)."
+    )
+
+    if result["samples"]:
+        _print_rows(
+            ["change", *result["columns"]],
+            [(change, *row) for change, row, _ in result["samples"]],
+        )
+        shown = len(result["samples"])
+        total = result["added"] + result["removed"] + result["changed"]
+        if shown < total:
+            typer.echo(f"Showing {shown} of {total} differences.")
+    if output:
+        typer.echo(f"Differences written to {output}")
+
+
 @app.command("analyze")
 def analyze_command(
     table: str,
@@ -238,11 +657,19 @@ def analyze_command(
     rule: List[str] = typer.Option(None, "--rule", help="Custom AI rules (can be repeated)"),
     tasks_file: Optional[Path] = typer.Option(None, "--tasks-file", help="File containing tasks"),
     rules_file: Optional[Path] = typer.Option(None, "--rules-file", help="File containing rules"),
+    token_budget: int = typer.Option(DEFAULT_TOKEN_BUDGET, "--token-budget", min=200, help="Maximum estimated prompt size in tokens for --ai"),
 ):
     """
     Analyze a table. With --ai, run AI-based interpretation with optional custom tasks & rules.
+    The prompt summarizes columns with statistics and is compressed to fit --token-budget.
     """
+    with log_command("analyze", table=table, ai=ai) as stats:
+        _analyze(table, ai, task, rule, tasks_file, rules_file, stats, token_budget)
+
+
+def _analyze(table, ai, task, rule, tasks_file, rules_file, stats: dict, token_budget: int = DEFAULT_TOKEN_BUDGET):
     info = analyze_table(table)
+    stats["rows"] = info["row_count"]
 
     console = Console()
     console.print(f"Table: {table}")
@@ -307,7 +734,7 @@ def analyze_command(
     # ---- Run AI ----
     console.print("\nRunning AI analysis...\n")
 
-    ai_result = run_ai_analysis(table, info, tasks=tasks, rules=rules)
+    ai_result = run_ai_analysis(table, info, tasks=tasks, rules=rules, token_budget=token_budget)
     console.print(ai_result)
 
 
@@ -335,8 +762,7 @@ def info_command():
     version = cur.fetchone()[0]
 
     # Tables
-    cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
-    tables = [t[0] for t in cur.fetchall()]
+    tables = list_tables(conn)
 
     # Print database info
     console.print(f"[bold]Database:[/bold] {DB_PATH}")
@@ -366,6 +792,47 @@ def info_command():
 
 
 
+@app.command("optimize")
+def optimize_command(
+    vacuum: str = typer.Option("incremental", "--vacuum", help="Space reclamation: none, incremental or full"),
+    analyze: bool = typer.Option(True, "--analyze/--no-analyze", help="Update query planner statistics"),
+    quick: bool = typer.Option(False, "--quick", help="Use PRAGMA optimize instead of a full ANALYZE"),
+    into: Optional[Path] = typer.Option(None, "--into", help="Write a compacted copy to this new file (VACUUM INTO)"),
+    page_size: Optional[int] = typer.Option(None, "--page-size", help="Page size for a full vacuum or --into copy"),
+):
+    """
+    Update planner statistics and reclaim unused space in the database.
+
+    An incremental vacuum falls back to a full VACUUM the first time on
+    databases created without incremental auto-vacuum.
+    """
+    with log_command("optimize", vacuum=vacuum, into=str(into) if into else None) as stats:
+        try:
+            result = optimize(analyze=analyze, quick=quick, vacuum=vacuum, into=into, page_size=page_size)
+        except (ValueError, sqlite3.Error) as exc:
+            typer.echo(f"Error: {exc}")
+            raise typer.Exit(code=1)
+        stats["bytes"] = result["reclaimed_bytes"]
+
+    for step, seconds in result["steps"].items():
+        typer.echo(f"{step}: {seconds:.3f}s")
+
+    target = f" into {result['path']}" if "path" in result else ""
+    typer.echo(
+        f"Optimized{target}: {_format_bytes(result['size_before'])} -> {_format_bytes(result['size_after'])} "
+        f"({_format_bytes(result['reclaimed_bytes'])} reclaimed) in {result['seconds']:.3f}s."
+    )
+
+
+def _format_bytes(size: int) -> str:
+    """Human-readable byte count, e.g. 1.5 MB."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
 @app.command("reset")
 def reset_command(hard: bool = typer.Option(False, "--hard", help="Delete sqtab.db file instead of dropping tables.")):
     """
@@ -401,6 +868,7 @@ def reset_command(hard: bool = typer.Option(False, "--hard", help="Delete sqtab.
             typer.echo(result.stderr)
             return
 
+        clear_cache()
         log("Database hard reset (file deleted).")
         typer.echo("sqtab.db hard reset complete.")
         return
@@ -417,14 +885,21 @@ def reset_command(hard: bool = typer.Option(False, "--hard", help="Delete sqtab.
         typer.echo("No tables to drop.")
         return
 
-    # Drop tables one by one
+    # Views first (dictionary-encoded tables are views), then tables one by one
+    for (view_name,) in cur.execute("SELECT name FROM sqlite_master WHERE type='view';").fetchall():
+        cur.execute(f'DROP VIEW IF EXISTS "{view_name}"')
     for (table_name,) in tables:
         cur.execute(f'DROP TABLE IF EXISTS "{table_name}"')
 
     conn.commit()
+
+    # Give the freed pages back instead of leaving the file bloated.
+    size_before = os.path.getsize(DB_PATH)
+    reclaim_space(conn)
     conn.close()
+    reclaimed = size_before - os.path.getsize(DB_PATH)
 
-    log("Database soft reset (tables dropped).")
-    typer.echo("All tables dropped (soft reset).")
+    log("Database soft reset (tables dropped).", reclaimed_bytes=reclaimed)
+    typer.echo(f"All tables dropped (soft reset, {_format_bytes(reclaimed)} reclaimed).")
 
 
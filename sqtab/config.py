@@ -150,6 +150,24 @@ def get_ai_model(default: str = "gpt-4o-mini") -> str:
     return os.getenv("SQTAB_AI_MODEL", default)
 
 
+def get_ai_settings() -> dict:
+    """
+    Return AI transport settings from the environment.
+
+    - SQTAB_AI_BASE_URL: OpenAI-compatible API endpoint (default: OpenAI)
+    - SQTAB_AI_TIMEOUT: seconds per request (default: 60)
+    - SQTAB_AI_MAX_RETRIES: retries after a 429/5xx or connection error (default: 3)
+    """
+    if not _ENV_LOADED:
+        load_env()
+
+    return {
+        "base_url": os.getenv("SQTAB_AI_BASE_URL") or None,
+        "timeout": float(os.getenv("SQTAB_AI_TIMEOUT", 60)),
+        "max_retries": int(os.getenv("SQTAB_AI_MAX_RETRIES", 3)),
+    }
+
+
 def get_debug() -> bool:
     """
     Check if debug mode is enabled.
@@ -171,4 +189,35 @@ def is_ai_available() -> bool:
     """
     return get_api_key() is not None
 
+
+def get_log_config() -> dict:
+    """
+    Return logging settings from the environment.
+
+    - SQTAB_LOG: "off"/"0"/"false" disables logging (default: on)
+    - SQTAB_LOG_LEVEL: debug, info, warning or error (default: info)
+    - SQTAB_LOG_MAX_BYTES: rotate the log file above this size (default: 5 MB)
+    - SQTAB_LOG_BACKUPS: number of rotated files to keep (default: 3)
+    """
+    if not _ENV_LOADED:
+        load_env()
+
+    return {
+        "enabled": os.getenv("SQTAB_LOG", "on").lower() not in ("0", "off", "false", "no"),
+        "level": os.getenv("SQTAB_LOG_LEVEL", "info").lower(),
+        "max_bytes": int(os.getenv("SQTAB_LOG_MAX_BYTES", 5 * 1024 * 1024)),
+        "backups": int(os.getenv("SQTAB_LOG_BACKUPS", 3)),
+    }
+
+
+def get_cache_max_bytes() -> int:
+    """
+    Return the size cap of the query result cache (SQTAB_CACHE_MAX_BYTES).
+    Defaults to 64 MB.
+    """
+    if not _ENV_LOADED:
+        load_env()
+
+    return int(os.getenv("SQTAB_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
 load_env()
\ No newline at end of file
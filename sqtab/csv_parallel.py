@@ -0,0 +1,162 @@
+"""
+Parallel CSV parsing for sqtab.
+
+The input file is memory-mapped and split into byte ranges that end on
+record boundaries. Worker processes parse and type-convert the ranges with
+the same rules as the serial importer, and the results are handed back in
+file order so a single connection can write them.
+
+Only UTF-8 input is supported, and quoting must follow RFC 4180 (a quote
+character inside a field is escaped by doubling it).
+"""
+
+import csv
+import io
+import mmap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from sqtab.typed import merge_kinds, narrow_kind
+
+# Target size of one byte range. Each range becomes one committed batch.
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# Type order used to merge per-range inference results.
+_TYPE_RANK = {None: 0, "INTEGER": 1, "REAL": 2, "TEXT": 3}
+
+
+def split_ranges(path: str, start: int, chunk_bytes: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Split ``path`` from byte ``start`` into ranges of roughly ``chunk_bytes``.
+
+    A range only ends after a newline that lies outside quotes. Quote state
+    is tracked by the parity of quote characters since ``start``, which must
+    itself be a record boundary.
+    """
+    chunk_bytes = chunk_bytes or CHUNK_BYTES
+    ranges = []
+
+    with open(path, "rb") as f:
+        size = f.seek(0, io.SEEK_END)
+        if start >= size:
+            return ranges
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = start
+            while pos < size:
+                target = pos + chunk_bytes
+                if target >= size:
+                    ranges.append((pos, size))
+                    break
+
+                parity = mm[pos:target].count(b'"') % 2
+                cut = target
+                while True:
+                    newline = mm.find(b"\n", cut)
+                    if newline == -1:
+                        cut = size
+                        break
+                    parity = (parity + mm[cut:newline].count(b'"')) % 2
+                    cut = newline + 1
+                    if parity == 0:
+                        break
+
+                ranges.append((pos, cut))
+                pos = cut
+
+    return ranges
+
+
+def _read_range(path: str, start: int, end: int) -> csv.reader:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[start:end].decode("utf-8")
+    # newline="" splits lines exactly like the serial reader's file object.
+    return csv.reader(io.StringIO(text, newline=""))
+
+
+def _infer_range(
+    path: str, start: int, end: int, width: int, typed: bool = False
+) -> Tuple[List[Optional[str]], int]:
+    """Worker: infer column types (or kinds) for one range. Returns (types, row count)."""
+    from sqtab.importer import _iter_records, _narrow_type
+
+    narrow = narrow_kind if typed else _narrow_type
+    types: List[Optional[str]] = [None] * width
+    count = 0
+    for record in _iter_records(_read_range(path, start, end), width):
+        count += 1
+        types = [narrow(t, v) for t, v in zip(types, record)]
+    return types, count
+
+
+def _convert_range(
+    path: str, start: int, end: int, width: int,
+    kinds: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+) -> Tuple[list, int]:
+    """Worker: parse and convert one range. Returns (rows, end offset)."""
+    from sqtab.importer import _convert_records, _iter_records
+
+    records = _iter_records(_read_range(path, start, end), width)
+    return _convert_records(records, columns, kinds), end
+
+
+def _ordered_map(
+    executor: ProcessPoolExecutor, fn, path: str, ranges, width: int, window: int, *args
+) -> Iterator:
+    """
+    Run ``fn`` over ``ranges`` and yield results in input order.
+
+    At most ``window`` ranges are in flight, which bounds memory use when
+    the writer is slower than the parsers. ``args`` are passed on to ``fn``.
+    """
+    pending = deque()
+    for start, end in ranges:
+        pending.append(executor.submit(fn, path, start, end, width, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def infer_types(path: str, start: int, width: int, workers: int, typed: bool = False) -> Optional[List[str]]:
+    """
+    Infer column types for the data section of a CSV file in parallel.
+
+    With ``typed=True`` kinds are inferred instead (see sqtab.typed).
+    Returns None when the file has no data rows.
+    """
+    ranges = split_ranges(path, start)
+    types: List[Optional[str]] = [None] * width
+    total = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for range_types, count in _ordered_map(executor, _infer_range, path, ranges, width, workers * 2, typed):
+            total += count
+            if typed:
+                types = [merge_kinds(a, b) for a, b in zip(types, range_types)]
+            else:
+                types = [max(a, b, key=_TYPE_RANK.__getitem__) for a, b in zip(types, range_types)]
+
+    if not total:
+        return None
+    return [t or ("text" if typed else "TEXT") for t in types]
+
+
+def iter_batches(
+    path: str, start: int, width: int, workers: int,
+    kinds: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+) -> Iterator[Tuple[list, int]]:
+    """
+    Yield ``(rows, end_offset)`` for each byte range, in file order.
+
+    ``kinds`` (and ``columns``, for error messages) select typed conversion.
+
+    ``end_offset`` is the byte position right after the last record of the
+    batch, suitable for an import checkpoint.
+    """
+    ranges = split_ranges(path, start)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from _ordered_map(executor, _convert_range, path, ranges, width, workers * 2, kinds, columns)
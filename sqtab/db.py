@@ -4,14 +4,50 @@ Database connection utilities for sqtab.
 
 import sqlite3
 from pathlib import Path
+from typing import List, Optional, Union
+
+from sqtab.functions import register_functions
 
 # Default SQLite database file used by sqtab.
 DB_PATH = Path("sqtab.db")
 
+# Prefix of sqtab's own bookkeeping tables (checkpoints, metadata, ...).
+# Tables with this prefix are hidden from table listings and AI prompts.
+INTERNAL_PREFIX = "_sqtab_"
+
+
+def get_conn(path: Optional[Union[str, Path]] = None) -> sqlite3.Connection:
+    """
+    Return a new SQLite connection using the default database file (or
+    ``path``). The database file will be created automatically if it does
+    not exist.
+
+    New databases use incremental auto-vacuum, so space freed by dropped
+    tables can be returned to the OS cheaply (see sqtab.maintenance).
+    sqtab's SQL functions (median, stddev, ...) are registered on every
+    connection (see sqtab.functions).
+    """
+    path = Path(path) if path is not None else DB_PATH
+    new = not path.exists()
+    conn = sqlite3.connect(path)
+    if new:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    register_functions(conn)
+    return conn
+
 
-def get_conn() -> sqlite3.Connection:
+def list_tables(conn: sqlite3.Connection) -> List[str]:
     """
-    Return a new SQLite connection using the default database file.
-    The database file will be created automatically if it does not exist.
+    Return the names of user tables and views, sorted by name.
+
+    SQLite's own tables (``sqlite_*``) and sqtab's internal tables
+    (``INTERNAL_PREFIX``) are excluded. Views are included because
+    dictionary-encoded tables are exposed as views.
     """
-    return sqlite3.connect(DB_PATH)
+    cur = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+        "AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' "
+        "AND name NOT LIKE ? ESCAPE '\\' ORDER BY name",
+        (INTERNAL_PREFIX.replace("_", "\\_") + "%",),
+    )
+    return [row[0] for row in cur.fetchall()]
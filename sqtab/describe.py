@@ -1,19 +1,43 @@
 from rich.table import Table
 from rich.console import Console
 from .db import get_conn
+from .json_index import json_indexes
+from .keys import table_key
+from .typed import column_kinds
 
 def describe_table(table: str):
     conn = get_conn()
     cur = conn.cursor()
 
-    cur.execute(f'PRAGMA table_info("{table}")')
-    rows = cur.fetchall()
+    # table_xinfo also lists generated columns (JSON indexes); hidden
+    # columns of virtual tables (hidden = 1) are left out.
+    cur.execute(f'PRAGMA table_xinfo("{table}")')
+    rows = [row[:6] for row in cur.fetchall() if row[6] != 1]
+    indexed = json_indexes(table, conn)
     conn.close()
 
+    # Tables imported with --typed also record a kind per column.
+    kinds = column_kinds(table)
+
     console = Console()
-    t = Table("Column", "Type", "Not Null", "PK", "Default")
+    headers = ["Column", "Type", "Not Null", "PK", "Default"]
+    if kinds:
+        headers.insert(2, "Kind")
+    t = Table(*headers)
 
     for cid, name, col_type, notnull, dflt, pk in rows:
-        t.add_row(name, col_type, str(bool(notnull)), str(bool(pk)), str(dflt))
+        cells = [name, col_type, str(bool(notnull)), str(bool(pk)), str(dflt)]
+        if kinds:
+            cells.insert(2, kinds.get(name, ""))
+        t.add_row(*cells)
 
     console.print(t)
+
+    key = table_key(table)
+    if key:
+        console.print(f"Primary key: {', '.join(key['columns'])} ({key['kind']})")
+
+    for entry in indexed:
+        console.print(
+            f"JSON index: {entry['column']} = {entry['source']} {entry['path']} (index {entry['index']})"
+        )
@@ -0,0 +1,279 @@
+"""
+Table diff for sqtab.
+
+``diff_tables`` compares two tables, e.g. yesterday's and today's import,
+without an ``EXCEPT`` over all rows:
+
+1. Both tables are read once, in key order, in aligned chunks: each chunk
+   holds the same key range from both sides and at most ``chunk_rows``
+   rows of either.
+2. The two halves of a chunk are compared as a whole (a single list
+   comparison in C); equal chunks are counted as unchanged without
+   looking at their rows one by one.
+3. A chunk that differs is split into aligned parts of DIFF_PART_ROWS
+   rows, again compared as a whole; only differing parts are compared
+   row by row, by key, and their rows reported as added, removed or
+   changed.
+
+Memory use is bounded by the chunk size. Without a key (and no primary
+key on the first table) whole rows are compared, so rows are only added
+or removed, never changed.
+"""
+
+import sqlite3
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from sqtab.db import get_conn
+from sqtab.exporter import CsvSink, JsonSink
+from sqtab.keys import table_key
+
+# Rows of either table per compared chunk.
+DIFF_CHUNK_ROWS = 10_000
+
+# Rows per part when a differing chunk is split to find the changed rows.
+DIFF_PART_ROWS = 100
+
+# Differences kept in the result for display.
+DIFF_SAMPLE_ROWS = 10
+
+
+def diff_tables(
+    table_a: str,
+    table_b: str,
+    key: Optional[List[str]] = None,
+    output: Optional[Path] = None,
+    chunk_rows: int = DIFF_CHUNK_ROWS,
+) -> dict:
+    """
+    Compare ``table_a`` (old) with ``table_b`` (new).
+
+    Parameters
+    ----------
+    table_a, table_b : str
+        Tables to compare. Only columns present in both are compared.
+    key : list[str], optional
+        Columns identifying a row. Defaults to the primary key of
+        ``table_a``, else to all compared columns. Must be unique.
+    output : Path, optional
+        ``.csv`` or ``.json`` file receiving every differing row with a
+        ``_change`` column (added, removed, changed) and, for changed rows,
+        ``_changed_columns``. Removed rows show the old values, others the
+        new ones.
+    chunk_rows : int
+        Maximum rows of either table per chunk.
+
+    Returns
+    -------
+    dict
+        ``added``, ``removed``, ``changed``, ``unchanged`` row counts,
+        ``rows_a``, ``rows_b``, ``chunks``, ``chunks_differing``, the
+        ``key`` and ``columns`` compared (key first), ``columns_added`` and
+        ``columns_removed``, and the first DIFF_SAMPLE_ROWS differences as
+        ``samples`` (``(change, row, changed_columns)``).
+    """
+    conn = get_conn()
+    try:
+        columns_a = _columns(conn, table_a)
+        columns_b = _columns(conn, table_b)
+        columns = [c for c in columns_a if c in columns_b]
+        if not columns:
+            raise ValueError(f"Tables '{table_a}' and '{table_b}' have no columns in common.")
+
+        if not key:
+            declared = table_key(table_a)
+            key = declared["columns"] if declared else None
+        whole_rows = not key
+        key = list(key or columns)
+        missing = [k for k in key if k not in columns]
+        if missing:
+            raise ValueError(f"Key column(s) not found in both tables: {', '.join(missing)}")
+        # Rows are read as key columns first, then the other columns.
+        columns = key + [c for c in columns if c not in key]
+
+        result = {
+            "key": None if whole_rows else key,
+            "columns": columns,
+            "columns_added": [c for c in columns_b if c not in columns_a],
+            "columns_removed": [c for c in columns_a if c not in columns_b],
+            "rows_a": 0, "rows_b": 0, "chunks": 0, "chunks_differing": 0,
+            "added": 0, "removed": 0, "changed": 0, "unchanged": 0,
+            "samples": [],
+        }
+
+        sink = _open_sink(output, columns) if output else None
+        try:
+            record = _recorder(result, sink)
+            stream_a = _KeyStream(conn, table_a, columns, len(key))
+            stream_b = _KeyStream(conn, table_b, columns, len(key))
+            for rows_a, rows_b in _aligned_chunks(stream_a, stream_b, chunk_rows):
+                result["chunks"] += 1
+                result["rows_a"] += len(rows_a)
+                result["rows_b"] += len(rows_b)
+                if rows_a == rows_b:
+                    result["unchanged"] += len(rows_a)
+                    continue
+                result["chunks_differing"] += 1
+                for part_a, part_b in _aligned_parts(rows_a, rows_b, len(key), DIFF_PART_ROWS):
+                    if part_a == part_b:
+                        result["unchanged"] += len(part_a)
+                    elif whole_rows:
+                        _compare_rows(part_a, part_b, result, record)
+                    else:
+                        _compare_by_key(part_a, part_b, len(key), columns, result, record)
+        finally:
+            if sink is not None:
+                sink.close()
+    finally:
+        conn.close()
+
+    return result
+
+
+class _KeyStream:
+    """Rows of a table ordered by their first ``width`` columns (the key)."""
+
+    def __init__(self, conn: sqlite3.Connection, table: str, columns: List[str], width: int):
+        self.width = width
+        select = ", ".join(f'"{c}"' for c in columns)
+        # BINARY collation, so SQLite's order matches _sort_key
+        order = ", ".join(f'"{k}" COLLATE BINARY' for k in columns[:width])
+        self.cur = conn.execute(f'SELECT {select} FROM "{table}" ORDER BY {order}')
+        self.buffer: list = []
+        self.done = False
+
+    def take(self, n: int) -> list:
+        """Up to ``n`` next rows; fewer only when the table is exhausted."""
+        rows, self.buffer = self.buffer[:n], self.buffer[n:]
+        if len(rows) < n and not self.done:
+            more = self.cur.fetchmany(n - len(rows))
+            if len(more) < n - len(rows):
+                self.done = True
+            rows += more
+        return rows
+
+    def push_back(self, rows: list) -> None:
+        self.buffer = rows + self.buffer
+
+
+def _aligned_chunks(stream_a: _KeyStream, stream_b: _KeyStream, size: int):
+    """Yield ``(rows_a, rows_b)`` pairs covering the same key range."""
+    width = stream_a.width
+    sort_key = lambda row: _sort_key(row[:width])
+
+    while True:
+        rows_a = stream_a.take(size)
+        rows_b = stream_b.take(size)
+        if not rows_a and not rows_b:
+            return
+
+        # A side that filled its chunk may have more rows; end the chunk at
+        # the smaller of the last keys read from such sides.
+        full = [sort_key(rows[-1]) for rows in (rows_a, rows_b) if len(rows) == size]
+        if full:
+            upper = min(full)
+            rows_a = _cut(stream_a, rows_a, upper, sort_key)
+            rows_b = _cut(stream_b, rows_b, upper, sort_key)
+        yield rows_a, rows_b
+
+
+def _cut(stream: _KeyStream, rows: list, upper, sort_key) -> list:
+    """Keep rows with keys up to ``upper`` (including any further equal keys)."""
+    cut = bisect_right(rows, upper, key=sort_key)
+    stream.push_back(rows[cut:])
+    rows = rows[:cut]
+    while True:
+        nxt = stream.take(1)
+        if nxt and sort_key(nxt[0]) == upper:
+            rows.append(nxt[0])
+        else:
+            stream.push_back(nxt)
+            return rows
+
+
+def _aligned_parts(rows_a: list, rows_b: list, width: int, size: int):
+    """Split a chunk into ``(part_a, part_b)`` pairs covering the same key range."""
+    sort_key = lambda row: _sort_key(row[:width])
+    start_a = start_b = 0
+    for i in range(size, len(rows_a), size):
+        bound = sort_key(rows_a[i])
+        end_a = bisect_left(rows_a, bound, lo=start_a, key=sort_key)
+        end_b = bisect_left(rows_b, bound, lo=start_b, key=sort_key)
+        yield rows_a[start_a:end_a], rows_b[start_b:end_b]
+        start_a, start_b = end_a, end_b
+    yield rows_a[start_a:], rows_b[start_b:]
+
+
+def _sort_key(values: tuple) -> tuple:
+    """Python ordering equal to SQLite's: NULL, numbers, text, blobs."""
+    ranked = []
+    for value in values:
+        if value is None:
+            ranked.append((0, 0))
+        elif isinstance(value, (int, float)):
+            ranked.append((1, value))
+        elif isinstance(value, str):
+            ranked.append((2, value))
+        else:
+            ranked.append((3, bytes(value)))
+    return tuple(ranked)
+
+
+def _compare_by_key(rows_a: list, rows_b: list, width: int, columns: List[str], result: dict, record) -> None:
+    old = {row[:width]: row for row in rows_a}
+    if len(old) < len(rows_a) or len({row[:width] for row in rows_b}) < len(rows_b):
+        raise ValueError("The key is not unique; pass --key with columns that identify a row.")
+    for row in rows_b:
+        previous = old.pop(row[:width], None)
+        if previous is None:
+            record("added", row)
+        elif previous != row:
+            changed = [c for c, a, b in zip(columns, previous, row) if a != b]
+            record("changed", row, changed)
+        else:
+            result["unchanged"] += 1
+    for row in old.values():
+        record("removed", row)
+
+
+def _compare_rows(rows_a: list, rows_b: list, result: dict, record) -> None:
+    old = Counter(rows_a)
+    new = Counter(rows_b)
+    for values, n in (old - new).items():
+        for _ in range(n):
+            record("removed", values)
+    for values, n in (new - old).items():
+        for _ in range(n):
+            record("added", values)
+    result["unchanged"] += sum((old & new).values())
+
+
+def _recorder(result: dict, sink) -> Callable:
+    """Callable that counts a difference, keeps a sample and writes it to ``sink``."""
+
+    def record(change: str, values: tuple, changed: Optional[List[str]] = None) -> None:
+        result[change] += 1
+        entry = (change, values, changed or [])
+        if len(result["samples"]) < DIFF_SAMPLE_ROWS:
+            result["samples"].append(entry)
+        if sink is not None:
+            sink.write([(change, ";".join(changed or []), *values)])
+
+    return record
+
+
+def _open_sink(path: Path, columns: List[str]):
+    sinks = {".csv": CsvSink, ".json": JsonSink}
+    suffix = Path(path).suffix.lower()
+    if suffix not in sinks:
+        raise ValueError("Diff output must be a .csv or .json file.")
+    return sinks[suffix](Path(path), ["_change", "_changed_columns", *columns])
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    if not info:
+        raise ValueError(f"Table '{table}' does not exist.")
+    return [c[1] for c in info]
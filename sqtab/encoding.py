@@ -0,0 +1,204 @@
+"""
+Dictionary encoding of low-cardinality text columns.
+
+With ``import --dict-encode``, text columns that repeat a small set of
+values (country, status, device, ...) are stored as integer codes:
+
+- ``_sqtab_enc_<table>`` holds the rows, with codes in encoded columns;
+- ``_sqtab_dict_<table>_<column>`` maps each code to its text value;
+- a view named ``<table>`` joins them back into the original shape, so
+  queries, ``head``, ``describe`` and ``export`` work unchanged;
+- an INSTEAD OF INSERT trigger on the view lets plain INSERT statements
+  add rows (and new dictionary values) as if it were a table.
+
+The importer writes to the storage table directly and assigns codes in
+memory. Updates and deletes must target the storage table.
+"""
+
+import sqlite3
+from typing import Dict, List, Optional
+
+from sqtab.db import INTERNAL_PREFIX, get_conn
+
+ENCODINGS_TABLE = f"{INTERNAL_PREFIX}encodings"
+
+# A text column is encoded when it has at most this many distinct values...
+DICT_MAX_VALUES = 1_000
+
+# ...and each value appears at least this many times on average.
+DICT_MIN_REPEAT = 2
+
+
+def storage_table(table: str) -> str:
+    return f"{INTERNAL_PREFIX}enc_{table}"
+
+
+def dict_table(table: str, column: str) -> str:
+    return f"{INTERNAL_PREFIX}dict_{table}_{column}"
+
+
+def choose_columns(columns: List[str], types: List[str], distinct: List[Optional[set]], rows: int) -> List[str]:
+    """
+    Pick the TEXT columns worth encoding.
+
+    ``distinct`` holds the distinct values seen per column during inference,
+    or None once a column went over DICT_MAX_VALUES.
+    """
+    chosen = []
+    for column, col_type, values in zip(columns, types, distinct):
+        if col_type.upper() != "TEXT" or not values:
+            continue
+        if len(values) <= DICT_MAX_VALUES and len(values) * DICT_MIN_REPEAT <= rows:
+            chosen.append(column)
+    return chosen
+
+
+def create_encoded_table(
+    cur: sqlite3.Cursor,
+    table: str,
+    columns: List[str],
+    column_types: List[str],
+    encoded: List[str],
+    strict: bool = False,
+) -> None:
+    """Create the storage table, dictionaries, view and insert trigger."""
+    _ensure_table(cur)
+    storage = storage_table(table)
+
+    col_defs = ", ".join(
+        f'"{col}" {"INTEGER" if col in encoded else col_type}'
+        for col, col_type in zip(columns, column_types)
+    )
+    cur.execute(f'CREATE TABLE "{storage}" ({col_defs}){" STRICT" if strict else ""}')
+
+    for col in encoded:
+        cur.execute(
+            f'CREATE TABLE "{dict_table(table, col)}" '
+            "(code INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE)"
+        )
+
+    cur.execute(f'CREATE VIEW "{table}" AS {_view_select(table, columns, encoded)}')
+
+    statements = []
+    values = []
+    for col in columns:
+        if col in encoded:
+            dt = dict_table(table, col)
+            statements.append(
+                f'INSERT OR IGNORE INTO "{dt}" (value) SELECT NEW."{col}" WHERE NEW."{col}" IS NOT NULL;'
+            )
+            values.append(f'(SELECT code FROM "{dt}" WHERE value = NEW."{col}")')
+        else:
+            values.append(f'NEW."{col}"')
+    col_list = ", ".join(f'"{c}"' for c in columns)
+    cur.execute(f'''
+        CREATE TRIGGER "{storage}_insert" INSTEAD OF INSERT ON "{table}" BEGIN
+            {" ".join(statements)}
+            INSERT INTO "{storage}" ({col_list}) VALUES ({", ".join(values)});
+        END
+    ''')
+
+    cur.execute(f'DELETE FROM "{ENCODINGS_TABLE}" WHERE table_name = ?', (table,))
+    cur.executemany(
+        f'INSERT INTO "{ENCODINGS_TABLE}" (table_name, column_name) VALUES (?, ?)',
+        [(table, col) for col in encoded],
+    )
+
+
+def load_encoded(cur: sqlite3.Cursor, table: str) -> Optional[List[str]]:
+    """Return the encoded columns of ``table``, or None if it is not encoded."""
+    _ensure_table(cur)
+    rows = cur.execute(
+        f'SELECT column_name FROM "{ENCODINGS_TABLE}" WHERE table_name = ? ORDER BY rowid', (table,)
+    ).fetchall()
+    return [r[0] for r in rows] or None
+
+
+class Encoder:
+    """Replace text values by dictionary codes, adding new values as needed."""
+
+    def __init__(self, cur: sqlite3.Cursor, table: str, columns: List[str], encoded: List[str]):
+        self.cur = cur
+        self.positions = [(i, dict_table(table, col)) for i, col in enumerate(columns) if col in encoded]
+        self.codes: Dict[str, Dict[str, int]] = {
+            dt: dict(cur.execute(f'SELECT value, code FROM "{dt}"').fetchall())
+            for _, dt in self.positions
+        }
+
+    def encode(self, rows: list) -> list:
+        for row in rows:
+            for i, dt in self.positions:
+                value = row[i]
+                if value is None:
+                    continue
+                # Same text a TEXT column would store.
+                text = value if isinstance(value, str) else str(int(value) if isinstance(value, bool) else value)
+                codes = self.codes[dt]
+                code = codes.get(text)
+                if code is None:
+                    code = self.cur.execute(f'INSERT INTO "{dt}" (value) VALUES (?)', (text,)).lastrowid
+                    codes[text] = code
+                row[i] = code
+        return rows
+
+
+def size_report(table: str) -> List[dict]:
+    """
+    Estimate per encoded column how many bytes the codes save.
+
+    ``text_bytes`` is what the values would take stored inline (UTF-8
+    length per row); ``encoded_bytes`` is the size of the integer codes per
+    row plus the dictionary itself.
+    """
+    conn = get_conn()
+    try:
+        encoded = load_encoded(conn.cursor(), table) or []
+        storage = storage_table(table)
+        report = []
+        for col in encoded:
+            dt = dict_table(table, col)
+            text_bytes, code_bytes = conn.execute(f'''
+                SELECT COALESCE(SUM(LENGTH(CAST(d.value AS BLOB))), 0),
+                       COALESCE(SUM(CASE WHEN s."{col}" IS NULL OR s."{col}" IN (0, 1) THEN 0
+                                         WHEN s."{col}" <= 127 THEN 1
+                                         WHEN s."{col}" <= 32767 THEN 2
+                                         ELSE 3 END), 0)
+                FROM "{storage}" AS s LEFT JOIN "{dt}" AS d ON d.code = s."{col}"
+            ''').fetchone()
+            dict_values, dict_bytes = conn.execute(
+                f'SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(value AS BLOB)) + 2), 0) FROM "{dt}"'
+            ).fetchone()
+            encoded_bytes = code_bytes + dict_bytes
+            report.append({
+                "column": col,
+                "values": dict_values,
+                "text_bytes": text_bytes,
+                "encoded_bytes": encoded_bytes,
+                "saved_pct": round(100 * (1 - encoded_bytes / text_bytes), 1) if text_bytes else 0.0,
+            })
+    finally:
+        conn.close()
+    return report
+
+
+def _view_select(table: str, columns: List[str], encoded: List[str]) -> str:
+    storage = storage_table(table)
+    select, joins = [], []
+    for n, col in enumerate(columns):
+        if col in encoded:
+            alias = f"d{n}"
+            select.append(f'{alias}.value AS "{col}"')
+            joins.append(f'LEFT JOIN "{dict_table(table, col)}" AS {alias} ON {alias}.code = s."{col}"')
+        else:
+            select.append(f's."{col}"')
+    return f'SELECT {", ".join(select)} FROM "{storage}" AS s {" ".join(joins)}'
+
+
+def _ensure_table(cur: sqlite3.Cursor) -> None:
+    cur.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{ENCODINGS_TABLE}" (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            PRIMARY KEY (table_name, column_name)
+        )
+    ''')
@@ -1,96 +1,475 @@
 """
 Exporter module for sqtab.
 
-Provides utilities for exporting SQLite tables to CSV or JSON files.
+Provides utilities for exporting SQLite tables or query results to CSV or
+JSON files. Rows are streamed from the cursor in batches, so memory use
+does not grow with the size of the result.
 """
 
 import csv
+import hashlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from sqtab.db import get_conn
+from typing import Callable, List, Optional
+from urllib.parse import quote
+from sqtab.db import DB_PATH, get_conn
+from sqtab.metrics import Metrics
 import json
 
+# Rows fetched from SQLite per round trip.
+FETCH_SIZE = 10_000
 
-def export_csv(table: str, path: str | Path) -> int:
+EXPORT_FORMATS = ("csv", "json")
+
+
+def export_csv(
+    table: Optional[str],
+    path: str | Path,
+    progress: Optional[Callable[[int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    query: Optional[str] = None,
+) -> int:
     """
-    Export a SQLite table into a CSV file.
+    Export a SQLite table (or query result) into a CSV file.
 
     Parameters
     ----------
-    table : str
-        Name of the SQLite table to export.
+    table : str or None
+        Name of the SQLite table to export. Ignored when ``query`` is given.
     path : str | Path
         Output file path for the CSV file.
+    progress : callable, optional
+        Called as ``progress(rows_done)`` after each written batch.
+    metrics : Metrics, optional
+        Receives phase timings (query, write).
+    query : str, optional
+        SELECT statement to export instead of the whole table.
 
     Returns
     -------
     int
         Number of exported rows.
     """
-    path = Path(path)
+    return _export(_select_sql(table, query), path, CsvSink, progress, metrics)
 
-    conn = get_conn()
-    cur = conn.cursor()
 
-    # Fetch all rows
-    result = cur.execute(f'SELECT * FROM "{table}"')
-    rows = result.fetchall()
+def export_json(
+    table: Optional[str],
+    path: str | Path,
+    progress: Optional[Callable[[int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    query: Optional[str] = None,
+) -> int:
+    """
+    Export a SQLite table (or query result) into a JSON file.
 
-    if not rows:
-        # still produce an empty file with header if table exists
-        headers = [col[0] for col in result.description]
-        _write_csv(path, headers, [])
-        conn.close()
-        return 0
+    The output is a JSON array of objects, written one row at a time.
 
-    headers = [col[0] for col in result.description]
+    Parameters
+    ----------
+    table : str or None
+        Name of the SQLite table to export. Ignored when ``query`` is given.
+    path : str | Path
+        Output file path.
+    progress : callable, optional
+        Called as ``progress(rows_done)`` after each written batch.
+    metrics : Metrics, optional
+        Receives phase timings (query, write).
+    query : str, optional
+        SELECT statement to export instead of the whole table.
 
-    _write_csv(path, headers, rows)
+    Returns
+    -------
+    int
+        Number of exported rows.
+    """
+    return _export(_select_sql(table, query), path, JsonSink, progress, metrics)
 
-    conn.close()
 
-    return len(rows)
+def export_partitioned(
+    table: Optional[str],
+    directory: str | Path,
+    column: str,
+    fmt: str = "csv",
+    progress: Optional[Callable[[int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    query: Optional[str] = None,
+) -> dict:
+    """
+    Write one file per distinct value of ``column``.
 
+    Files are named ``<column>=<value>.<fmt>`` inside ``directory`` (values
+    are percent-encoded where they are not safe in file names; NULL becomes
+    ``__NULL__``). The data is read in a single scan ordered by ``column``,
+    so only one output file is open at a time.
 
-def _write_csv(path: Path, headers: list[str], rows: list[tuple]):
-    """Helper to write CSV file."""
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(rows)
+    Parameters
+    ----------
+    table : str or None
+        Name of the SQLite table to export. Ignored when ``query`` is given.
+    directory : str | Path
+        Output directory, created if needed.
+    column : str
+        Column of the result to partition by.
+    fmt : str
+        "csv" or "json".
+    progress : callable, optional
+        Called as ``progress(rows_done)`` after each batch.
+    metrics : Metrics, optional
+        Receives phase timings (query, write).
+    query : str, optional
+        SELECT statement to export instead of the whole table.
 
+    Returns
+    -------
+    dict
+        Maps each written file path to its number of rows.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    sink_cls = CsvSink if fmt == "csv" else JsonSink
+
+    metrics = metrics or Metrics()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    conn = get_conn()
+    cur = conn.cursor()
+
+    with metrics.phase("query"):
+        result = cur.execute(
+            f'SELECT * FROM ({_select_sql(table, query)}) ORDER BY "{column}"'
+        )
+    columns = [col[0] for col in result.description]
+    if column not in columns:
+        conn.close()
+        raise ValueError(f"Column '{column}' is not part of the exported result.")
+    index = columns.index(column)
+
+    files = {}
+    sink = None
+    name = None
+    total = 0
+
+    try:
+        for rows in _fetch_batches(result, metrics):
+            with metrics.phase("write"):
+                start = 0
+                for i, row in enumerate(rows):
+                    row_name = _partition_name(column, row[index])
+                    if row_name == name:
+                        continue
+                    if sink:
+                        sink.write(rows[start:i])
+                        files[str(sink.path)] += i - start
+                        sink.close()
+                    path = directory / f"{row_name}.{fmt}"
+                    if str(path) in files:
+                        raise ValueError(f"Values of different types map to the same file '{path.name}'.")
+                    name, start = row_name, i
+                    sink = sink_cls(path, columns)
+                    files[str(path)] = 0
+                if sink:
+                    sink.write(rows[start:])
+                    files[str(sink.path)] += len(rows) - start
+            total += len(rows)
+            if progress:
+                progress(total)
+    finally:
+        if sink:
+            sink.close()
+        conn.close()
 
-def export_json(table: str, path: str | Path) -> int:
+    metrics.count("rows", total)
+    metrics.count("files", len(files))
+    metrics.count("bytes", sum(Path(p).stat().st_size for p in files))
+    return files
+
+
+def export_shards(
+    table: str,
+    directory: str | Path,
+    shards: int,
+    fmt: str = "csv",
+    progress: Optional[Callable[[int], None]] = None,
+    metrics: Optional[Metrics] = None,
+) -> dict:
     """
-    Export a SQLite table into a JSON file.
+    Export a table as ``shards`` files written in parallel.
+
+    The table is split into contiguous rowid ranges holding about the same
+    number of rows. Each range is exported by its own process through a
+    read-only connection, to ``part-00000.<fmt>``, ``part-00001.<fmt>``, ...
+    A ``manifest.json`` next to them lists every shard with its rowid
+    range, row count, size and SHA-256 checksum.
 
     Parameters
     ----------
     table : str
         Name of the SQLite table to export.
-    path : str | Path
-        Output file path.
+    directory : str | Path
+        Output directory, created if needed.
+    shards : int
+        Number of shard files (and worker processes).
+    fmt : str
+        "csv" or "json".
+    progress : callable, optional
+        Called as ``progress(rows_done)`` each time a shard is finished.
+    metrics : Metrics, optional
+        Receives phase timings (plan, write).
 
     Returns
     -------
-    int
-        Number of exported rows.
+    dict
+        The manifest.
     """
-    path = Path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    if shards < 1:
+        raise ValueError("The number of shards must be at least 1.")
 
-    conn = get_conn()
-    cur = conn.cursor()
+    metrics = metrics or Metrics()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    with metrics.phase("plan"):
+        conn = get_conn()
+        try:
+            columns = [c[0] for c in conn.execute(f'SELECT * FROM "{table}" LIMIT 0').description]
+            bounds = _rowid_bounds(conn, table, shards)
+        finally:
+            conn.close()
 
-    result = cur.execute(f'SELECT * FROM "{table}"')
-    rows = result.fetchall()
+    db_file = str(DB_PATH.resolve())
+    parts = [None] * len(bounds)
+    total = 0
 
-    if not rows:
-        data = []
-    else:
-        columns = [col[0] for col in result.description]
-        data = [dict(zip(columns, row)) for row in rows]
+    with metrics.phase("write"):
+        with ProcessPoolExecutor(max_workers=len(bounds)) as executor:
+            futures = {
+                executor.submit(
+                    _export_range, db_file, table, lo, hi, str(directory / f"part-{i:05d}.{fmt}"), fmt
+                ): i
+                for i, (lo, hi) in enumerate(bounds)
+            }
+            for future in as_completed(futures):
+                part = future.result()
+                parts[futures[future]] = part
+                total += part["rows"]
+                if progress:
+                    progress(total)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    manifest = {"table": table, "format": fmt, "columns": columns, "rows": total, "shards": parts}
+    with open(directory / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
 
+    metrics.count("rows", total)
+    metrics.count("files", len(parts))
+    metrics.count("bytes", sum(part["bytes"] for part in parts))
+    return manifest
+
+
+def row_count(table: str) -> int:
+    """Return the number of rows in ``table`` (used to size progress bars)."""
+    conn = get_conn()
+    count = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
     conn.close()
-    return len(rows)
+    return count
+
+
+def _export(
+    sql: str,
+    path: str | Path,
+    sink_cls,
+    progress,
+    metrics: Optional[Metrics],
+    conn: Optional[sqlite3.Connection] = None,
+    params: tuple = (),
+) -> int:
+    """Stream the result of ``sql`` into a single file (on ``conn`` if given)."""
+    metrics = metrics or Metrics()
+    path = Path(path)
+
+    own_conn = conn is None
+    conn = conn or get_conn()
+    try:
+        total = write_result(conn, sql, lambda columns: sink_cls(path, columns), progress, metrics, params)
+    finally:
+        if own_conn:
+            conn.close()
+
+    metrics.count("bytes", path.stat().st_size)
+    return total
+
+
+def write_result(
+    conn: sqlite3.Connection,
+    sql: str,
+    open_sink: Callable[[list], object],
+    progress: Optional[Callable[[int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    params: tuple = (),
+) -> int:
+    """
+    Run ``sql`` and stream its rows into a sink in FETCH_SIZE batches.
+
+    ``open_sink(columns)`` returns an object with ``write(rows)`` and
+    ``close()``; it is opened even when there are no rows. Returns the
+    number of rows written.
+    """
+    metrics = metrics or Metrics()
+
+    with metrics.phase("query"):
+        result = conn.cursor().execute(sql, params)
+
+    # still produce a file (header / empty array) if there are no rows
+    sink = open_sink([col[0] for col in result.description])
+    total = 0
+    try:
+        for rows in _fetch_batches(result, metrics):
+            with metrics.phase("write"):
+                sink.write(rows)
+            total += len(rows)
+            if progress:
+                progress(total)
+    finally:
+        sink.close()
+
+    metrics.count("rows", total)
+    return total
+
+
+def _rowid_bounds(conn: sqlite3.Connection, table: str, shards: int) -> List[tuple]:
+    """Split the rowids of ``table`` into at most ``shards`` [lo, hi) ranges of similar size."""
+    try:
+        count = conn.execute(f'SELECT COUNT(rowid) FROM "{table}"').fetchone()[0]
+    except sqlite3.OperationalError as exc:
+        if "no such column" in str(exc):
+            raise ValueError(f"Sharded export needs a rowid on '{table}'.")
+        raise
+
+    if count == 0:
+        return [(None, None)]
+
+    shards = min(shards, count)
+    starts = [
+        conn.execute(
+            f'SELECT rowid FROM "{table}" ORDER BY rowid LIMIT 1 OFFSET ?', (count * i // shards,)
+        ).fetchone()[0]
+        for i in range(shards)
+    ]
+    starts[0] = None  # first shard is open-ended, so nothing is missed
+
+    return [(lo, starts[i + 1] if i + 1 < len(starts) else None) for i, lo in enumerate(starts)]
+
+
+def _export_range(db_file: str, table: str, lo: Optional[int], hi: Optional[int], path: str, fmt: str) -> dict:
+    """Worker: write rows with lo <= rowid < hi to ``path`` and describe the file."""
+    conn = sqlite3.connect(f"{Path(db_file).as_uri()}?mode=ro", uri=True)
+    try:
+        where, params = [], []
+        if lo is not None:
+            where.append("rowid >= ?")
+            params.append(lo)
+        if hi is not None:
+            where.append("rowid < ?")
+            params.append(hi)
+        sql = f'SELECT * FROM "{table}"'
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+
+        result = conn.execute(sql + " ORDER BY rowid", params)
+        sink = (CsvSink if fmt == "csv" else JsonSink)(Path(path), [c[0] for c in result.description])
+        rows = 0
+        try:
+            for batch in _fetch_batches(result, Metrics()):
+                sink.write(batch)
+                rows += len(batch)
+        finally:
+            sink.close()
+    finally:
+        conn.close()
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+    return {
+        "file": Path(path).name,
+        "rowid_from": lo,
+        "rowid_to": hi,
+        "rows": rows,
+        "bytes": Path(path).stat().st_size,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def _select_sql(table: Optional[str], query: Optional[str]) -> str:
+    if query:
+        return query.strip().rstrip(";")
+    if not table:
+        raise ValueError("Either a table or a query is required.")
+    return f'SELECT * FROM "{table}"'
+
+
+def _partition_name(column: str, value) -> str:
+    if value is None:
+        return f"{column}=__NULL__"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # 1 and 1.0 compare equal and sort together
+    return f"{column}={quote(str(value), safe=' -_.,+@')}"
+
+
+def _fetch_batches(result, metrics: Metrics):
+    """Yield lists of up to FETCH_SIZE rows from an executed cursor."""
+    while True:
+        with metrics.phase("query"):
+            rows = result.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+class CsvSink:
+    """CSV output file: header on open, rows appended per batch."""
+
+    def __init__(self, path: Path, columns: list):
+        self.path = path
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class JsonSink:
+    """JSON array output file, written one element at a time."""
+
+    def __init__(self, path: Path, columns: list):
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+        self.count = 0
+
+    def write(self, rows) -> None:
+        for row in rows:
+            self.file.write(",\n" if self.count else "[\n")
+            self.file.write(_json_item(dict(zip(self.columns, row))))
+            self.count += 1
+
+    def close(self) -> None:
+        # Same layout as json.dump(rows, indent=2)
+        self.file.write("\n]" if self.count else "[]")
+        self.file.close()
+
+
+def _json_item(obj: dict) -> str:
+    """Render one array element exactly as json.dump(..., indent=2) would."""
+    text = json.dumps(obj, indent=2, ensure_ascii=False)
+    return "\n".join("  " + line for line in text.splitlines())
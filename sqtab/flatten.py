@@ -0,0 +1,225 @@
+"""
+Flattened JSON import for sqtab.
+
+``import --flatten`` reads a JSON file record by record instead of loading
+it whole, and stores nested data as native columns and tables:
+
+- nested objects become ``parent__child`` columns;
+- arrays become child tables named ``<table>__<field>``, one row per
+  element, linked to their parent row by ``_parent_id`` (the parent's
+  generated ``_id``) and ordered by ``_index``; arrays of scalars get a
+  ``value`` column;
+- nesting deeper than ``max_depth`` levels is stored as JSON text.
+
+Input fields named like the generated columns (``_id``, ``_parent_id``,
+``_index``) are stored with a trailing underscore (``_id_``).
+
+Columns are added as new keys appear, so records need not share a shape.
+The input may be a JSON array of objects, a single object or JSON Lines.
+"""
+
+import json
+import sqlite3
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqtab.importer import BATCH_SIZE, COMMIT_EVERY, normalize_column
+
+# Default number of nested levels expanded into columns and child tables.
+FLATTEN_DEPTH = 3
+
+# Separator between the parts of a flattened column or child table name.
+SEPARATOR = "__"
+
+# Columns generated for every flattened table.
+GENERATED_COLUMNS = ("_id", "_parent_id", "_index")
+
+# Bytes read from the input at a time.
+READ_SIZE = 1 << 20
+
+
+def iter_json_records(f) -> Iterator[dict]:
+    """
+    Yield the objects of a JSON array, a single object or JSON Lines from
+    the text file ``f``, reading READ_SIZE characters at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    in_array = None
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(READ_SIZE)
+        buffer, pos = buffer[pos:] + chunk, 0
+        eof = not chunk
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                break
+            fill()
+            continue
+
+        if in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buffer[pos] == "]":
+            break
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError("Invalid JSON: the file ends inside a record.")
+            fill()
+            continue
+        if not isinstance(value, dict):
+            raise ValueError("Invalid JSON format. Expected object or list of objects.")
+        pos = end
+        yield value
+
+
+class _TableWriter:
+    """Buffered rows of one output table; adds columns as they appear."""
+
+    def __init__(self, cur: sqlite3.Cursor, name: str, child: bool):
+        self.cur = cur
+        self.name = name
+        self.rows: List[dict] = []
+        self.written = 0
+        self.columns = [c[1] for c in cur.execute(f'PRAGMA table_info("{name}")').fetchall()]
+        if not self.columns:
+            link = ', "_parent_id" INTEGER, "_index" INTEGER' if child else ""
+            cur.execute(f'CREATE TABLE "{name}" ("_id" INTEGER PRIMARY KEY{link})')
+            if child:
+                cur.execute(f'CREATE INDEX "{name}__parent" ON "{name}" ("_parent_id")')
+            self.columns = [c[1] for c in cur.execute(f'PRAGMA table_info("{name}")').fetchall()]
+        elif "_id" not in self.columns:
+            raise ValueError(f"Table '{name}' was not created by a flattened import (no _id column).")
+        self.next_id = (cur.execute(f'SELECT MAX("_id") FROM "{name}"').fetchone()[0] or 0) + 1
+
+    def add(self, row: dict) -> int:
+        row["_id"] = self.next_id
+        self.next_id += 1
+        self.rows.append(row)
+        return row["_id"]
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        known = set(self.columns)
+        for row in self.rows:
+            for column in row:
+                if column not in known:
+                    self.cur.execute(f'ALTER TABLE "{self.name}" ADD COLUMN "{column}"')
+                    self.columns.append(column)
+                    known.add(column)
+
+        names = ", ".join(f'"{c}"' for c in self.columns)
+        placeholders = ", ".join("?" * len(self.columns))
+        self.cur.executemany(
+            f'INSERT INTO "{self.name}" ({names}) VALUES ({placeholders})',
+            ([row.get(c) for c in self.columns] for row in self.rows),
+        )
+        self.written += len(self.rows)
+        self.rows = []
+
+
+class JsonFlattener:
+    """Flatten records into ``table`` and its child tables (see module docstring)."""
+
+    def __init__(self, cur: sqlite3.Cursor, table: str, max_depth: int = FLATTEN_DEPTH):
+        if max_depth < 0:
+            raise ValueError("The flatten depth must be 0 or more.")
+        self.cur = cur
+        self.table = table
+        self.max_depth = max_depth
+        self.writers: Dict[str, _TableWriter] = {table: _TableWriter(cur, table, child=False)}
+        # child table -> the table its _parent_id refers to
+        self.parents: Dict[str, str] = {}
+
+    def add(self, record: dict) -> None:
+        self._add_row(self.writers[self.table], record, 0, {})
+
+    def flush(self) -> None:
+        for writer in self.writers.values():
+            writer.flush()
+
+    def child_tables(self) -> Dict[str, dict]:
+        """``{"parent", "rows"}`` of each child table, in creation order."""
+        return {
+            name: {"parent": parent, "rows": self.writers[name].written}
+            for name, parent in self.parents.items()
+        }
+
+    def _add_row(self, writer: _TableWriter, obj: dict, level: int, row: dict) -> None:
+        arrays = []
+        self._fill(row, obj, "", level, arrays)
+        row_id = writer.add(row)
+
+        for name, items, item_level in arrays:
+            child_name = f"{writer.name}{SEPARATOR}{name}"
+            child = self.writers.get(child_name)
+            if child is None:
+                child = self.writers[child_name] = _TableWriter(self.cur, child_name, child=True)
+                self.parents[child_name] = writer.name
+            for index, item in enumerate(items):
+                link = {"_parent_id": row_id, "_index": index}
+                self._add_row(child, item if isinstance(item, dict) else {"value": item}, item_level, link)
+
+    def _fill(self, row: dict, obj: dict, prefix: str, level: int, arrays: list) -> None:
+        for key, value in obj.items():
+            name = prefix + normalize_column(str(key))
+            if name in GENERATED_COLUMNS:
+                name += "_"
+            if isinstance(value, dict):
+                if level < self.max_depth:
+                    self._fill(row, value, name + SEPARATOR, level + 1, arrays)
+                else:
+                    row[name] = json.dumps(value, ensure_ascii=False)
+            elif isinstance(value, list):
+                if level < self.max_depth:
+                    arrays.append((name, value, level + 1))
+                else:
+                    row[name] = json.dumps(value, ensure_ascii=False)
+            else:
+                row[name] = value
+
+
+def import_flattened(
+    conn: sqlite3.Connection,
+    path: str,
+    table: str,
+    max_depth: int = FLATTEN_DEPTH,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Stream the records of the JSON file ``path`` into ``table``, flushing
+    every BATCH_SIZE records and committing every COMMIT_EVERY.
+
+    ``progress(bytes_read, records)`` is called after each flush. Returns
+    ``{"rows": records, "child_tables": {name: {"parent", "rows"}}}``.
+    """
+    cur = conn.cursor()
+    flattener = JsonFlattener(cur, table, max_depth)
+    rows = 0
+    try:
+        with open(path, encoding="utf-8") as f:
+            for record in iter_json_records(f):
+                flattener.add(record)
+                rows += 1
+                if rows % BATCH_SIZE == 0:
+                    flattener.flush()
+                    if rows % COMMIT_EVERY == 0:
+                        conn.commit()
+                    if progress:
+                        progress(f.buffer.tell(), rows)
+        flattener.flush()
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {"rows": rows, "child_tables": flattener.child_tables()}
@@ -0,0 +1,330 @@
+"""
+NumPy / pandas / Arrow bridge for sqtab.
+
+Query results are fetched in batches and converted column by column, so a
+result never exists as a list of Python tuples in full:
+
+- ``fetch_arrays``: ``{column: numpy.ndarray}``
+- ``fetch_frame``: ``pandas.DataFrame``
+- ``fetch_arrow``: ``pyarrow.Table``
+
+Column dtypes come from ``dtypes``: a dict, or a table name whose schema
+is used (see table_dtypes). Other columns are inferred from the first
+batch. Integer and boolean columns that turn out to hold NULLs become
+float64 with NaN in NumPy and pandas; Arrow keeps them as nullable.
+
+``import_frame`` loads a DataFrame into a table, converting whole columns
+at a time and writing them in ``executemany`` batches.
+
+The libraries are optional: ``pip install 'sqtab[numpy]'``,
+``'sqtab[pandas]'`` or ``'sqtab[arrow]'``.
+"""
+
+import importlib
+import sqlite3
+from typing import Dict, List, Optional, Union
+
+from sqtab.exporter import FETCH_SIZE
+from sqtab.importer import (
+    BATCH_SIZE,
+    MERGE_MODES,
+    check_table_columns,
+    ensure_unique_index,
+    normalize_column,
+    table_exists,
+    write_rows,
+)
+from sqtab.typed import STORAGE, load_kinds, require_strict, save_kinds
+
+# NumPy dtype for each typed-storage kind (see sqtab.typed).
+KIND_DTYPES = {
+    "integer": "int64",
+    "real": "float64",
+    "boolean": "bool",
+    "date": "datetime64[s]",
+    "timestamp": "datetime64[s]",
+    "text": "object",
+}
+
+# Arrow type names for the NumPy dtypes above.
+_ARROW_TYPES = {
+    "int64": "int64",
+    "float64": "float64",
+    "bool": "bool_",
+    "datetime64[s]": "timestamp",
+}
+
+Dtypes = Optional[Union[str, Dict[str, str]]]
+
+
+def table_dtypes(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+    """
+    NumPy dtype of every column of ``table``.
+
+    Typed tables use their recorded kinds (dates and timestamps become
+    ``datetime64[s]``, booleans ``bool``); other tables use SQLite's type
+    affinity of the declared type.
+    """
+    info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    if not info:
+        raise ValueError(f"Table '{table}' does not exist.")
+    kinds = load_kinds(conn.cursor(), table) or {}
+    return {
+        c[1]: KIND_DTYPES[kinds[c[1]]] if c[1] in kinds else _affinity_dtype(c[2])
+        for c in info
+    }
+
+
+def fetch_arrays(
+    conn: sqlite3.Connection,
+    sql: str,
+    params=(),
+    dtypes: Dtypes = None,
+    batch_size: int = FETCH_SIZE,
+) -> dict:
+    """Run ``sql`` and return ``{column: numpy.ndarray}``."""
+    np = _require("numpy", "numpy")
+    columns, batches = _query(conn, sql, params, dtypes, batch_size)
+    chunks = []
+    for dtype_list, batch in batches:
+        chunks.append([_to_array(np, values, dtype) for values, dtype in zip(zip(*batch), dtype_list)])
+
+    if not chunks:
+        found = _resolve_dtypes(conn, columns, dtypes, [])
+        return {name: np.empty(0, dtype=dtype) for name, dtype in zip(columns, found)}
+    if len(chunks) == 1:
+        return dict(zip(columns, chunks[0]))
+    return {name: np.concatenate([chunk[i] for chunk in chunks]) for i, name in enumerate(columns)}
+
+
+def fetch_frame(
+    conn: sqlite3.Connection,
+    sql: str,
+    params=(),
+    dtypes: Dtypes = None,
+    batch_size: int = FETCH_SIZE,
+):
+    """Run ``sql`` and return a ``pandas.DataFrame``."""
+    pd = _require("pandas", "pandas")
+    arrays = fetch_arrays(conn, sql, params, dtypes, batch_size)
+    return pd.DataFrame(arrays, copy=False)
+
+
+def fetch_arrow(
+    conn: sqlite3.Connection,
+    sql: str,
+    params=(),
+    dtypes: Dtypes = None,
+    batch_size: int = FETCH_SIZE,
+):
+    """Run ``sql`` and return a ``pyarrow.Table`` built one record batch per fetch."""
+    pa = _require("pyarrow", "arrow")
+    columns, batches = _query(conn, sql, params, dtypes, batch_size)
+    types, record_batches = None, []
+    for dtype_list, batch in batches:
+        if types is None:
+            types = [_arrow_type(pa, dtype, values) for dtype, values in zip(dtype_list, zip(*batch))]
+        arrays = [_arrow_array(pa, values, t) for values, t in zip(zip(*batch), types)]
+        record_batches.append(pa.RecordBatch.from_arrays(arrays, names=columns))
+
+    if not record_batches:
+        found = _resolve_dtypes(conn, columns, dtypes, [])
+        schema = pa.schema([(name, _arrow_type(pa, dtype, ())) for name, dtype in zip(columns, found)])
+        return schema.empty_table()
+    return pa.Table.from_batches(record_batches)
+
+
+def import_frame(
+    conn: sqlite3.Connection,
+    frame,
+    table: str,
+    key: Optional[Union[str, List[str]]] = None,
+    mode: str = "upsert",
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """
+    Load a pandas DataFrame into ``table`` and commit.
+
+    A new table is created STRICT with the kinds of the frame's dtypes
+    (see sqtab.typed), so datetime columns are stored as Unix seconds and
+    read back as ``datetime64[s]``. NaN, NaT and missing values become
+    NULL. Columns of an existing table are matched by name, so the frame
+    may hold any of them in any order. With ``key`` rows are merged
+    instead of appended (see importer.merge_file).
+
+    Returns the row counts: rows, inserted, updated, unchanged.
+    """
+    _require("pandas", "pandas")
+    if key is not None and mode not in MERGE_MODES:
+        raise ValueError(f"Unknown merge mode '{mode}'. Use one of: {', '.join(MERGE_MODES)}.")
+    if isinstance(key, str):
+        key = [normalize_column(k) for k in key.split(",") if k.strip()]
+
+    names = [normalize_column(str(c)) for c in frame.columns]
+    if len(set(names)) != len(names):
+        raise ValueError("DataFrame column names are not unique after normalization.")
+    series = [frame.iloc[:, i] for i in range(len(names))]
+    kinds = [_series_kind(s) for s in series]
+
+    cur = conn.cursor()
+    counts = {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    try:
+        if table_exists(cur, table):
+            check_table_columns(cur, table, names)
+        else:
+            require_strict()
+            col_defs = ", ".join(f'"{n}" {STORAGE[k]}' for n, k in zip(names, kinds))
+            cur.execute(f'CREATE TABLE "{table}" ({col_defs}) STRICT')
+            save_kinds(cur, table, names, kinds)
+        if key is not None:
+            ensure_unique_index(cur, table, key)
+
+        columns = [_column_values(s, kind) for s, kind in zip(series, kinds)]
+        for start in range(0, len(frame), batch_size):
+            rows = list(zip(*(values[start:start + batch_size] for values in columns)))
+            written = write_rows(cur, table, names, rows, key=key, mode=mode)
+            for name in counts:
+                counts[name] += written[name]
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return counts
+
+
+def _query(conn, sql, params, dtypes, batch_size):
+    """
+    Run ``sql``; return its column names and an iterator of ``(dtypes, rows)``
+    batches, with dtypes resolved from the first batch.
+    """
+    cur = conn.execute(sql, params)
+    columns = [c[0] for c in cur.description] if cur.description else []
+
+    def batches():
+        found = None
+        try:
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    return
+                if found is None:
+                    found = _resolve_dtypes(conn, columns, dtypes, batch)
+                yield found, batch
+        finally:
+            cur.close()
+
+    return columns, batches()
+
+
+def _resolve_dtypes(conn, columns, dtypes: Dtypes, batch) -> list:
+    """Dtype per result column: given, from the named table, or inferred from ``batch``."""
+    known = table_dtypes(conn, dtypes) if isinstance(dtypes, str) else dict(dtypes or {})
+    if not batch:
+        return [known.get(name, "object") for name in columns]
+    return [
+        known[name] if name in known else _infer_dtype(values)
+        for name, values in zip(columns, zip(*batch))
+    ]
+
+
+def _infer_dtype(values) -> str:
+    seen = {type(v) for v in values if v is not None}
+    if seen and seen <= {int}:
+        return "int64"
+    if seen and seen <= {int, float}:
+        return "float64"
+    return "object"
+
+
+def _affinity_dtype(declared: str) -> str:
+    """NumPy dtype for SQLite's affinity of a declared column type."""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return "int64"
+    if any(word in declared for word in ("REAL", "FLOA", "DOUB")):
+        return "float64"
+    return "object"
+
+
+def _to_array(np, values, dtype: str):
+    """One column of a batch as an array, widening when NULLs or other types appear."""
+    try:
+        return np.array(values, dtype=dtype)
+    except (TypeError, ValueError, OverflowError):
+        pass
+    if dtype in ("int64", "bool"):
+        try:
+            return np.array(values, dtype="float64")  # NULL -> NaN
+        except (TypeError, ValueError):
+            pass
+    return np.array(values, dtype="object")
+
+
+def _arrow_type(pa, dtype: str, values):
+    name = _ARROW_TYPES.get(dtype)
+    if name == "timestamp":
+        return pa.timestamp("s")
+    if name:
+        return getattr(pa, name)()
+    inferred = pa.array(values).type if values else pa.null()
+    return pa.string() if pa.types.is_null(inferred) else inferred
+
+
+def _arrow_array(pa, values, arrow_type):
+    # Booleans and timestamps are stored as integers; cast from int64.
+    if pa.types.is_boolean(arrow_type) or pa.types.is_timestamp(arrow_type):
+        return pa.array(values, type=pa.int64()).cast(arrow_type)
+    return pa.array(values, type=arrow_type)
+
+
+def _series_kind(series) -> str:
+    """Typed-storage kind of a pandas column."""
+    kind = series.dtype.kind
+    if kind == "b":
+        return "boolean"
+    if kind in "iu":
+        return "integer"
+    if kind == "f":
+        return "real"
+    if kind == "M":
+        return "timestamp"
+    return "text"
+
+
+def _column_values(series, kind: str) -> list:
+    """A whole column as a list of Python values ready for SQLite, NULL for missing."""
+    np = _require("numpy", "numpy")
+    pd = _require("pandas", "pandas")
+
+    if kind == "timestamp":
+        if getattr(series.dtype, "tz", None) is not None:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        array = series.to_numpy(dtype="datetime64[s]")
+        missing = np.isnat(array)
+        array = array.astype("int64")
+    elif isinstance(series.dtype, np.dtype) and kind in ("integer", "real", "boolean"):
+        array = series.to_numpy()
+        missing = np.isnan(array) if kind == "real" else None
+        if kind == "boolean":
+            array = array.astype("int64")
+    else:
+        # object, string and pandas extension dtypes (Int64, boolean, ...)
+        array = series.to_numpy(dtype=object)
+        missing = pd.isna(array)
+        if kind == "boolean":
+            array = np.where(missing, None, array)
+            return [None if v is None else int(v) for v in array.tolist()]
+
+    if missing is not None and missing.any():
+        array = np.where(missing, None, array.astype(object))
+    return array.tolist()
+
+
+def _require(module: str, extra: str):
+    """Import an optional dependency or explain how to install it."""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(
+            f"{module} is required for this feature; install it with: pip install 'sqtab[{extra}]'"
+        ) from None
@@ -0,0 +1,184 @@
+"""
+Full-text search for sqtab.
+
+Builds SQLite FTS5 indexes over text columns of a table. Indexes use
+external content (the table itself stores the text, the index only stores
+tokens) and are kept in sync by insert/update/delete triggers. Searches
+return BM25-ranked rows with a highlighted snippet.
+
+The index for table ``t`` is the virtual table ``_sqtab_fts_t``.
+"""
+
+import sqlite3
+from typing import List, Optional, Tuple
+
+from sqtab.db import INTERNAL_PREFIX, get_conn
+
+FTS_PREFIX = f"{INTERNAL_PREFIX}fts_"
+
+
+def index_name(table: str) -> str:
+    return f"{FTS_PREFIX}{table}"
+
+
+def build_index(table: str, columns: List[str]) -> int:
+    """
+    Create (or rebuild) the FTS5 index of ``table`` over ``columns``.
+
+    Returns
+    -------
+    int
+        Number of indexed rows.
+    """
+    if not columns:
+        raise ValueError("At least one column is required for a full-text index.")
+
+    conn = get_conn()
+    try:
+        _require_fts5(conn)
+        _check_columns(conn, table, columns)
+
+        fts = index_name(table)
+        col_list = ", ".join(f'"{c}"' for c in columns)
+        new_values = ", ".join(f'new."{c}"' for c in columns)
+        old_values = ", ".join(f'old."{c}"' for c in columns)
+
+        conn.execute("BEGIN IMMEDIATE")
+        _drop(conn, table)
+        conn.execute(
+            f'CREATE VIRTUAL TABLE "{fts}" USING fts5({col_list}, '
+            f"content='{table.replace(chr(39), chr(39) * 2)}', content_rowid='rowid')"
+        )
+        conn.execute(f"INSERT INTO \"{fts}\"(\"{fts}\") VALUES ('rebuild')")
+
+        conn.execute(f'''
+            CREATE TRIGGER "{fts}_ai" AFTER INSERT ON "{table}" BEGIN
+                INSERT INTO "{fts}"(rowid, {col_list}) VALUES (new.rowid, {new_values});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER "{fts}_ad" AFTER DELETE ON "{table}" BEGIN
+                INSERT INTO "{fts}"("{fts}", rowid, {col_list}) VALUES ('delete', old.rowid, {old_values});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER "{fts}_au" AFTER UPDATE ON "{table}" BEGIN
+                INSERT INTO "{fts}"("{fts}", rowid, {col_list}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO "{fts}"(rowid, {col_list}) VALUES (new.rowid, {new_values});
+            END
+        ''')
+
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return rows
+
+
+def ensure_index(table: str, columns: List[str]) -> Optional[int]:
+    """
+    Make sure ``table`` has an index over exactly ``columns``.
+
+    An existing matching index is already in sync through its triggers, so
+    nothing is done and None is returned. Otherwise the index is (re)built
+    and the number of indexed rows is returned.
+    """
+    if indexed_columns(table) == list(columns):
+        return None
+    return build_index(table, columns)
+
+
+def drop_index(table: str) -> None:
+    """Remove the full-text index and triggers of ``table``."""
+    conn = get_conn()
+    try:
+        _drop(conn, table)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def indexed_columns(table: str) -> Optional[List[str]]:
+    """Return the columns covered by the index of ``table``, or None."""
+    conn = get_conn()
+    try:
+        if not _exists(conn, index_name(table)):
+            return None
+        cols = conn.execute(f'PRAGMA table_info("{index_name(table)}")').fetchall()
+    finally:
+        conn.close()
+    return [c[1] for c in cols]
+
+
+def search(table: str, query: str, limit: int = 20) -> Tuple[List[str], list]:
+    """
+    Run an FTS5 ``query`` against the index of ``table``.
+
+    Returns ``(columns, rows)``: the table's columns followed by ``score``
+    (BM25, lower is better) and ``snippet``, best matches first.
+    """
+    fts = index_name(table)
+
+    conn = get_conn()
+    try:
+        if not _exists(conn, fts):
+            raise ValueError(
+                f"Table '{table}' has no full-text index. Create one with: sqtab fts build {table} COLUMNS"
+            )
+
+        cur = conn.execute(
+            f'''
+            SELECT t.*, bm25("{fts}") AS score,
+                   snippet("{fts}", -1, '[', ']', '...', 12) AS snippet
+            FROM "{fts}"
+            JOIN "{table}" AS t ON t.rowid = "{fts}".rowid
+            WHERE "{fts}" MATCH ?
+            ORDER BY score
+            LIMIT ?
+            ''',
+            (query, limit),
+        )
+        columns = [col[0] for col in cur.description]
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return columns, rows
+
+
+def _drop(conn: sqlite3.Connection, table: str) -> None:
+    fts = index_name(table)
+    for suffix in ("ai", "ad", "au"):
+        conn.execute(f'DROP TRIGGER IF EXISTS "{fts}_{suffix}"')
+    conn.execute(f'DROP TABLE IF EXISTS "{fts}"')
+
+
+def _exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone() is not None
+
+
+def _check_columns(conn: sqlite3.Connection, table: str, columns: List[str]) -> None:
+    existing = [c[1] for c in conn.execute(f'PRAGMA table_info("{table}")').fetchall()]
+    if not existing:
+        raise ValueError(f"Table '{table}' does not exist.")
+
+    missing = [c for c in columns if c not in existing]
+    if missing:
+        raise ValueError(f"Column(s) not found in table '{table}': {', '.join(missing)}")
+
+    try:
+        conn.execute(f'SELECT rowid FROM "{table}" LIMIT 0')
+    except sqlite3.OperationalError:
+        raise ValueError(f"Full-text indexes need a rowid on '{table}'.")
+
+
+def _require_fts5(conn: sqlite3.Connection) -> None:
+    options = {row[0] for row in conn.execute("PRAGMA compile_options")}
+    if "ENABLE_FTS5" not in options:
+        raise ValueError("This SQLite build does not include FTS5.")
@@ -0,0 +1,217 @@
+"""
+Statistical SQL functions for sqtab.
+
+SQLite has no median, percentile or standard deviation. Every connection
+from ``get_conn`` gets these functions, so they work in ``sqtab sql``,
+in SQL generated by ``sql-ai`` and in the analyzer:
+
+- ``median(x)``, ``percentile(x, p)``: linear interpolation between the
+  closest values, ``p`` from 0 to 100 (like ``percentile_cont``).
+- ``stddev(x)``, ``variance(x)``: sample standard deviation and variance,
+  computed in one pass (Welford).
+- ``mode(x)``: most frequent value; ties go to the value seen first.
+- ``approx_count_distinct(x)``: exact up to EXACT_DISTINCT_LIMIT distinct
+  values, then a HyperLogLog estimate (about 1% error) in 16 KB.
+- ``regexp(pattern, x)``, which also makes ``x REGEXP 'pattern'`` work,
+  using Python regular expressions. Compiled patterns are cached.
+
+NULLs are ignored by the aggregates, and so are non-numeric values by the
+numeric ones. Aggregates over no rows return NULL.
+"""
+
+import math
+import re
+import sqlite3
+from collections import Counter
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Optional
+
+# Distinct values counted exactly before approx_count_distinct switches to
+# a HyperLogLog sketch.
+EXACT_DISTINCT_LIMIT = 10_000
+
+# HyperLogLog precision: 2**14 registers, standard error 1.04 / 2**7 ≈ 0.8%.
+HLL_PRECISION = 14
+
+# Short description of every function, for AI prompts.
+FUNCTION_DOCS = [
+    "median(x)",
+    "percentile(x, p) with p from 0 to 100",
+    "stddev(x) and variance(x) (sample)",
+    "mode(x) (most frequent value)",
+    "approx_count_distinct(x)",
+    "x REGEXP 'pattern' (Python regular expression)",
+]
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """Add sqtab's SQL functions to ``conn``."""
+    conn.create_function("regexp", 2, regexp, deterministic=True)
+    conn.create_aggregate("median", 1, _Median)
+    conn.create_aggregate("percentile", 2, _Percentile)
+    conn.create_aggregate("stddev", 1, _Stddev)
+    conn.create_aggregate("variance", 1, _Variance)
+    conn.create_aggregate("mode", 1, _Mode)
+    conn.create_aggregate("approx_count_distinct", 1, _ApproxCountDistinct)
+
+
+def regexp(pattern: str, value) -> Optional[int]:
+    """1 if ``pattern`` matches anywhere in ``value``, 0 if not, NULL for NULL."""
+    if pattern is None or value is None:
+        return None
+    if not isinstance(value, str):
+        value = str(value)
+    return 1 if _compile(pattern).search(value) else 0
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+def _number(value) -> Optional[float]:
+    """``value`` as a number, or None for NULL and non-numeric text."""
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _interpolate(values: list, fraction: float):
+    """Value at ``fraction`` (0-1) of the sorted ``values``, interpolated linearly."""
+    if not values:
+        return None
+    values.sort()
+    position = fraction * (len(values) - 1)
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    weight = position - low
+    if weight == 0:
+        return values[low]
+    return values[low] + (values[high] - values[low]) * weight
+
+
+class _Median:
+    def __init__(self):
+        self.values = []
+
+    def step(self, value):
+        value = _number(value)
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return _interpolate(self.values, 0.5)
+
+
+class _Percentile:
+    def __init__(self):
+        self.values = []
+        self.fraction = None
+
+    def step(self, value, p):
+        if self.fraction is None:
+            if p is None or not 0 <= p <= 100:
+                raise ValueError("percentile: p must be between 0 and 100")
+            self.fraction = p / 100
+        value = _number(value)
+        if value is not None:
+            self.values.append(value)
+
+    def finalize(self):
+        return _interpolate(self.values, self.fraction or 0.0)
+
+
+class _Variance:
+    """Running sample variance (Welford)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def step(self, value):
+        value = _number(value)
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else None
+
+
+class _Stddev(_Variance):
+    def finalize(self):
+        variance = super().finalize()
+        return math.sqrt(variance) if variance is not None else None
+
+
+class _Mode:
+    def __init__(self):
+        self.counts = Counter()
+
+    def step(self, value):
+        if value is not None:
+            self.counts[value] += 1
+
+    def finalize(self):
+        if not self.counts:
+            return None
+        return self.counts.most_common(1)[0][0]
+
+
+class _ApproxCountDistinct:
+    def __init__(self):
+        self.exact = set()
+        self.registers = None
+
+    def step(self, value):
+        if value is None:
+            return
+        if self.registers is None:
+            self.exact.add(value)
+            if len(self.exact) > EXACT_DISTINCT_LIMIT:
+                self.registers = bytearray(1 << HLL_PRECISION)
+                for seen in self.exact:
+                    self._add(seen)
+                self.exact = None
+        else:
+            self._add(value)
+
+    def _add(self, value):
+        h = int.from_bytes(blake2b(_hash_key(value), digest_size=8).digest(), "big")
+        index = h >> (64 - HLL_PRECISION)
+        rest = h & ((1 << (64 - HLL_PRECISION)) - 1)
+        rank = 64 - HLL_PRECISION - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def finalize(self):
+        if self.registers is None:
+            return len(self.exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return round(estimate)
+
+
+def _hash_key(value) -> bytes:
+    """Bytes identifying ``value``; 1 and 1.0 are the same value, as in SQLite."""
+    if isinstance(value, bytes):
+        return b"b" + value
+    if isinstance(value, str):
+        return b"s" + value.encode("utf-8")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return b"n" + repr(value).encode("ascii")
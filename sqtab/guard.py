@@ -0,0 +1,228 @@
+"""
+Query guards for sqtab.
+
+``sql`` and ``sql-ai`` run statements inside a QueryGuard:
+
+- ``--timeout SECONDS`` stops a statement that runs too long. A SQLite
+  progress handler checks the deadline every PROGRESS_STEPS virtual machine
+  instructions and aborts the statement once it has passed.
+- Ctrl-C calls ``Connection.interrupt()`` instead of killing the process
+  mid-statement; the transaction is rolled back and QueryCancelled raised.
+- ``--max-rows`` stops fetching once that many rows have been read.
+
+``plan_warnings`` inspects ``EXPLAIN QUERY PLAN`` without running the
+statement, so generated SQL can be checked for unbounded full scans and
+cartesian products first. Nested full scans are not always a cartesian
+product: after ANALYZE, SQLite joins small tables by scanning both. The
+statement's bytecode tells whether a condition links the scanned tables,
+and ``sqlite_stat1`` how many rows they hold.
+"""
+
+import re
+import signal
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# Virtual machine instructions between two deadline checks.
+PROGRESS_STEPS = 10_000
+
+# Row combinations above which joined full scans are refused like a
+# cartesian product.
+CARTESIAN_ROWS = 1_000_000
+
+# Bytecode comparisons; one between columns of two tables joins them.
+_COMPARISONS = {"Eq", "Ne", "Lt", "Le", "Gt", "Ge"}
+
+# Bytecode that loads a constant into register p2.
+_CONSTANTS = {"Integer", "Int64", "Real", "String8", "String", "Null"}
+
+_LIMIT = re.compile(r"\blimit\s+\d+(\s*(offset|,)\s*\d+)?\s*;?\s*$", re.IGNORECASE)
+
+
+class QueryCancelled(sqlite3.OperationalError):
+    """A statement was stopped by its timeout or by Ctrl-C."""
+
+    def __init__(self, message: str, timed_out: bool):
+        super().__init__(message)
+        self.timed_out = timed_out
+
+
+class QueryGuard:
+    """
+    Context manager bounding the statements run on ``conn``.
+
+    Inside the block, a statement running past ``timeout`` seconds (None or
+    0 = no limit) or interrupted by Ctrl-C raises QueryCancelled, after the
+    connection has been rolled back.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, timeout: Optional[float] = None):
+        self.conn = conn
+        self.timeout = timeout or None
+        self.deadline = None
+        self.cancelled = False
+        self._previous_sigint = None
+
+    def __enter__(self):
+        if self.timeout:
+            self.deadline = time.monotonic() + self.timeout
+        self.conn.set_progress_handler(self._progress, PROGRESS_STEPS)
+        if threading.current_thread() is threading.main_thread():
+            self._previous_sigint = signal.signal(signal.SIGINT, self._on_sigint)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.set_progress_handler(None, 0)
+        if self._previous_sigint is not None:
+            signal.signal(signal.SIGINT, self._previous_sigint)
+            self._previous_sigint = None
+
+        stopped = self.cancelled or (self.deadline is not None and time.monotonic() > self.deadline)
+        if exc_type is not None and issubclass(exc_type, sqlite3.OperationalError) and stopped:
+            self.conn.rollback()
+            if self.cancelled:
+                raise QueryCancelled("Query cancelled.", timed_out=False) from exc
+            raise QueryCancelled(f"Query timed out after {self.timeout:g}s.", timed_out=True) from exc
+        return False
+
+    def _progress(self) -> int:
+        # A non-zero return value makes SQLite abort the running statement.
+        if self.cancelled:
+            return 1
+        return int(self.deadline is not None and time.monotonic() > self.deadline)
+
+    def _on_sigint(self, signum, frame):
+        self.cancelled = True
+        self.conn.interrupt()
+
+
+def fetch_rows(cur: sqlite3.Cursor, max_rows: Optional[int] = None) -> Tuple[list, bool]:
+    """
+    Fetch the rows of an executed statement, at most ``max_rows`` of them.
+
+    Returns ``(rows, truncated)``; ``truncated`` is True when more rows
+    were available.
+    """
+    if not max_rows:
+        return cur.fetchall(), False
+    rows = cur.fetchmany(max_rows + 1)
+    return rows[:max_rows], len(rows) > max_rows
+
+
+def plan_warnings(conn: sqlite3.Connection, sql: str) -> Tuple[List[str], bool]:
+    """
+    Check the query plan of ``sql`` without running it.
+
+    Returns ``(warnings, dangerous)``. Full table scans in a statement
+    without LIMIT are warned about, and so are nested full scans.
+    ``dangerous`` is True when nested full scans are a cartesian product
+    (no condition links the tables), or when the row counts in
+    ``sqlite_stat1`` make the combinations exceed CARTESIAN_ROWS.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+
+    scans = defaultdict(list)
+    for _id, parent, _unused, detail in plan:
+        name = _scanned_table(detail)
+        if name:
+            scans[parent].append(name)
+
+    warnings = []
+    dangerous = False
+    nested = [names for names in scans.values() if len(names) > 1]
+    if nested:
+        joined, combinations = _scan_links(conn, sql)
+        for names in nested:
+            tables = " x ".join(names)
+            if not joined:
+                dangerous = True
+                warnings.append(f"Cartesian product: every row of {tables} is combined.")
+            elif combinations is not None and combinations > CARTESIAN_ROWS:
+                dangerous = True
+                warnings.append(f"Join of {tables} reads each table in full: {combinations:,} row combinations.")
+            else:
+                warnings.append(f"Join of {tables} reads each table in full; an index on the join columns avoids that.")
+
+    if not _LIMIT.search(sql.strip()):
+        for names in scans.values():
+            for name in names:
+                warnings.append(f"Full scan of '{name}' without LIMIT.")
+
+    return warnings, dangerous
+
+
+def _scanned_table(detail: str) -> Optional[str]:
+    """Table (or alias) read in full by one plan step, else None."""
+    if not detail.startswith("SCAN ") or detail == "SCAN CONSTANT ROW":
+        return None
+    words = detail.split()
+    # SQLite before 3.36 prints "SCAN TABLE name [AS alias] ...", later
+    # versions "SCAN name" (the alias when there is one).
+    if words[1] == "TABLE" and len(words) > 2:
+        if len(words) > 4 and words[3] == "AS":
+            return words[4]
+        return words[2]
+    return words[1]
+
+
+def _scan_links(conn: sqlite3.Connection, sql: str) -> Tuple[bool, Optional[int]]:
+    """
+    Follow the bytecode of ``sql`` to the tables it reads in full.
+
+    Returns ``(joined, combinations)``: whether comparisons between their
+    columns link all of them, and the product of their row counts from
+    ``sqlite_stat1`` (None when a table has no statistics).
+    """
+    tables = {
+        rootpage: name
+        for name, rootpage in conn.execute(
+            "SELECT tbl_name, rootpage FROM sqlite_master WHERE type IN ('table', 'index')"
+        )
+    }
+    cursors: Dict[int, str] = {}
+    scanned = set()
+    registers: Dict[int, int] = {}
+    group = {}
+
+    def find(cursor):
+        while group.get(cursor, cursor) != cursor:
+            cursor = group[cursor]
+        return cursor
+
+    for _addr, opcode, p1, p2, p3, *_ in conn.execute(f"EXPLAIN {sql}"):
+        if opcode == "OpenRead" and p2 in tables:
+            cursors[p1] = tables[p2]
+        elif opcode == "Rewind":
+            scanned.add(p1)
+        elif opcode == "Column":
+            registers[p3] = p1
+        elif opcode == "Rowid":
+            registers[p2] = p1
+        elif opcode in ("Copy", "SCopy") and p1 in registers:
+            registers[p2] = registers[p1]
+        elif opcode in _CONSTANTS:
+            registers.pop(p2, None)
+        elif opcode == "DeferredSeek":
+            # an index cursor and the table cursor it reads rows from
+            group[find(p1)] = find(p3)
+        elif opcode in _COMPARISONS and p1 in registers and p3 in registers:
+            group[find(registers[p1])] = find(registers[p3])
+
+    scanned = [c for c in scanned if c in cursors]
+    joined = len({find(c) for c in scanned}) <= 1
+
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    combinations = 1
+    for cursor in scanned:
+        row = has_stats and conn.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = ? ORDER BY idx IS NOT NULL LIMIT 1", (cursors[cursor],)
+        ).fetchone()
+        if not row:
+            return joined, None
+        combinations *= int(row[0].split()[0])
+    return joined, combinations
@@ -7,11 +7,59 @@ added in a future commit.
 
 import csv
 import json
-from typing import Optional
+import os
+import sqlite3
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Union
+from sqtab.checkpoint import (
+    clear_checkpoint,
+    file_identity,
+    load_checkpoint,
+    save_checkpoint,
+)
 from sqtab.db import get_conn
-
-
-def import_file(path: str, table: str) -> Optional[int]:
+from sqtab.encoding import (
+    DICT_MAX_VALUES,
+    Encoder,
+    choose_columns,
+    create_encoded_table,
+    load_encoded,
+    storage_table,
+)
+from sqtab.keys import KeyTracker, choose_key, key_clause
+from sqtab.materialize import refresh_dependents
+from sqtab.metrics import Metrics
+from sqtab.schema import RejectWriter, Schema, default_reject_path, load_schema
+from sqtab.typed import STORAGE, convert_record, load_kinds, narrow_kind, require_strict, save_kinds
+
+# Supported conflict strategies for key-based (merge) imports.
+MERGE_MODES = ("upsert", "replace", "insert-ignore")
+
+# Number of rows sent to SQLite per executemany() call.
+BATCH_SIZE = 10_000
+
+# Rows committed per transaction; a checkpoint is recorded after each chunk.
+COMMIT_EVERY = 100_000
+
+# Bound parameters per key lookup of a merge; SQLite before 3.32 allows 999.
+KEY_LOOKUP_VARIABLES = 999
+
+
+def import_file(
+    path: str,
+    table: str,
+    resume: bool = False,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    typed: bool = False,
+    dict_encode: bool = False,
+    primary_key: Optional[Union[str, List[str]]] = None,
+    auto_key: bool = False,
+    schema: Optional[Union[str, dict, Schema]] = None,
+    rejects: Optional[str] = None,
+    flatten: Optional[int] = None,
+) -> Optional[int]:
     """
     Import a CSV or JSON file into the specified SQLite table.
 
@@ -21,100 +69,538 @@ def import_file(path: str, table: str) -> Optional[int]:
         Path to the input CSV or JSON file.
     table : str
         Name of the SQLite table to import data into.
+    resume : bool
+        Continue an interrupted CSV import from its last checkpoint.
+    workers : int
+        Number of processes used to parse a UTF-8 CSV file (1 = serial).
+    progress : callable, optional
+        Called as ``progress(bytes_done, rows_done)`` after each commit.
+    metrics : Metrics, optional
+        Receives phase timings (read, infer, create, insert, commit, index).
+    typed : bool
+        Create a STRICT table with boolean, date and timestamp detection
+        (see sqtab.typed). CSV only; only used when the table is created.
+    dict_encode : bool
+        Store low-cardinality text columns as dictionary codes behind a
+        view (see sqtab.encoding). CSV only; only used when the table is
+        created.
+    primary_key : str | list[str], optional
+        Primary key column(s) of a new table (see sqtab.keys). CSV only.
+    auto_key : bool
+        Detect a unique, non-null column during inference and make it the
+        primary key of a new table. CSV only.
+    schema : str | dict | Schema, optional
+        Declared schema (path to a JSON file, parsed dict or Schema); skips
+        inference and converts values by declared type (see sqtab.schema).
+        CSV only.
+    rejects : str, optional
+        File receiving records that violate the schema; defaults to
+        ``<input>.rejects.csv``.
+    flatten : int, optional
+        Stream a JSON file and flatten nested objects into ``parent__child``
+        columns and arrays into child tables, this many levels deep (see
+        sqtab.flatten). JSON only.
 
     Returns
     -------
     Optional[int]
         Number of rows imported, or None if no rows were processed.
     """
-    path = str(path)
-    path_lower = path.lower()
+    return _dispatch(
+        path, table, resume=resume, workers=workers, progress=progress, metrics=metrics,
+        typed=typed, dict_encode=dict_encode, primary_key=_column_list(primary_key), auto_key=auto_key,
+        schema=schema, rejects=rejects, flatten=flatten,
+    )["rows"]
+
+
+def merge_file(
+    path: str,
+    table: str,
+    key: Union[str, List[str]],
+    mode: str = "upsert",
+    resume: bool = False,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    typed: bool = False,
+    dict_encode: bool = False,
+    primary_key: Optional[Union[str, List[str]]] = None,
+    auto_key: bool = False,
+    schema: Optional[Union[str, dict, Schema]] = None,
+    rejects: Optional[str] = None,
+    flatten: Optional[int] = None,
+) -> dict:
+    """
+    Merge a CSV or JSON file into a SQLite table using key column(s).
 
-    if path_lower.endswith(".csv"):
-        return _import_csv(path, table)
+    A unique index on the key columns is created if needed, and rows are
+    written in batches using ``INSERT ... ON CONFLICT``, so only new or
+    changed rows touch the database.
+
+    Parameters
+    ----------
+    path : str
+        Path to the input CSV or JSON file.
+    table : str
+        Name of the SQLite table to merge data into.
+    key : str | list[str]
+        Key column name(s); a comma-separated string is accepted.
+    mode : str
+        ``upsert`` (insert new rows, update changed rows),
+        ``replace`` (insert new rows, overwrite every matching row) or
+        ``insert-ignore`` (insert new rows, keep existing rows untouched).
+    resume : bool
+        Continue an interrupted CSV import from its last checkpoint.
+    workers : int
+        Number of processes used to parse a UTF-8 CSV file (1 = serial).
+    progress : callable, optional
+        Called as ``progress(bytes_done, rows_done)`` after each commit.
+    metrics : Metrics, optional
+        Receives phase timings (read, infer, create, insert, commit, index).
+    typed : bool
+        Create a STRICT typed table if it does not exist (see import_file).
+    dict_encode : bool
+        Dictionary-encode a new table's repetitive text columns (see import_file).
+    primary_key : str | list[str], optional
+        Primary key column(s) of a new table (see import_file).
+    auto_key : bool
+        Infer the primary key of a new table (see import_file).
+    schema : str | dict | Schema, optional
+        Declared schema of the input (see import_file).
+    rejects : str, optional
+        File receiving records that violate the schema (see import_file).
+    flatten : int, optional
+        Not supported for merges; flattened imports always append.
+
+    Returns
+    -------
+    dict
+        Counts with keys ``rows``, ``inserted``, ``updated`` and ``unchanged``.
+    """
+    if mode not in MERGE_MODES:
+        raise ValueError(
+            f"Unknown merge mode '{mode}'. Use one of: {', '.join(MERGE_MODES)}."
+        )
 
-    if path_lower.endswith(".json"):
-        return _import_json(path, table)
+    key = _column_list(key)
+    if not key:
+        raise ValueError("At least one key column is required for a merge import.")
 
-    raise ValueError("Only CSV and JSON import are supported at the moment.")
+    return _dispatch(
+        path, table, key=key, mode=mode, resume=resume, workers=workers,
+        progress=progress, metrics=metrics, typed=typed, dict_encode=dict_encode,
+        primary_key=_column_list(primary_key), auto_key=auto_key, schema=schema, rejects=rejects,
+        flatten=flatten,
+    )
 
 
-def _import_csv(path: str, table: str) -> int:
+def _dispatch(path: str, table: str, **options) -> dict:
+    """
+    Route a file to the CSV or JSON importer based on its extension, then
+    refresh materialized views that read from ``table``.
+    """
+    path = str(path)
+    path_lower = path.lower()
+
+    if options.get("rejects") is not None and options.get("schema") is None:
+        raise ValueError("--rejects requires --schema; only schema imports reject records.")
+
+    if path_lower.endswith(".csv"):
+        if options.pop("flatten", None) is not None:
+            raise ValueError("Flattening is only supported for JSON imports.")
+        if options.get("typed") or options.get("schema") is not None:
+            require_strict()
+        counts = _import_csv(path, table, **options)
+    elif path_lower.endswith(".json"):
+        if options.pop("resume", False):
+            raise ValueError("Resuming is only supported for CSV imports.")
+        if options.pop("typed", False):
+            raise ValueError("Typed mode is only supported for CSV imports.")
+        if options.pop("dict_encode", False):
+            raise ValueError("Dictionary encoding is only supported for CSV imports.")
+        primary_key, auto_key = options.pop("primary_key", None), options.pop("auto_key", False)
+        if primary_key or auto_key:
+            raise ValueError("Primary key options are only supported for CSV imports.")
+        if options.pop("schema", None) is not None:
+            raise ValueError("Schema imports are only supported for CSV files.")
+        options.pop("rejects", None)
+        options.pop("workers", None)
+        counts = _import_json(path, table, **options)
+    else:
+        raise ValueError("Only CSV and JSON import are supported at the moment.")
+
+    if counts["rows"]:
+        metrics = options.get("metrics") or Metrics()
+        with metrics.phase("refresh"):
+            refresh_dependents(table)
+
+    return counts
+
+
+def _import_csv(
+    path: str,
+    table: str,
+    key: Optional[List[str]] = None,
+    mode: str = "append",
+    resume: bool = False,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    typed: bool = False,
+    dict_encode: bool = False,
+    primary_key: Optional[List[str]] = None,
+    auto_key: bool = False,
+    schema: Optional[Union[str, dict, Schema]] = None,
+    rejects: Optional[str] = None,
+) -> dict:
     """
     Import data from a CSV file into a SQLite table.
 
     Performs:
     - column name normalization
-    - per-column type inference (INTEGER, REAL, TEXT)
+    - per-column type inference (INTEGER, REAL, TEXT), only when the
+      table does not exist yet
     - row value type inference via infer_type()
-    """
+    - optional key-based merge (see merge_file)
 
-    conn = get_conn()
-    cur = conn.cursor()
+    With ``typed=True`` a new table is created STRICT from inferred column
+    kinds (see sqtab.typed). Tables created that way always convert values
+    by their recorded kinds, whether or not ``typed`` is passed again.
 
-    # Read CSV
-    with open_with_bom(path) as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-    # Strip BOM if present in header (e.g. "﻿id" → "id")
-    if rows and list(rows[0].keys()):
-        cleaned_rows = []
-        for row in rows:
-            new_row = {}
-            for k, v in row.items():
-                clean_key = k.lstrip("\ufeff")  # remove BOM char if present
-                new_row[clean_key] = v
-            cleaned_rows.append(new_row)
-        rows = cleaned_rows
+    With ``dict_encode=True`` a new table's low-cardinality text columns
+    are found during inference and stored as codes (see sqtab.encoding);
+    later imports into the table keep encoding them. Detection needs the
+    serial inference pass; parsing still runs in parallel afterwards.
 
-    if not rows:
-        return 0
+    A new table gets ``primary_key`` as its key, or with ``auto_key=True``
+    a column found unique and non-null during inference (see sqtab.keys).
+    Key detection also uses the serial inference pass.
 
-    # Extract original column names from the CSV
-    raw_columns = list(rows[0].keys())
+    With a ``schema`` there is no inference: a new table is created from
+    it, values go through the declared converters in one serial pass, and
+    records that violate it are written to the ``rejects`` file instead of
+    aborting the import (see sqtab.schema).
 
-    # Normalize column names
-    columns = [normalize_column(c) for c in raw_columns]
+    The file is streamed and committed every COMMIT_EVERY rows. Each commit
+    records a checkpoint (file identity, byte offset, row number); with
+    ``resume=True`` an interrupted import continues from the last one.
 
-    # Collect values column-by-column for type inference
-    column_values = {col: [] for col in columns}
-
-    for row in rows:
-        for raw_col, norm_col in zip(raw_columns, columns):
-            column_values[norm_col].append(row[raw_col])
-
-    # Infer type for each column (INTEGER, REAL, TEXT)
-    column_types = {
-        col: infer_column_type(vals)
-        for col, vals in column_values.items()
-    }
+    With ``workers > 1`` a UTF-8 file is memory-mapped and parsed by that
+    many processes (see sqtab.csv_parallel); one batch is committed per
+    byte range and the resulting rows are identical to the serial path.
+    """
+    metrics = metrics or Metrics()
+    if schema is not None:
+        if dict_encode or primary_key or auto_key:
+            raise ValueError("A schema cannot be combined with --dict-encode, --primary-key or --auto-key.")
+        if not isinstance(schema, Schema):
+            schema = load_schema(schema)
 
-    # Build CREATE TABLE statement
-    col_defs = ", ".join([f'"{col}" {column_types[col]}' for col in columns])
-    placeholders = ", ".join(["?"] * len(columns))
+    conn = get_conn()
+    cur = conn.cursor()
+    reject_writer = None
 
-    # Create table if not exists
-    cur.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({col_defs})')
+    try:
+        identity = file_identity(path)
+        exists = table_exists(cur, table)
+        checkpoint = load_checkpoint(cur, table) if exists else None
+
+        if checkpoint and not resume:
+            raise ValueError(
+                f"An unfinished import into '{table}' exists "
+                f"({checkpoint['row_number']} rows loaded from {checkpoint['path']}). "
+                "Use --resume to continue it."
+            )
+        if checkpoint and any(checkpoint[k] != identity[k] for k in ("path", "size", "mtime_ns")):
+            raise ValueError(
+                f"Cannot resume import into '{table}': the checkpoint belongs to "
+                f"{checkpoint['path']} and the input file differs or has changed."
+            )
+
+        with open_with_bom(path) as f:
+            # readline() instead of iteration keeps f.tell() usable, and the
+            # csv reader never reads past the record it returns.
+            reader = csv.reader(iter(f.readline, ""))
+            header = next(reader, None)
+            if not header:
+                return empty_counts()
+
+            # Strip BOM if present in header (e.g. "﻿id" → "id")
+            raw_columns = [c.lstrip("\ufeff") for c in header]
+            columns = [normalize_column(c) for c in raw_columns]
+
+            data_start = f.tell()
+            parallel = workers > 1 and _detect_encoding(path).startswith("utf-8")
+
+            kinds = None
+            encoded = None
+            if schema:
+                positions = _schema_positions(columns, schema)
+                if exists:
+                    check_table_columns(cur, table, schema.names)
+                    encoded = load_encoded(cur, table)
+                else:
+                    with metrics.phase("create"):
+                        schema.create_table(cur, table)
+                reject_writer = RejectWriter(
+                    rejects or default_reject_path(path), raw_columns, append=bool(checkpoint)
+                )
+                file_width, columns = len(columns), schema.names
+            elif not exists:
+                if dict_encode and (primary_key or auto_key):
+                    raise ValueError("Dictionary encoding cannot be combined with a primary key.")
+                profile = {"keys": auto_key} if dict_encode or auto_key else None
+                with metrics.phase("infer"):
+                    if parallel and profile is None:
+                        from sqtab.csv_parallel import infer_types
+                        column_types = infer_types(path, data_start, len(columns), workers, typed)
+                    else:
+                        column_types = _infer_csv_types(path, len(columns), typed, profile)
+                if column_types is None:
+                    return empty_counts()
+
+                if typed:
+                    kinds = column_types
+                    column_types = [STORAGE[kind] for kind in kinds]
+                if dict_encode:
+                    encoded = choose_columns(columns, column_types, profile["distinct"], profile["rows"])
+                if auto_key and not primary_key:
+                    # typed kinds, so converted booleans and dates are not keys
+                    primary_key = choose_key(columns, kinds or column_types, profile["key_candidates"])
+
+                with metrics.phase("create"):
+                    if encoded:
+                        create_encoded_table(cur, table, columns, column_types, encoded, strict=typed)
+                    else:
+                        col_defs, table_options = key_clause(columns, column_types, primary_key)
+                        if typed:
+                            table_options.append("STRICT")
+                        cur.execute(
+                            f'CREATE TABLE IF NOT EXISTS "{table}" ({col_defs}) {", ".join(table_options)}'
+                        )
+                    save_kinds(cur, table, columns, kinds)
+            else:
+                known = load_kinds(cur, table)
+                if known:
+                    missing = [c for c in columns if c not in known]
+                    if missing:
+                        raise ValueError(f"Column(s) not found in table '{table}': {', '.join(missing)}")
+                    kinds = [known[c] for c in columns]
+                encoded = load_encoded(cur, table)
+
+            # Encoded tables are written through their storage table.
+            target = storage_table(table) if encoded else table
+            encoder = Encoder(cur, table, columns, encoded) if encoded else None
+
+            if key is not None:
+                with metrics.phase("index"):
+                    ensure_unique_index(cur, target, key)
+
+            row_number = 0
+            if checkpoint:
+                # For UTF-8 input, text positions are plain byte offsets, so
+                # serial and parallel checkpoints are interchangeable.
+                data_start = checkpoint["offset"]
+                row_number = checkpoint["row_number"]
+
+            if schema:
+                f.seek(data_start)
+                batches = _schema_batches(f, reader, file_width, schema, positions, reject_writer)
+            elif parallel:
+                from sqtab.csv_parallel import iter_batches
+                batches = iter_batches(path, data_start, len(columns), workers, kinds, columns)
+            else:
+                f.seek(data_start)
+                batches = _serial_batches(f, reader, columns, kinds)
+
+            counts = empty_counts()
+            batches = iter(batches)
+
+            while True:
+                with metrics.phase("read"):
+                    batch = next(batches, None)
+                if batch is None:
+                    break
+                if schema:
+                    values, offset, records = batch
+                    reject = lambda i, reason: reject_writer.write(records[i], reason)
+                else:
+                    values, offset = batch
+                    reject = None
+
+                with metrics.phase("insert"):
+                    if encoder:
+                        values = encoder.encode(values)
+                    add_counts(
+                        counts, write_rows(cur, target, columns, values, key=key, mode=mode, reject=reject)
+                    )
+
+                row_number += len(records) if schema else len(values)
+                with metrics.phase("commit"):
+                    save_checkpoint(cur, table, identity, offset, row_number)
+                    conn.commit()
+
+                if progress:
+                    progress(offset, counts["rows"])
+
+        with metrics.phase("commit"):
+            clear_checkpoint(cur, table)
+            conn.commit()
+
+        metrics.count("rows", counts["rows"])
+        metrics.count("bytes", identity["size"])
+        if reject_writer:
+            metrics.count("rejected", reject_writer.count)
+        return counts
+    finally:
+        if reject_writer:
+            reject_writer.close()
+        conn.close()
+
+
+def _serial_batches(f, reader, columns: List[str], kinds: Optional[List[str]] = None):
+    """Yield ``(rows, offset)`` batches of COMMIT_EVERY converted records."""
+    for chunk in batched(_iter_records(reader, len(columns)), COMMIT_EVERY):
+        yield _convert_records(chunk, columns, kinds), f.tell()
+
+
+def _schema_batches(f, reader, width: int, schema: Schema, positions: List[int], rejects: RejectWriter):
+    """
+    Yield ``(rows, offset, records)`` batches converted by a declared schema.
 
+    ``records`` holds the raw record of each row. Records with the wrong
+    number of fields or that fail conversion go to ``rejects`` and are left
+    out of the batch.
+    """
+    for chunk in batched(_iter_records(reader, width, pad=False), COMMIT_EVERY):
+        rows, records = [], []
+        for record in chunk:
+            if len(record) != width:
+                rejects.write(record, f"Expected {width} fields, found {len(record)}.")
+                continue
+            try:
+                rows.append(schema.convert([record[p] for p in positions]))
+            except ValueError as exc:
+                rejects.write(record, str(exc))
+                continue
+            records.append(record)
+        yield rows, f.tell(), records
+
+
+def _schema_positions(columns: List[str], schema: Schema) -> List[int]:
+    """Map schema columns to CSV header positions; the header must match the schema."""
+    missing = [n for n in schema.names if n not in columns]
+    if missing:
+        raise ValueError(f"Schema column(s) not found in input: {', '.join(missing)}")
+    extra = [c for c in columns if c not in schema.names]
+    if extra:
+        raise ValueError(f"Input column(s) not declared in the schema: {', '.join(extra)}")
+    return [columns.index(n) for n in schema.names]
+
+
+def check_table_columns(cur, table: str, names: List[str]) -> None:
+    """Raise ValueError unless ``table`` has every column in ``names``."""
+    existing = {c[1] for c in cur.execute(f'PRAGMA table_info("{table}")').fetchall()}
+    missing = [n for n in names if n not in existing]
+    if missing:
+        raise ValueError(f"Column(s) not found in table '{table}': {', '.join(missing)}")
+
+
+def _convert_records(records, columns: List[str], kinds: Optional[List[str]] = None) -> list:
+    """Convert raw records by column kinds (typed tables) or with infer_type."""
+    if kinds:
+        return [convert_record(kinds, record, columns) for record in records]
     # Insert rows using infer_type on each cell
-    for row in rows:
-        values = []
-        for raw_col in raw_columns:
-            v = row[raw_col]
-            values.append(infer_type(v))
-        cur.execute(
-            f'INSERT INTO "{table}" VALUES ({placeholders})',
-            values
-        )
+    return [[infer_type(v) for v in record] for record in records]
 
-    conn.commit()
-    conn.close()
-    return len(rows)
 
+def _infer_csv_types(
+    path: str, width: int, typed: bool = False, profile: Optional[dict] = None
+) -> Optional[List[str]]:
+    """
+    Stream a CSV file once and infer a type for each column.
+
+    With ``typed=True`` the result holds kinds (see sqtab.typed) instead of
+    SQLite types. A ``profile`` dict, if given, receives ``rows`` and
+    ``distinct``: per column the set of distinct non-empty values, or None
+    once there are more than DICT_MAX_VALUES (used for dictionary encoding).
+    If ``profile["keys"]`` is true it also receives ``key_candidates``, the
+    indexes of unique non-null columns (see sqtab.keys.KeyTracker).
+    Returns None when the file has no data rows.
+    """
+    narrow, widest = (narrow_kind, "text") if typed else (_narrow_type, "TEXT")
+    types: List[Optional[str]] = [None] * width
+    distinct: List[Optional[set]] = [set() for _ in range(width)]
+    tracker = KeyTracker(width) if profile and profile.get("keys") else None
+    rows = 0
+
+    with open_with_bom(path) as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+
+        for record in _iter_records(reader, width):
+            rows += 1
+            types = [narrow(t, v) for t, v in zip(types, record)]
+
+            if tracker:
+                tracker.add(record)
+            if profile is not None:
+                for i, v in enumerate(record):
+                    values = distinct[i]
+                    if values is not None and v.strip():
+                        values.add(v)
+                        if len(values) > DICT_MAX_VALUES:
+                            distinct[i] = None
+            elif all(t == widest for t in types):
+                break  # nothing left to learn
+
+    if profile is not None:
+        profile.update(rows=rows, distinct=distinct)
+        if tracker:
+            profile["key_candidates"] = tracker.candidates()
+    if not rows:
+        return None
+    # all empty → widest type
+    return [t or widest for t in types]
 
 
-def _import_json(path: str, table: str) -> int:
+def _iter_records(reader, width: int, pad: bool = True):
+    """
+    Yield non-blank CSV records padded or truncated to ``width`` fields
+    (as they are with ``pad=False``).
+    """
+    for record in reader:
+        if not record:
+            continue
+        if not pad:
+            yield record
+            continue
+        if len(record) < width:
+            record = record + [""] * (width - len(record))
+        elif len(record) > width:
+            record = record[:width]
+        yield record
+
+
+def table_exists(cur, table: str) -> bool:
+    """True if ``table`` exists as a table or a view."""
+    # Dictionary-encoded tables are views over their storage table.
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?;",
+        (table,)
+    )
+    return cur.fetchone() is not None
+
+
+def _import_json(
+    path: str,
+    table: str,
+    key: Optional[List[str]] = None,
+    mode: str = "append",
+    progress: Optional[Callable[[int, int], None]] = None,
+    metrics: Optional[Metrics] = None,
+    flatten: Optional[int] = None,
+) -> dict:
     """
     Import data from a JSON file into a SQLite table.
 
@@ -122,15 +608,24 @@ def _import_json(path: str, table: str) -> int:
     - a list of objects (recommended), or
     - a single object (will be wrapped into a list)
 
+    With ``flatten``, the file is streamed and nested values are stored as
+    columns and child tables (see sqtab.flatten).
+
     Returns
     -------
-    int
-        Number of rows imported.
+    dict
+        Row counts (see merge_file).
     """
+    metrics = metrics or Metrics()
+    if flatten is not None:
+        if key is not None:
+            raise ValueError("Flattened imports cannot be merged on a key.")
+        return _import_json_flattened(path, table, flatten, progress, metrics)
+
     conn = get_conn()
     cur = conn.cursor()
 
-    with open(path, encoding="utf-8") as f:
+    with metrics.phase("read"), open(path, encoding="utf-8") as f:
         data = json.load(f)
 
     if isinstance(data, dict):
@@ -142,47 +637,280 @@ def _import_json(path: str, table: str) -> int:
         raise ValueError("Invalid JSON format. Expected object or list of objects.")
 
     if not rows:
-        return 0
+        conn.close()
+        return empty_counts()
 
-    columns = rows[0].keys()
+    columns = list(rows[0].keys())
     col_list = ", ".join([f'"{col}"' for col in columns])
-    placeholders = ", ".join(["?"] * len(columns))
 
     # Create table if needed
-    cur.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({col_list})')
+    with metrics.phase("create"):
+        cur.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({col_list})')
+
+    if key is not None:
+        with metrics.phase("index"):
+            ensure_unique_index(cur, table, key)
 
     # Insert rows
-    for row in rows:
-        values = list(row.values())
-        cur.execute(
-            f'INSERT INTO "{table}" VALUES ({placeholders})',
-            values
-        )
+    values = (list(row.values()) for row in rows)
+    with metrics.phase("insert"):
+        counts = write_rows(cur, table, columns, values, key=key, mode=mode)
 
-    conn.commit()
+    with metrics.phase("commit"):
+        conn.commit()
     conn.close()
-    return len(rows)
+
+    size = os.path.getsize(path)
+    if progress:
+        progress(size, counts["rows"])
+    metrics.count("rows", counts["rows"])
+    metrics.count("bytes", size)
+    return counts
+
+
+def _import_json_flattened(path: str, table: str, max_depth: int, progress, metrics: Metrics) -> dict:
+    from sqtab.flatten import import_flattened
+
+    conn = get_conn()
+    try:
+        # reading, flattening and inserting are interleaved
+        with metrics.phase("insert"):
+            result = import_flattened(conn, path, table, max_depth=max_depth, progress=progress)
+    finally:
+        conn.close()
+
+    size = os.path.getsize(path)
+    if progress:
+        progress(size, result["rows"])
+    metrics.count("rows", result["rows"])
+    metrics.count("child_rows", sum(child["rows"] for child in result["child_tables"].values()))
+    metrics.detail("child_tables", result["child_tables"])
+    metrics.count("bytes", size)
+    rows = result["rows"]
+    return {"rows": rows, "inserted": rows, "updated": 0, "unchanged": 0}
+
+
+def _column_list(columns: Optional[Union[str, List[str]]]) -> Optional[List[str]]:
+    """Normalize a column list given as a comma-separated string or list."""
+    if columns is None:
+        return None
+    if isinstance(columns, str):
+        columns = columns.split(",")
+    return [normalize_column(c) for c in columns if c.strip()] or None
+
+
+def empty_counts() -> dict:
+    """Row counts of an import that wrote nothing (see write_rows)."""
+    return {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+
+
+def add_counts(total: dict, counts: dict) -> None:
+    """Add the row counts of one batch to ``total``."""
+    for name, value in counts.items():
+        total[name] += value
+
+
+def batched(rows: Iterable, size: int):
+    """Yield lists of at most ``size`` items from ``rows``."""
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_rows(
+    cur,
+    table: str,
+    columns: List[str],
+    rows: Iterable,
+    key: Optional[List[str]] = None,
+    mode: str = "append",
+    reject: Optional[Callable[[int, str], None]] = None,
+) -> dict:
+    """
+    Write value rows into ``table`` in batches and return row counts.
+
+    Values are matched to the table's columns by name, so ``columns`` may
+    be any subset of them, in any order. Without a key, rows are appended.
+    With a key, rows are merged using ``INSERT ... ON CONFLICT`` according
+    to ``mode`` (see merge_file).
+    With a ``reject`` callback, rows violating a constraint are skipped and
+    reported as ``reject(index, reason)`` instead of failing the import.
+    """
+    if key is None:
+        col_list = ", ".join(f'"{c}"' for c in columns)
+        placeholders = ", ".join(["?"] * len(columns))
+        sql = f'INSERT INTO "{table}" ({col_list}) VALUES ({placeholders})'
+        total = start = 0
+        for batch in batched(rows, BATCH_SIZE):
+            total += _execute_batch(cur, sql, batch, reject, start)[0]
+            start += len(batch)
+        return {"rows": total, "inserted": total, "updated": 0, "unchanged": 0}
+
+    missing = [k for k in key if k not in columns]
+    if missing:
+        raise ValueError(f"Key column(s) not found in input: {', '.join(missing)}")
+
+    # The caller has created the unique index on the key (ensure_unique_index).
+    sql = _merge_sql(table, columns, key, mode)
+    positions = [columns.index(k) for k in key]
+
+    # Inserts are the batch's keys not in the table yet, found by lookups on
+    # the key index, so the cost follows the batch and not the table. When
+    # rows were rejected the keys are looked up again afterwards. Writes are
+    # the statements' own row counts (cur.rowcount leaves out rows written
+    # by triggers, e.g. full-text index sync). Rows with a NULL key never
+    # conflict and are always inserted.
+    total = inserted = changed = start = 0
+    for batch in batched(rows, BATCH_SIZE):
+        keys = {tuple(row[i] for i in positions) for row in batch}
+        null_keys = sum(1 for row in batch if any(row[i] is None for i in positions))
+        keys = [k for k in keys if None not in k]
+
+        existing = _count_keys(cur, table, key, keys)
+        written, changes = _execute_batch(cur, sql, batch, reject, start)
+        if written == len(batch):
+            inserted += len(keys) - existing + null_keys
+        else:
+            inserted += _count_keys(cur, table, key, keys) - existing
+        changed += changes
+        total += written
+        start += len(batch)
+    updated = changed - inserted
+
+    return {
+        "rows": total,
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": total - inserted - updated,
+    }
+
+
+def _count_keys(cur, table: str, key: List[str], keys: List[tuple]) -> int:
+    """Number of rows of ``table`` whose key is one of ``keys`` (uses the key index)."""
+    found = 0
+    size = max(1, KEY_LOOKUP_VARIABLES // len(key))
+    for start in range(0, len(keys), size):
+        chunk = keys[start:start + size]
+        if len(key) == 1:
+            sql = f'SELECT COUNT(*) FROM "{table}" WHERE "{key[0]}" IN ({", ".join(["?"] * len(chunk))})'
+        else:
+            # A join against VALUES searches the index per key; a row-value
+            # IN (VALUES ...) would scan it.
+            row = "(" + ", ".join(["?"] * len(key)) + ")"
+            on = " AND ".join(f't."{k}" = v.column{i + 1}' for i, k in enumerate(key))
+            sql = f'SELECT COUNT(*) FROM (VALUES {", ".join([row] * len(chunk))}) AS v JOIN "{table}" AS t ON {on}'
+        params = [value for k in chunk for value in k]
+        found += cur.execute(sql, params).fetchone()[0]
+    return found
+
+
+def _execute_batch(cur, sql: str, batch: list, reject=None, start: int = 0) -> tuple:
+    """
+    Run ``sql`` for every row of ``batch``.
+
+    Returns ``(rows written, rows changed by the statements)``; the second
+    excludes writes made by triggers.
+
+    With a ``reject`` callback a batch that hits a constraint is rolled back
+    to a savepoint and retried row by row; failing rows are passed to
+    ``reject(start + index, reason)``.
+    """
+    if reject is None:
+        cur.executemany(sql, batch)
+        return len(batch), cur.rowcount
+
+    if not cur.connection.in_transaction:
+        cur.execute("BEGIN")  # keep the savepoint from committing on release
+    cur.execute("SAVEPOINT sqtab_batch")
+    try:
+        cur.executemany(sql, batch)
+        written, changes = len(batch), cur.rowcount
+    except sqlite3.IntegrityError:
+        cur.execute("ROLLBACK TO sqtab_batch")
+        written = changes = 0
+        for i, row in enumerate(batch):
+            try:
+                cur.execute(sql, row)
+                written += 1
+                changes += cur.rowcount
+            except sqlite3.IntegrityError as exc:
+                reject(start + i, str(exc))
+    cur.execute("RELEASE sqtab_batch")
+    return written, changes
+
+
+def ensure_unique_index(cur, table: str, key: List[str]) -> None:
+    """Create the unique index that ON CONFLICT needs for the key columns."""
+    cur.execute(f'PRAGMA table_info("{table}")')
+    info = cur.fetchall()
+    existing = {c[1] for c in info}
+    missing = [k for k in key if k not in existing]
+    if missing:
+        raise ValueError(f"Key column(s) not found in table '{table}': {', '.join(missing)}")
+
+    primary_key = {c[1] for c in info if c[5]}
+    if primary_key and primary_key == set(key):
+        return  # the primary key already enforces uniqueness
+
+    index_name = f"{table}__key__{'_'.join(key)}"
+    key_list = ", ".join(f'"{k}"' for k in key)
+    try:
+        cur.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS "{index_name}" ON "{table}" ({key_list})')
+    except sqlite3.IntegrityError:
+        raise ValueError(
+            f"Table '{table}' already contains duplicate values for key ({', '.join(key)})."
+        )
+
+
+def _merge_sql(table: str, columns: List[str], key: List[str], mode: str) -> str:
+    """Build the INSERT ... ON CONFLICT statement for a merge mode."""
+    col_list = ", ".join(f'"{c}"' for c in columns)
+    placeholders = ", ".join(["?"] * len(columns))
+    key_list = ", ".join(f'"{k}"' for k in key)
+    insert = f'INSERT INTO "{table}" ({col_list}) VALUES ({placeholders})'
+
+    non_key = [c for c in columns if c not in key]
+    if mode == "insert-ignore" or not non_key:
+        return f"{insert} ON CONFLICT ({key_list}) DO NOTHING"
+
+    assignments = ", ".join(f'"{c}" = excluded."{c}"' for c in non_key)
+    sql = f"{insert} ON CONFLICT ({key_list}) DO UPDATE SET {assignments}"
+
+    if mode == "upsert":
+        # Skip the write entirely when nothing changed.
+        differs = " OR ".join(f'"{c}" IS NOT excluded."{c}"' for c in non_key)
+        sql += f" WHERE {differs}"
+
+    return sql
 
 
 def open_with_bom(path: str):
     """Open a file with automatic BOM detection and removal."""
+    return open(path, encoding=_detect_encoding(path), newline="")
+
+
+def _detect_encoding(path: str) -> str:
+    """Pick a text encoding for ``path`` from its byte order mark."""
     with open(path, "rb") as f:
         raw = f.read(4)
 
     # UTF-8 BOM
     if raw.startswith(b"\xef\xbb\xbf"):
-        return open(path, encoding="utf-8-sig")
+        return "utf-8-sig"
 
     # UTF-16 LE BOM
     if raw.startswith(b"\xff\xfe"):
-        return open(path, encoding="utf-16-le")
+        return "utf-16-le"
 
     # UTF-16 BE BOM
     if raw.startswith(b"\xfe\xff"):
-        return open(path, encoding="utf-16-be")
+        return "utf-16-be"
 
     # Fallback: UTF-8
-    return open(path, encoding="utf-8")
+    return "utf-8"
 
 
 def infer_type(value: str):
@@ -213,37 +941,41 @@ def infer_column_type(values):
     Infer SQLite column type (INTEGER, REAL, TEXT)
     based on all values in the column.
     """
+    col_type = None
+
+    for v in values:
+        col_type = _narrow_type(col_type, v)
+        if col_type == "TEXT":
+            break
+
+    # all empty → TEXT
+    return col_type or "TEXT"
 
-    # Remove empty strings
-    non_empty = [v for v in values if v != ""]
 
-    if not non_empty:
-        return "TEXT"  # all empty → TEXT
+def _narrow_type(current: Optional[str], value: str) -> Optional[str]:
+    """
+    Combine the type inferred so far with one more raw value.
+
+    ``current`` is None while only empty values have been seen.
+    """
+    if value == "" or current == "TEXT":
+        return current
 
     # Try INTEGER
-    try:
-        for v in non_empty:
-            int(v)
-        return "INTEGER"
-    except ValueError:
-        pass
+    if current in (None, "INTEGER"):
+        try:
+            int(value)
+            return "INTEGER"
+        except ValueError:
+            pass
 
     # Try REAL
     try:
-        for v in non_empty:
-            float(v)
+        float(value)
         return "REAL"
     except ValueError:
-        pass
-
-    # Try BOOLEAN
-    bool_set = {"true", "false", "True", "False"}
-    if all(v in bool_set for v in non_empty):
         return "TEXT"
 
-    # Otherwise TEXT
-    return "TEXT"
-
 def normalize_column(col: str) -> str:
     return col.strip().replace(" ", "_").lower()
 
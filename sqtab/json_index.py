@@ -0,0 +1,163 @@
+"""
+Indexed JSON fields for sqtab.
+
+Filtering on a field of a JSON text column with ``json_extract`` reads and
+parses every row. ``create_json_index`` adds a virtual generated column
+holding the field instead, for example::
+
+    payload_user_id GENERATED ALWAYS AS (json_extract(payload, '$.user.id')) VIRTUAL
+
+and an index on it, so ``WHERE payload_user_id = 42`` is an index lookup.
+The column is computed on read and takes no space in the table; only the
+index stores the values. The expression is guarded by ``json_valid``, so
+rows whose text is not valid JSON get NULL instead of failing.
+
+SQLite only uses the index when a query names the generated column, not
+for the equivalent ``json_extract`` expression, so ``describe`` and the
+``sql-ai`` schema list these columns with their source column and path.
+"""
+
+import re
+import sqlite3
+from typing import Dict, List, Optional
+
+from sqtab.db import INTERNAL_PREFIX, get_conn
+
+JSON_INDEX_TABLE = f"{INTERNAL_PREFIX}json_indexes"
+
+# Value of the ``hidden`` field of PRAGMA table_xinfo for virtual generated columns.
+VIRTUAL_COLUMN = 2
+
+
+def create_json_index(table: str, column: str, path: str, name: Optional[str] = None) -> dict:
+    """
+    Add a generated column for the JSON ``path`` of ``column`` and index it.
+
+    Parameters
+    ----------
+    table : str
+        Table holding JSON documents.
+    column : str
+        Text column with the documents.
+    path : str
+        SQLite JSON path, e.g. ``$.user.id`` or ``$.tags[0]``.
+    name : str, optional
+        Name of the new column. Defaults to the column name followed by the
+        path's parts, e.g. ``payload_user_id``.
+
+    Returns
+    -------
+    dict
+        ``table``, ``column`` (the generated one), ``source``, ``path``,
+        ``index`` and ``rows`` (rows indexed).
+    """
+    if not path.startswith("$"):
+        raise ValueError("The JSON path must start with '$', e.g. '$.user.id'.")
+    name = name or default_name(column, path)
+
+    conn = get_conn()
+    try:
+        try:
+            conn.execute("SELECT json_extract('{}', ?)", (path,))
+        except sqlite3.OperationalError as exc:
+            raise ValueError(f"Invalid JSON path '{path}': {exc}") from None
+
+        info = conn.execute(f'PRAGMA table_xinfo("{table}")').fetchall()
+        if not info:
+            raise ValueError(f"Table '{table}' does not exist.")
+        if _is_view(conn, table):
+            raise ValueError(f"'{table}' is a view; JSON indexes need a table.")
+        existing = [c[1] for c in info]
+        if column not in existing:
+            raise ValueError(f"Column '{column}' not found in table '{table}'.")
+        if name in existing:
+            raise ValueError(f"Column '{name}' already exists in table '{table}'.")
+
+        index = f"{table}__{name}"
+        # Tables created by --typed or --schema are STRICT, where every
+        # column needs a type; ANY keeps json_extract's value as is.
+        col_type = " ANY" if _is_strict(conn, table) else ""
+        quoted_path = path.replace("'", "''")
+        expression = f"CASE WHEN json_valid(\"{column}\") THEN json_extract(\"{column}\", '{quoted_path}') END"
+
+        conn.execute("BEGIN IMMEDIATE")
+        _ensure_table(conn)
+        conn.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN "{name}"{col_type} '
+            f"GENERATED ALWAYS AS ({expression}) VIRTUAL"
+        )
+        conn.execute(f'CREATE INDEX "{index}" ON "{table}" ("{name}")')
+        conn.execute(
+            f'INSERT OR REPLACE INTO "{JSON_INDEX_TABLE}" '
+            "(table_name, column_name, source_column, path, index_name) VALUES (?, ?, ?, ?, ?)",
+            (table, name, column, path, index),
+        )
+        rows = conn.execute(f'SELECT COUNT("{name}") FROM "{table}"').fetchone()[0]
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return {"table": table, "column": name, "source": column, "path": path, "index": index, "rows": rows}
+
+
+def json_indexes(table: str, conn: Optional[sqlite3.Connection] = None) -> List[Dict[str, str]]:
+    """
+    The JSON indexes of ``table``: ``{"column", "source", "path", "index"}``
+    for every generated column still present, in column order.
+    """
+    own = conn is None
+    conn = conn or get_conn()
+    try:
+        if not _has_metadata(conn):
+            return []
+        recorded = {
+            row[0]: {"column": row[0], "source": row[1], "path": row[2], "index": row[3]}
+            for row in conn.execute(
+                f'SELECT column_name, source_column, path, index_name FROM "{JSON_INDEX_TABLE}" '
+                "WHERE table_name = ?",
+                (table,),
+            )
+        }
+        columns = [c[1] for c in conn.execute(f'PRAGMA table_xinfo("{table}")') if c[6] == VIRTUAL_COLUMN]
+    finally:
+        if own:
+            conn.close()
+    return [recorded[c] for c in columns if c in recorded]
+
+
+def default_name(column: str, path: str) -> str:
+    """``payload`` and ``$.user.id`` give ``payload_user_id``."""
+    parts = [p for p in re.split(r"[^0-9A-Za-z]+", path.lstrip("$")) if p]
+    return "_".join([column, *parts]).lower()
+
+
+def _is_view(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    return row is not None and row[0] == "view"
+
+
+def _is_strict(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(f'PRAGMA table_list("{table}")').fetchone()
+    return bool(row and row[5])
+
+
+def _has_metadata(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (JSON_INDEX_TABLE,)
+    ).fetchone() is not None
+
+
+def _ensure_table(conn: sqlite3.Connection) -> None:
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{JSON_INDEX_TABLE}" (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            source_column TEXT NOT NULL,
+            path TEXT NOT NULL,
+            index_name TEXT NOT NULL,
+            PRIMARY KEY (table_name, column_name)
+        )
+    ''')
@@ -0,0 +1,190 @@
+"""
+Primary key inference for sqtab.
+
+During the inference pass of ``import --auto-key`` every column is watched
+for uniqueness and missing values. Columns that stay unique and non-null
+over the whole file are key candidates:
+
+- an INTEGER candidate becomes ``INTEGER PRIMARY KEY``, an alias of the
+  rowid, so lookups by it are B-tree searches and cost no extra index;
+- otherwise a TEXT candidate becomes the key of a ``WITHOUT ROWID`` table,
+  which stores rows ordered by the key.
+
+REAL columns (and the converted kinds of ``--typed``: booleans, dates,
+timestamps) are never candidates, because the tracker compares the text
+as read and ``1.5`` and ``1.50`` are the same stored value.
+
+Composite keys can be declared with ``--primary-key a,b``.
+
+Strictly increasing integer columns (the usual ``id``) are recognised
+without remembering their values. Other columns keep a set of values seen,
+up to KEY_TRACK_LIMIT values in total; columns that would go over the
+limit stop being candidates, and so does a column whose leading increasing
+run had gaps and is then followed by smaller values.
+"""
+
+import sqlite3
+from typing import Iterable, List, Optional
+
+from sqtab.db import get_conn
+
+# Values remembered across all non-monotonic candidate columns.
+KEY_TRACK_LIMIT = 2_000_000
+
+# Column types that can become a key; their values are stored as read.
+KEY_TYPES = ("INTEGER", "TEXT")
+
+
+class KeyTracker:
+    """Follow which columns are unique and non-null, one record at a time."""
+
+    def __init__(self, width: int, limit: int = KEY_TRACK_LIMIT):
+        self.alive = [True] * width
+        # While a column holds strictly increasing integers only the first
+        # value, the last value and the count are kept.
+        self.first: List[Optional[int]] = [None] * width
+        self.last: List[Optional[int]] = [None] * width
+        self.count = [0] * width
+        self.seen: List[Optional[set]] = [None] * width
+        self.budget = limit
+
+    def add(self, record: List[str]) -> None:
+        for i, value in enumerate(record):
+            if not self.alive[i]:
+                continue
+            value = value.strip()
+            if value == "":
+                self._drop(i)
+                continue
+
+            try:
+                value = int(value)
+            except ValueError:
+                pass
+
+            seen = self.seen[i]
+            if seen is None:
+                if isinstance(value, int) and (self.last[i] is None or value > self.last[i]):
+                    if self.last[i] is None:
+                        self.first[i] = value
+                    self.last[i] = value
+                    self.count[i] += 1
+                    continue
+                # The increasing run ended. Its values are only known if the
+                # run was dense (first..last without gaps).
+                if self.count[i] and self.count[i] != self.last[i] - self.first[i] + 1:
+                    self._drop(i)
+                    continue
+                seen = self.seen[i] = set()
+
+            in_run = isinstance(value, int) and self.count[i] and self.first[i] <= value <= self.last[i]
+            if in_run or value in seen or self.budget <= 0:
+                self._drop(i)
+                continue
+            seen.add(value)
+            self.budget -= 1
+
+    def candidates(self) -> List[int]:
+        """Indexes of the columns that are still unique and non-null."""
+        return [i for i, alive in enumerate(self.alive) if alive]
+
+    def _drop(self, i: int) -> None:
+        self.alive[i] = False
+        if self.seen[i] is not None:
+            self.budget += len(self.seen[i])
+            self.seen[i] = None
+
+
+def choose_key(columns: List[str], types: List[str], candidates: List[int]) -> Optional[List[str]]:
+    """
+    Pick a primary key among the candidate columns.
+
+    Only INTEGER and TEXT columns are considered (see KEY_TYPES). Integer
+    columns win (they can alias the rowid); among equals the column named
+    ``id`` comes first, then the leftmost one.
+    """
+    candidates = [i for i in candidates if types[i].upper() in KEY_TYPES]
+    if not candidates:
+        return None
+
+    def rank(i: int):
+        return (types[i].upper() != "INTEGER", columns[i] != "id", i)
+
+    return [columns[min(candidates, key=rank)]]
+
+
+def key_clause(
+    columns: List[str],
+    column_types: List[str],
+    primary_key: Optional[List[str]],
+    not_null: Iterable[str] = (),
+):
+    """
+    Return ``(column definitions, table options)`` for CREATE TABLE.
+
+    A single INTEGER key column is declared ``INTEGER PRIMARY KEY``; any
+    other key is a table constraint of a ``WITHOUT ROWID`` table. Columns
+    listed in ``not_null`` are declared NOT NULL.
+    """
+    if primary_key:
+        missing = [k for k in primary_key if k not in columns]
+        if missing:
+            raise ValueError(f"Primary key column(s) not found in input: {', '.join(missing)}")
+
+    rowid_alias = (
+        primary_key is not None
+        and len(primary_key) == 1
+        and column_types[columns.index(primary_key[0])].upper() == "INTEGER"
+    )
+
+    defs = []
+    for col, col_type in zip(columns, column_types):
+        if rowid_alias and col == primary_key[0]:
+            defs.append(f'"{col}" {col_type} PRIMARY KEY NOT NULL')
+        elif col in not_null:
+            defs.append(f'"{col}" {col_type} NOT NULL')
+        else:
+            defs.append(f'"{col}" {col_type}')
+
+    options = []
+    if primary_key and not rowid_alias:
+        key_list = ", ".join(f'"{k}"' for k in primary_key)
+        defs.append(f"PRIMARY KEY ({key_list})")
+        options.append("WITHOUT ROWID")
+
+    return ", ".join(defs), options
+
+
+def table_key(table: str) -> Optional[dict]:
+    """
+    Describe the primary key of ``table``.
+
+    Returns ``{"columns": [...], "kind": "rowid alias" | "without rowid" |
+    "primary key"}`` or None if the table has no primary key.
+    """
+    conn = get_conn()
+    try:
+        info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        key = [row[1] for row in sorted(info, key=lambda r: r[5]) if row[5]]
+        if not key:
+            return None
+
+        if not has_rowid(conn, table):
+            kind = "without rowid"
+        elif len(key) == 1 and info[[r[1] for r in info].index(key[0])][2].upper() == "INTEGER":
+            kind = "rowid alias"
+        else:
+            kind = "primary key"
+    finally:
+        conn.close()
+
+    return {"columns": key, "kind": kind}
+
+
+def has_rowid(conn: sqlite3.Connection, table: str) -> bool:
+    """False for WITHOUT ROWID tables (and views)."""
+    try:
+        conn.execute(f'SELECT rowid FROM "{table}" LIMIT 0')
+        return True
+    except sqlite3.OperationalError:
+        return False
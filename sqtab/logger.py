@@ -1,35 +1,179 @@
 """
 Logger module for sqtab.
 
-Provides a simple logging utility for recording sqtab operations.
-Logs will be appended to a local file named '.sqtab.log'.
+Records sqtab operations as JSON lines in a local file named '.sqtab.log'.
 
-This is the initial skeleton; more advanced logging features may be added later.
+- Entries carry a level (debug, info, warning, error); entries below the
+  configured level are dropped before any formatting work is done.
+- Entries are buffered in memory and written in one go when the buffer
+  fills up or the process exits.
+- The file is rotated by size ('.sqtab.log.1', '.sqtab.log.2', ...).
+- Each CLI command writes one summary entry with its duration and the
+  rows and bytes it processed (see log_command).
+
+Settings come from the environment (see sqtab.config.get_log_config) and
+can be overridden with configure(), e.g. ``configure(enabled=False)`` to
+switch logging off completely for hot paths.
 """
 
+import atexit
+import json
+import os
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+from sqtab.config import get_log_config
 
 LOG_PATH = Path(".sqtab.log")
 
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Entries kept in memory before they are written to disk.
+BUFFER_SIZE = 100
+
+# Longest string value stored in a log entry (e.g. SQL text).
+MAX_FIELD_CHARS = 200
+
+_settings: Optional[dict] = None
+_buffer: list = []
+
+
+def configure(
+    level: Optional[str] = None,
+    enabled: Optional[bool] = None,
+    max_bytes: Optional[int] = None,
+    backups: Optional[int] = None,
+) -> None:
+    """Override logging settings for the current process."""
+    settings = _get_settings()
 
-def log(message: str) -> None:
+    if level is not None:
+        if level not in LEVELS:
+            raise ValueError(f"Unknown log level '{level}'. Use one of: {', '.join(LEVELS)}.")
+        settings["threshold"] = LEVELS[level]
+    if enabled is not None:
+        settings["enabled"] = enabled
+    if max_bytes is not None:
+        settings["max_bytes"] = max_bytes
+    if backups is not None:
+        settings["backups"] = backups
+
+
+def log(message: str, level: str = "info", **fields) -> None:
     """
-    Append a log message to the local sqtab log file.
+    Record a log entry.
 
     Parameters
     ----------
     message : str
-        The message to record in the log file.
+        Short description of the event.
+    level : str
+        One of "debug", "info", "warning", "error".
+    **fields
+        Extra JSON-serializable values stored with the entry. Long strings
+        are truncated to MAX_FIELD_CHARS.
+    """
+    settings = _get_settings()
+    if not settings["enabled"] or LEVELS.get(level, 20) < settings["threshold"]:
+        return
+
+    entry = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "level": level,
+        "msg": _truncate(message),
+    }
+    for name, value in fields.items():
+        entry[name] = _truncate(value) if isinstance(value, str) else value
+
+    _buffer.append(json.dumps(entry, ensure_ascii=False, default=str))
+    if len(_buffer) >= BUFFER_SIZE:
+        flush()
+
+
+@contextmanager
+def log_command(command: str, **fields):
+    """
+    Time a CLI command and log one summary entry when it finishes.
 
-    Notes
-    -----
-    - Logging is minimal for now.
-    - Messages are timestamped using local time.
-    - Future improvements may include log levels, rotation, or configuration.
+    Yields a dict the command can fill with results such as ``rows``
+    and ``bytes``. The entry records ``duration_ms`` and ``status``.
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    stats = dict(fields)
+    start = perf_counter()
+    status = "error"
+    try:
+        yield stats
+        status = "ok"
+    except BaseException as exc:
+        # typer.Exit(0) is a normal way to end a command
+        if getattr(exc, "exit_code", 1) == 0:
+            status = "ok"
+        raise
+    finally:
+        duration_ms = round((perf_counter() - start) * 1000, 3)
+        log(
+            "command",
+            level="info" if status == "ok" else "error",
+            command=command,
+            status=status,
+            duration_ms=duration_ms,
+            **stats,
+        )
+
+
+def flush() -> None:
+    """Write buffered entries to the log file, rotating it if needed."""
+    if not _buffer:
+        return
+
+    settings = _get_settings()
+    data = "\n".join(_buffer) + "\n"
+    _buffer.clear()
+
+    try:
+        if LOG_PATH.exists() and LOG_PATH.stat().st_size + len(data) > settings["max_bytes"]:
+            _rotate(settings["backups"])
+
+        with LOG_PATH.open("a", encoding="utf-8") as f:
+            f.write(data)
+    except OSError:
+        # Logging must never break a command.
+        pass
+
+
+def _rotate(backups: int) -> None:
+    """Shift .sqtab.log → .sqtab.log.1 → ... keeping ``backups`` old files."""
+    if backups <= 0:
+        LOG_PATH.unlink()
+        return
+
+    for i in range(backups - 1, 0, -1):
+        src = LOG_PATH.with_name(f"{LOG_PATH.name}.{i}")
+        if src.exists():
+            os.replace(src, LOG_PATH.with_name(f"{LOG_PATH.name}.{i + 1}"))
+    os.replace(LOG_PATH, LOG_PATH.with_name(f"{LOG_PATH.name}.1"))
+
+
+def _truncate(value: str) -> str:
+    if len(value) <= MAX_FIELD_CHARS:
+        return value
+    return value[:MAX_FIELD_CHARS] + f"... ({len(value)} chars)"
+
+
+def _get_settings() -> dict:
+    global _settings
+    if _settings is None:
+        config = get_log_config()
+        _settings = {
+            "enabled": config["enabled"],
+            "threshold": LEVELS.get(config["level"], LEVELS["info"]),
+            "max_bytes": config["max_bytes"],
+            "backups": config["backups"],
+        }
+    return _settings
+
 
-    # TODO: expand logging capabilities in future commits.
-    with LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(f"[{timestamp}] {message}\n")
+atexit.register(flush)
@@ -0,0 +1,137 @@
+"""
+Database maintenance for sqtab.
+
+- Statistics: ``ANALYZE`` (full) or ``PRAGMA optimize`` (only where SQLite
+  thinks statistics are stale) so the query planner can pick good indexes.
+- Space: dropped tables leave free pages inside the file. An incremental
+  vacuum returns them to the OS without rewriting the database, but only
+  works when the database uses ``auto_vacuum = INCREMENTAL`` (the default
+  for databases created by sqtab). Otherwise a full ``VACUUM`` rewrites the
+  file and switches it to incremental mode for next time.
+- ``VACUUM INTO`` writes a compacted copy to a new file, optionally with a
+  different page size, and leaves the original untouched.
+"""
+
+import sqlite3
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+from sqtab.db import DB_PATH, get_conn
+from sqtab.logger import log
+
+VACUUM_MODES = ("none", "incremental", "full")
+
+# PRAGMA auto_vacuum values
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def optimize(
+    analyze: bool = True,
+    quick: bool = False,
+    vacuum: str = "incremental",
+    into: Optional[str | Path] = None,
+    page_size: Optional[int] = None,
+) -> dict:
+    """
+    Refresh planner statistics and reclaim free space.
+
+    Parameters
+    ----------
+    analyze : bool
+        Update planner statistics.
+    quick : bool
+        Use ``PRAGMA optimize`` instead of a full ``ANALYZE``.
+    vacuum : str
+        "none", "incremental" or "full" (see module docstring).
+    into : str | Path, optional
+        Write a compacted copy to this new file instead of vacuuming in place.
+    page_size : int, optional
+        Page size in bytes (power of two, 512-65536) for the full or
+        ``VACUUM INTO`` rewrite.
+
+    Returns
+    -------
+    dict
+        ``steps`` (name -> seconds), ``size_before``, ``size_after``,
+        ``reclaimed_bytes`` and ``seconds``; with ``into``, ``path`` and
+        ``size_after`` refer to the new file. ``reclaimed_bytes`` is
+        measured around the vacuum step only, so statistics written by
+        ANALYZE do not count against it, and is never negative.
+    """
+    if vacuum not in VACUUM_MODES:
+        raise ValueError(f"Unknown vacuum mode '{vacuum}'. Use one of: {', '.join(VACUUM_MODES)}.")
+    if page_size is not None and (page_size < 512 or page_size > 65536 or page_size & (page_size - 1)):
+        raise ValueError("Page size must be a power of two between 512 and 65536.")
+    if into is not None and Path(into).exists():
+        raise ValueError(f"File '{into}' already exists.")
+
+    started = perf_counter()
+    steps = {}
+    size_before = _file_size(DB_PATH)
+
+    conn = get_conn()
+    try:
+        if analyze:
+            t = perf_counter()
+            conn.execute("PRAGMA optimize" if quick else "ANALYZE")
+            conn.commit()
+            steps["optimize" if quick else "analyze"] = perf_counter() - t
+
+        size_vacuum = _file_size(DB_PATH)
+        t = perf_counter()
+        if into is not None:
+            if page_size:
+                conn.execute(f"PRAGMA page_size = {int(page_size)}")
+            conn.execute("VACUUM INTO ?", (str(into),))
+            steps["vacuum_into"] = perf_counter() - t
+        elif vacuum == "full" or (page_size and vacuum != "none"):
+            _full_vacuum(conn, page_size)
+            steps["vacuum"] = perf_counter() - t
+        elif vacuum == "incremental":
+            steps[reclaim_space(conn)] = perf_counter() - t
+    finally:
+        conn.close()
+
+    size_after = _file_size(Path(into) if into is not None else DB_PATH)
+    result = {
+        "steps": {name: round(seconds, 3) for name, seconds in steps.items()},
+        "size_before": size_before,
+        "size_after": size_after,
+        "reclaimed_bytes": max(0, size_vacuum - size_after),
+        "seconds": round(perf_counter() - started, 3),
+    }
+    if into is not None:
+        result["path"] = str(into)
+
+    log("database optimized", **{k: v for k, v in result.items() if k != "steps"})
+    return result
+
+
+def reclaim_space(conn: sqlite3.Connection) -> str:
+    """
+    Return free pages to the OS using the cheapest method available.
+
+    Returns the name of the step that ran: "incremental_vacuum" or "vacuum".
+    """
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == _AUTO_VACUUM_INCREMENTAL:
+        # executescript() steps the pragma to completion; execute() would
+        # stop after the first page because the pragma returns no rows.
+        conn.executescript("PRAGMA incremental_vacuum;")
+        return "incremental_vacuum"
+
+    _full_vacuum(conn)
+    return "vacuum"
+
+
+def _full_vacuum(conn: sqlite3.Connection, page_size: Optional[int] = None) -> None:
+    conn.commit()
+    # Takes effect on the rewrite, making later space reclamation incremental.
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if page_size:
+        conn.execute(f"PRAGMA page_size = {int(page_size)}")
+    conn.execute("VACUUM")
+
+
+def _file_size(path: Path) -> int:
+    return path.stat().st_size if path.exists() else 0
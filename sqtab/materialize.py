@@ -0,0 +1,274 @@
+"""
+Materialized views for sqtab.
+
+A materialized view is a regular table filled from a stored SELECT
+statement. Definitions are kept in an internal table together with the
+source tables the query reads and, per source, the highest rowid seen at
+the last refresh (the watermark).
+
+Refresh modes:
+
+- ``full``: rebuild the table from scratch.
+- ``incremental``: for append-only sources. Only rows above the watermark
+  are read and appended. The query must read a single table row by row
+  (no aggregates, DISTINCT, GROUP BY, LIMIT, window functions or compound
+  SELECTs), otherwise appending partial results would be wrong.
+
+Incremental refresh works by creating a TEMP view with the source's name
+that only exposes new rows; unqualified table names resolve to the temp
+schema first, so the stored query runs unchanged against the delta.
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime
+from typing import List, Optional
+
+from sqtab.db import INTERNAL_PREFIX, get_conn
+from sqtab.logger import log
+
+MATVIEW_TABLE = f"{INTERNAL_PREFIX}matviews"
+
+REFRESH_MODES = ("full", "incremental")
+
+_NOT_INCREMENTAL = re.compile(
+    r"\b(group\s+by|distinct|limit|offset|over|union|except|intersect)\b|"
+    r"\b(count|sum|avg|min|max|total|group_concat)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def create_materialized_view(name: str, sql: str, mode: str = "full") -> dict:
+    """
+    Create table ``name`` from ``sql`` and register it for refreshes.
+
+    Returns
+    -------
+    dict
+        ``name``, ``mode``, ``sources`` and ``rows`` (rows in the table).
+    """
+    if mode not in REFRESH_MODES:
+        raise ValueError(f"Unknown refresh mode '{mode}'. Use one of: {', '.join(REFRESH_MODES)}.")
+
+    sql = sql.strip().rstrip(";")
+
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+        ).fetchone()
+        if exists:
+            raise ValueError(f"Table or view '{name}' already exists.")
+
+        sources = _source_tables(conn, sql)
+        if name in sources:
+            raise ValueError("A materialized view cannot read from itself.")
+        if mode == "incremental":
+            _check_incremental(conn, sql, sources)
+
+        conn.execute("BEGIN IMMEDIATE")
+        watermarks = _watermarks(conn, sources) if mode == "incremental" else {}
+        conn.execute(f'CREATE TABLE "{name}" AS {sql}')
+        conn.execute(
+            f'INSERT INTO "{MATVIEW_TABLE}" (name, sql, mode, sources, watermarks, refreshed_at) '
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (name, sql, mode, json.dumps(sources), json.dumps(watermarks), _now()),
+        )
+        rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {"name": name, "mode": mode, "sources": sources, "rows": rows}
+
+
+def refresh(name: str, full: bool = False) -> dict:
+    """
+    Refresh a materialized view using its mode (or a full rebuild).
+
+    Returns
+    -------
+    dict
+        ``name``, ``mode`` (the mode actually used) and ``rows_added``.
+    """
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+        view = _load(conn, name)
+        if view is None:
+            raise ValueError(f"Materialized view '{name}' does not exist.")
+
+        conn.execute("BEGIN IMMEDIATE")
+        if view["mode"] == "incremental" and not full:
+            result = _refresh_incremental(conn, view)
+        else:
+            result = _refresh_full(conn, view)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    log("materialized view refreshed", view=name, mode=result["mode"], rows=result["rows_added"])
+    return result
+
+
+def refresh_dependents(table: str) -> List[dict]:
+    """
+    Refresh every materialized view that reads from ``table``.
+
+    Called by the importer after a load. Failures are logged and skipped so
+    a broken view never fails the import itself.
+    """
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+        rows = conn.execute(f'SELECT name, sources FROM "{MATVIEW_TABLE}" ORDER BY name').fetchall()
+    finally:
+        conn.close()
+
+    results = []
+    for name, sources in rows:
+        if table not in json.loads(sources):
+            continue
+        try:
+            results.append(refresh(name))
+        except (sqlite3.Error, ValueError) as exc:
+            log("materialized view refresh failed", level="warning", view=name, error=str(exc))
+    return results
+
+
+def list_materialized_views() -> List[dict]:
+    """Return all registered materialized views."""
+    conn = get_conn()
+    try:
+        _ensure_table(conn)
+        rows = conn.execute(
+            f'SELECT name, mode, sources, refreshed_at FROM "{MATVIEW_TABLE}" ORDER BY name'
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return [
+        {"name": name, "mode": mode, "sources": json.loads(sources), "refreshed_at": refreshed_at}
+        for name, mode, sources, refreshed_at in rows
+    ]
+
+
+def _refresh_full(conn: sqlite3.Connection, view: dict) -> dict:
+    name = view["name"]
+    watermarks = _watermarks(conn, view["sources"]) if view["mode"] == "incremental" else {}
+
+    conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+    conn.execute(f'CREATE TABLE "{name}" AS {view["sql"]}')
+    _save_watermarks(conn, name, watermarks)
+
+    rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+    return {"name": name, "mode": "full", "rows_added": rows}
+
+
+def _refresh_incremental(conn: sqlite3.Connection, view: dict) -> dict:
+    name = view["name"]
+    old = view["watermarks"]
+    new = _watermarks(conn, view["sources"])
+
+    # Shadow each source with a temp view that only exposes new rows.
+    for source in view["sources"]:
+        conn.execute(
+            f'CREATE TEMP VIEW "{source}" AS SELECT * FROM main."{source}" '
+            f"WHERE rowid > {int(old.get(source, 0))} AND rowid <= {int(new[source])}"
+        )
+    try:
+        cur = conn.execute(f'INSERT INTO main."{name}" {view["sql"]}')
+        added = cur.rowcount
+    finally:
+        for source in view["sources"]:
+            conn.execute(f'DROP VIEW IF EXISTS temp."{source}"')
+
+    _save_watermarks(conn, name, new)
+    return {"name": name, "mode": "incremental", "rows_added": added}
+
+
+def _check_incremental(conn: sqlite3.Connection, sql: str, sources: List[str]) -> None:
+    if len(sources) != 1:
+        raise ValueError("Incremental views must read from exactly one table.")
+    if _NOT_INCREMENTAL.search(sql):
+        raise ValueError(
+            "Incremental views must be row-by-row SELECTs "
+            "(no aggregates, DISTINCT, GROUP BY, LIMIT, window functions or UNION)."
+        )
+    try:
+        conn.execute(f'SELECT rowid FROM "{sources[0]}" LIMIT 0')
+    except sqlite3.OperationalError:
+        raise ValueError(f"Incremental views need a rowid on '{sources[0]}'.")
+
+
+def _source_tables(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """Return the tables ``sql`` reads, as reported by SQLite's authorizer."""
+    tables = set()
+
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_READ and db_name == "main" and arg1:
+            tables.add(arg1)
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    try:
+        conn.execute(f"SELECT * FROM ({sql}) LIMIT 0").fetchall()
+    finally:
+        conn.set_authorizer(None)
+
+    return sorted(t for t in tables if not t.startswith(("sqlite_", INTERNAL_PREFIX)))
+
+
+def _watermarks(conn: sqlite3.Connection, sources: List[str]) -> dict:
+    return {
+        source: conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{source}"').fetchone()[0]
+        for source in sources
+    }
+
+
+def _save_watermarks(conn: sqlite3.Connection, name: str, watermarks: dict) -> None:
+    conn.execute(
+        f'UPDATE "{MATVIEW_TABLE}" SET watermarks = ?, refreshed_at = ? WHERE name = ?',
+        (json.dumps(watermarks), _now(), name),
+    )
+
+
+def _load(conn: sqlite3.Connection, name: str) -> Optional[dict]:
+    row = conn.execute(
+        f'SELECT name, sql, mode, sources, watermarks FROM "{MATVIEW_TABLE}" WHERE name = ?',
+        (name,),
+    ).fetchone()
+    if row is None:
+        return None
+
+    return {
+        "name": row[0],
+        "sql": row[1],
+        "mode": row[2],
+        "sources": json.loads(row[3]),
+        "watermarks": json.loads(row[4]),
+    }
+
+
+def _ensure_table(conn: sqlite3.Connection) -> None:
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{MATVIEW_TABLE}" (
+            name TEXT PRIMARY KEY,
+            sql TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            sources TEXT NOT NULL,
+            watermarks TEXT NOT NULL,
+            refreshed_at TEXT NOT NULL
+        )
+    ''')
+    conn.commit()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
@@ -0,0 +1,73 @@
+"""
+Command metrics for sqtab.
+
+Collects per-phase timings, counters and peak memory for long-running
+commands such as import and export, and writes them as JSON for external
+schedulers and dashboards.
+"""
+
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+
+class Metrics:
+    """Accumulates phase durations (seconds) and counters for one command."""
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.details = {}
+        self._started = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block and add it to phase ``name``."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + perf_counter() - start
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add ``value`` to counter ``name``."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def detail(self, name: str, value) -> None:
+        """Record a result that is not a count, e.g. the tables written."""
+        self.details[name] = value
+
+    def as_dict(self) -> dict:
+        data = {
+            "total_seconds": round(perf_counter() - self._started, 6),
+            "phases": {name: round(sec, 6) for name, sec in self.phases.items()},
+            "counters": dict(self.counters),
+            "peak_memory_bytes": peak_memory_bytes(),
+        }
+        if self.details:
+            data["details"] = dict(self.details)
+        return data
+
+    def write_json(self, path: str | Path) -> None:
+        """Write the collected metrics to ``path`` as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+def peak_memory_bytes() -> Optional[int]:
+    """
+    Return the peak resident memory of this process in bytes.
+
+    Returns None on platforms without the ``resource`` module (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,92 @@
+"""
+Live progress bars for long-running sqtab commands.
+
+Bars are drawn on stderr so command output on stdout stays clean. Each
+helper yields a callback for the importer or exporter, or None when
+progress display is disabled.
+"""
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Optional
+
+from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
+
+
+def _rate(rows: int, started: float) -> str:
+    elapsed = perf_counter() - started
+    return f"{rows / elapsed:,.0f}" if elapsed > 0 else "0"
+
+
+@contextmanager
+def import_progress(description: str, total_bytes: int, enabled: bool = True):
+    """
+    Show bytes read, rows, rows/sec and ETA while a file is imported.
+
+    Yields ``update(bytes_done, rows_done)``.
+    """
+    if not enabled:
+        yield None
+        return
+
+    progress = Progress(
+        TextColumn("[bold]{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TextColumn("{task.fields[rows]:,} rows"),
+        TextColumn("{task.fields[rate]} rows/s"),
+        TimeRemainingColumn(),
+        console=Console(stderr=True),
+    )
+    started = perf_counter()
+
+    with progress:
+        task = progress.add_task(description, total=total_bytes, rows=0, rate="0")
+
+        def update(bytes_done: int, rows_done: int) -> None:
+            progress.update(task, completed=bytes_done, rows=rows_done, rate=_rate(rows_done, started))
+
+        yield update
+
+
+@contextmanager
+def export_progress(description: str, total_rows: Optional[int], enabled: bool = True):
+    """
+    Show rows written, rows/sec and ETA while data is exported.
+
+    ``total_rows`` may be None when it is not known up front (query exports);
+    the bar then only counts rows.
+
+    Yields ``update(rows_done)``.
+    """
+    if not enabled:
+        yield None
+        return
+
+    rows_column = "{task.completed:,} rows" if total_rows is None else "{task.completed:,}/{task.total:,} rows"
+    progress = Progress(
+        TextColumn("[bold]{task.description}"),
+        BarColumn(),
+        TextColumn(rows_column),
+        TextColumn("{task.fields[rate]} rows/s"),
+        TimeRemainingColumn(),
+        console=Console(stderr=True),
+    )
+    started = perf_counter()
+
+    with progress:
+        task = progress.add_task(description, total=total_rows, rate="0")
+
+        def update(rows_done: int) -> None:
+            progress.update(task, completed=rows_done, rate=_rate(rows_done, started))
+
+        yield update
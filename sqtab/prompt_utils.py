@@ -1,7 +1,11 @@
 from string import Template
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
+# Average characters per token for English text, markdown and SQL; close
+# enough to budget prompts without a tokenizer dependency.
+CHARS_PER_TOKEN = 4
+
 
 def load_prompt_template(path: Path) -> Template:
     return Template(path.read_text(encoding="utf-8"))
@@ -20,24 +24,76 @@ def schema_to_markdown(schema: List[dict]) -> str:
     return "\n".join([header, sep, *rows])
 
 
-def samples_to_markdown(samples: List[dict]) -> str:
-    if not samples:
+def samples_to_markdown(
+    samples: List[dict],
+    columns: Optional[List[str]] = None,
+    max_rows: int = 10,
+    max_cell: Optional[int] = None,
+) -> str:
+    """Render sample rows; optionally only ``columns``, with cells cut to ``max_cell`` chars."""
+    if not samples or max_rows <= 0:
         return "(no sample rows)"
 
-    samples = samples[:10]
-    cols = samples[0].keys()
+    samples = samples[:max_rows]
+    cols = columns if columns is not None else samples[0].keys()
 
     header = "| " + " | ".join(cols) + " |"
     sep    = "| " + " | ".join("---" for _ in cols) + " |"
 
     rows = []
     for row in samples:
-        values = [str(row[col]) for col in cols]
+        if max_cell:
+            values = [truncate_cell(row[col], max_cell) for col in cols]
+        else:
+            values = [str(row[col]) for col in cols]
         rows.append("| " + " | ".join(values) + " |")
 
     return "\n".join([header, sep, *rows])
 
 
+def stats_to_markdown(stats: List[dict], max_cell: int = 40, top_values: bool = True) -> str:
+    """Render per-column statistics (see analyzer.column_stats) as a table."""
+    if not stats:
+        return "(no columns)"
+
+    header = "| name | non_null | distinct | min | max | median | stddev | avg_len |"
+    sep    = "|------|----------|----------|-----|-----|--------|--------|---------|"
+    if top_values:
+        header += " top values |"
+        sep += "------------|"
+
+    rows = []
+    for c in stats:
+        avg_len = "" if c["avg_len"] is None else f"{c['avg_len']:.0f}"
+        cells = [
+            c["name"], str(c["non_null"]), str(c["distinct"]),
+            truncate_cell(c["min"], max_cell), truncate_cell(c["max"], max_cell),
+            _number_cell(c.get("median")), _number_cell(c.get("stddev")), avg_len,
+        ]
+        if top_values:
+            cells.append(", ".join(f"{truncate_cell(v, max_cell)} ({n})" for v, n in c["top"]))
+        rows.append("| " + " | ".join(cells) + " |")
+
+    return "\n".join([header, sep, *rows])
+
+
+def _number_cell(value) -> str:
+    return "" if value is None else f"{value:.4g}"
+
+
+def truncate_cell(value, limit: int) -> str:
+    """One-line, pipe-safe text of ``value``, cut to ``limit`` characters."""
+    if value is None:
+        return ""
+    text = str(value).replace("\n", " ").replace("|", "\\|")
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens ``text`` will use."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
 def validate_list(name: str, items: List[str]) -> List[str]:
     if not items:
         return []
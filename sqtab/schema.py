@@ -0,0 +1,175 @@
+"""
+Declared schemas for recurring CSV feeds.
+
+``import --schema schema.json`` skips type inference: the table is created
+up front from the schema and every value goes through the converter of its
+declared kind (see sqtab.typed) in a single pass. A schema file looks like::
+
+    {
+      "columns": [
+        {"name": "id", "type": "integer", "nullable": false},
+        {"name": "email", "type": "text"},
+        {"name": "signup", "type": "date"}
+      ],
+      "primary_key": ["id"]
+    }
+
+Types are the typed-mode kinds (integer, real, boolean, date, timestamp,
+text); columns are nullable unless ``"nullable": false``. The table is
+STRICT, so types stay the same from one load to the next.
+
+Records that do not fit (bad value, missing required value, duplicate key)
+are written to a reject file with the reason instead of aborting the load.
+"""
+
+import csv
+import json
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Union
+
+from sqtab.keys import key_clause
+from sqtab.typed import KINDS, STORAGE, convert, save_kinds
+
+# Other common spellings accepted for the kinds.
+TYPE_ALIASES = {
+    "int": "integer",
+    "float": "real",
+    "double": "real",
+    "bool": "boolean",
+    "datetime": "timestamp",
+    "string": "text",
+}
+
+
+class Schema:
+    """Column names, kinds, nullability and primary key of a table."""
+
+    def __init__(
+        self,
+        names: List[str],
+        kinds: List[str],
+        nullable: List[bool],
+        primary_key: Optional[List[str]] = None,
+    ):
+        self.names = names
+        self.kinds = kinds
+        self.nullable = nullable
+        self.primary_key = primary_key
+
+    def convert(self, record: List[str]) -> list:
+        """Convert one record in schema column order; ValueError names the column."""
+        row = []
+        for name, kind, nullable, value in zip(self.names, self.kinds, self.nullable, record):
+            try:
+                value = convert(kind, value)
+            except ValueError:
+                raise ValueError(f"Value '{value}' in column '{name}' is not a valid {kind}.")
+            if value is None and not nullable:
+                raise ValueError(f"Column '{name}' requires a value.")
+            row.append(value)
+        return row
+
+    def create_table(self, cur: sqlite3.Cursor, table: str) -> None:
+        """Create ``table`` as declared (STRICT) and record the column kinds."""
+        types = [STORAGE[kind] for kind in self.kinds]
+        not_null = [n for n, nullable in zip(self.names, self.nullable) if not nullable]
+        col_defs, options = key_clause(self.names, types, self.primary_key, not_null)
+        options.append("STRICT")
+        cur.execute(f'CREATE TABLE "{table}" ({col_defs}) {", ".join(options)}')
+        save_kinds(cur, table, self.names, self.kinds)
+
+
+def load_schema(source: Union[str, Path, dict]) -> Schema:
+    """
+    Read a schema from a JSON file (or an already parsed dict).
+
+    Raises ValueError describing the first problem found.
+    """
+    from sqtab.importer import normalize_column
+
+    if isinstance(source, dict):
+        spec = source
+    else:
+        try:
+            with open(source, encoding="utf-8") as f:
+                spec = json.load(f)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid schema file {source}: {exc}")
+
+    columns = spec.get("columns") if isinstance(spec, dict) else None
+    if not columns or not isinstance(columns, list):
+        raise ValueError("Invalid schema: expected a non-empty \"columns\" list.")
+
+    names, kinds, nullable = [], [], []
+    for column in columns:
+        if not isinstance(column, dict) or not column.get("name"):
+            raise ValueError("Invalid schema: every column needs a \"name\".")
+        name = normalize_column(column["name"])
+        kind = str(column.get("type", "text")).lower()
+        kind = TYPE_ALIASES.get(kind, kind)
+        if kind not in KINDS:
+            raise ValueError(
+                f"Invalid schema: unknown type '{column.get('type')}' for column '{name}' "
+                f"(expected one of: {', '.join(KINDS)})."
+            )
+        if name in names:
+            raise ValueError(f"Invalid schema: duplicate column '{name}'.")
+        names.append(name)
+        kinds.append(kind)
+        nullable.append(bool(column.get("nullable", True)))
+
+    primary_key = spec.get("primary_key")
+    if isinstance(primary_key, str):
+        primary_key = [primary_key]
+    if primary_key:
+        primary_key = [normalize_column(k) for k in primary_key]
+        missing = [k for k in primary_key if k not in names]
+        if missing:
+            raise ValueError(f"Invalid schema: primary key column(s) not declared: {', '.join(missing)}")
+        for k in primary_key:
+            nullable[names.index(k)] = False
+
+    return Schema(names, kinds, nullable, primary_key or None)
+
+
+def default_reject_path(path: Union[str, Path]) -> Path:
+    """``data.csv`` → ``data.rejects.csv`` next to the input file."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.rejects.csv")
+
+
+class RejectWriter:
+    """
+    Write rejected CSV records, plus an ``error`` column, to a CSV file.
+
+    The file is only created once there is something to write; a reject
+    file left by an earlier run is removed. With ``append=True`` (resumed
+    imports) records are added to the existing file instead.
+    """
+
+    def __init__(self, path: Union[str, Path], header: List[str], append: bool = False):
+        self.path = Path(path)
+        self.header = header
+        self.append = append
+        self.count = 0
+        self._file = None
+        self._writer = None
+        if not append and self.path.exists():
+            self.path.unlink()
+
+    def write(self, record: List[str], reason: str) -> None:
+        if self._writer is None:
+            has_rows = self.append and self.path.exists() and self.path.stat().st_size > 0
+            self._file = open(self.path, "a" if has_rows else "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            if not has_rows:
+                self._writer.writerow(self.header + ["error"])
+        self._writer.writerow(list(record) + [reason])
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
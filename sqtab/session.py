@@ -0,0 +1,271 @@
+"""
+Python API for sqtab.
+
+A Session holds one connection and exposes the CLI's engine to Python
+code without shelling out or going through files::
+
+    import sqtab
+
+    with sqtab.Session() as db:
+        db.import_rows(({"id": i, "name": n} for i, n in source), "users", key="id")
+        for row in db.query("SELECT * FROM users WHERE id > ?", (10,), kind="dicts"):
+            ...
+        db.export("SELECT * FROM users", "users.json")
+        stats = db.profile("users")
+
+Rows are read and written in batches, so memory use does not grow with
+the size of the input or of the result.
+"""
+
+from collections.abc import Mapping
+from datetime import date, datetime, time
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+from sqtab import frames
+from sqtab.analyzer import column_stats
+from sqtab.db import DB_PATH, get_conn, list_tables
+from sqtab.exporter import FETCH_SIZE, CsvSink, JsonSink, write_result
+from sqtab.importer import (
+    BATCH_SIZE,
+    COMMIT_EVERY,
+    MERGE_MODES,
+    add_counts,
+    batched,
+    check_table_columns,
+    empty_counts,
+    ensure_unique_index,
+    normalize_column,
+    table_exists,
+    write_rows,
+)
+from sqtab.materialize import refresh_dependents
+
+QUERY_KINDS = ("rows", "dicts", "batches")
+
+
+class Session:
+    """A connection to a sqtab database (``sqtab.db`` unless ``path`` is given)."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else DB_PATH
+        self.conn = get_conn(self.path)
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def tables(self) -> List[str]:
+        """Names of the user tables and views."""
+        return list_tables(self.conn)
+
+    def execute(self, sql: str, params: Sequence = ()) -> int:
+        """Run a statement, commit, and return the number of affected rows."""
+        cur = self.conn.execute(sql, params)
+        self.conn.commit()
+        return cur.rowcount
+
+    def import_rows(
+        self,
+        rows: Iterable[Union[Mapping, Sequence]],
+        table: str,
+        columns: Optional[List[str]] = None,
+        key: Optional[Union[str, List[str]]] = None,
+        mode: str = "upsert",
+    ) -> dict:
+        """
+        Load rows from any iterable into ``table``.
+
+        Parameters
+        ----------
+        rows : iterable of dict or sequence
+            Rows as mappings (columns default to the keys of the first row)
+            or as sequences (``columns`` is then required). Values are stored
+            as given; dates and times are stored as ISO 8601 text.
+        table : str
+            Target table; created from the types of the first batch of
+            values if it does not exist.
+        columns : list[str], optional
+            Column names, in row order for sequences.
+        key : str | list[str], optional
+            Merge on these key column(s) instead of appending (see
+            importer.merge_file).
+        mode : str
+            Merge mode used with ``key``: upsert, replace or insert-ignore.
+
+        Returns
+        -------
+        dict
+            Row counts: rows, inserted, updated, unchanged.
+        """
+        if key is not None and mode not in MERGE_MODES:
+            raise ValueError(f"Unknown merge mode '{mode}'. Use one of: {', '.join(MERGE_MODES)}.")
+        if isinstance(key, str):
+            key = [normalize_column(k) for k in key.split(",") if k.strip()]
+
+        rows = iter(rows)
+        first = list(islice(rows, BATCH_SIZE))
+        if not first:
+            return empty_counts()
+
+        if isinstance(first[0], Mapping):
+            fields = list(columns or first[0].keys())
+            to_values = lambda row: [_adapt(row.get(f)) for f in fields]
+        elif columns is None:
+            raise ValueError("Column names are required when rows are sequences.")
+        else:
+            fields = list(columns)
+            to_values = lambda row: [_adapt(v) for v in row]
+        names = [normalize_column(f) for f in fields]
+
+        cur = self.conn.cursor()
+        counts = empty_counts()
+        try:
+            if table_exists(cur, table):
+                check_table_columns(cur, table, names)
+            else:
+                values = [to_values(row) for row in first]
+                col_defs = ", ".join(
+                    f'"{name}" {_column_type(v[i] for v in values)}' for i, name in enumerate(names)
+                )
+                cur.execute(f'CREATE TABLE "{table}" ({col_defs})')
+            if key is not None:
+                ensure_unique_index(cur, table, key)
+
+            for chunk in batched(chain(first, rows), COMMIT_EVERY):
+                values = [to_values(row) for row in chunk]
+                add_counts(counts, write_rows(cur, table, names, values, key=key, mode=mode))
+                self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+        self._refresh(table, counts)
+        return counts
+
+    def import_frame(self, frame, table: str, key: Optional[Union[str, List[str]]] = None, mode: str = "upsert") -> dict:
+        """Load a pandas DataFrame column by column (see frames.import_frame)."""
+        counts = frames.import_frame(self.conn, frame, table, key=key, mode=mode)
+        self._refresh(table, counts)
+        return counts
+
+    def query(self, sql: str, params: Sequence = (), kind: str = "rows", batch_size: int = FETCH_SIZE) -> Iterator:
+        """
+        Run a query and iterate over its result.
+
+        ``kind`` selects what is yielded: ``rows`` (tuples), ``dicts``
+        (column name → value) or ``batches`` (lists of up to ``batch_size``
+        tuples). Rows are fetched ``batch_size`` at a time.
+        """
+        if kind not in QUERY_KINDS:
+            raise ValueError(f"Unknown query kind '{kind}'. Use one of: {', '.join(QUERY_KINDS)}.")
+        return self._iter_query(sql, params, kind, batch_size)
+
+    def query_arrays(self, sql: str, params: Sequence = (), dtypes=None) -> dict:
+        """Result as ``{column: numpy.ndarray}`` (see frames.fetch_arrays)."""
+        return frames.fetch_arrays(self.conn, sql, params, dtypes)
+
+    def query_frame(self, sql: str, params: Sequence = (), dtypes=None):
+        """Result as a ``pandas.DataFrame`` (see frames.fetch_frame)."""
+        return frames.fetch_frame(self.conn, sql, params, dtypes)
+
+    def query_arrow(self, sql: str, params: Sequence = (), dtypes=None):
+        """Result as a ``pyarrow.Table`` (see frames.fetch_arrow)."""
+        return frames.fetch_arrow(self.conn, sql, params, dtypes)
+
+    def export(self, sql: str, writer, params: Sequence = ()) -> int:
+        """
+        Stream the result of ``sql`` to ``writer`` and return the row count.
+
+        ``writer`` is a ``.csv`` or ``.json`` output path (written like
+        ``sqtab export``), or a ``csv.writer``-like object with
+        ``writerow``/``writerows``, which receives the header row first.
+        """
+        if isinstance(writer, (str, Path)):
+            path = Path(writer)
+            sinks = {".csv": CsvSink, ".json": JsonSink}
+            if path.suffix.lower() not in sinks:
+                raise ValueError("Export path must end with .csv or .json.")
+            open_sink = lambda columns: sinks[path.suffix.lower()](path, columns)
+        else:
+            open_sink = lambda columns: _WriterSink(writer, columns)
+        return write_result(self.conn, sql, open_sink, params=tuple(params))
+
+    def profile(self, table: str) -> dict:
+        """
+        Column statistics of ``table`` (see analyzer.column_stats), plus its
+        total ``row_count`` and each column's declared ``type``.
+        """
+        info = self.conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        if not info:
+            raise ValueError(f"Table '{table}' does not exist.")
+        schema = [{"name": c[1], "type": c[2] or "UNKNOWN"} for c in info]
+
+        stats = column_stats(table, schema, conn=self.conn)
+        for column, declared in zip(stats["columns"], schema):
+            column["type"] = declared["type"]
+        stats["row_count"] = self.conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        return stats
+
+    def _refresh(self, table: str, counts: dict) -> None:
+        # Materialized views live in the default database only.
+        if counts["rows"] and self.path.resolve() == DB_PATH.resolve():
+            refresh_dependents(table)
+
+    def _iter_query(self, sql: str, params: Sequence, kind: str, batch_size: int) -> Iterator:
+        cur = self.conn.execute(sql, params)
+        columns = [c[0] for c in cur.description] if cur.description else []
+        try:
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    return
+                if kind == "batches":
+                    yield batch
+                elif kind == "dicts":
+                    yield from (dict(zip(columns, row)) for row in batch)
+                else:
+                    yield from batch
+        finally:
+            cur.close()
+
+
+class _WriterSink:
+    """Adapter from the exporter's sink interface to a csv.writer-like object."""
+
+    def __init__(self, writer, columns: list):
+        self.writer = writer
+        writer.writerow(columns)
+
+    def write(self, rows) -> None:
+        self.writer.writerows(rows)
+
+    def close(self) -> None:
+        pass
+
+
+def _adapt(value):
+    """Store dates and times as ISO 8601 text, like the typed CSV importer reads them."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _column_type(values: Iterable) -> str:
+    """SQLite column type for a column holding these Python values."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return "TEXT"
+    if kinds <= {int, bool}:
+        return "INTEGER"
+    if kinds <= {int, bool, float}:
+        return "REAL"
+    if kinds <= {bytes, bytearray, memoryview}:
+        return "BLOB"
+    return "TEXT"
@@ -0,0 +1,248 @@
+"""
+Typed storage for sqtab.
+
+With ``import --typed`` each CSV column gets a *kind* that is richer than
+SQLite's storage classes, and values are converted to a compact form:
+
+- ``integer``, ``real``, ``text``: stored as-is.
+- ``boolean``: ``true``/``false`` (any case), stored as INTEGER 0/1.
+- ``date``: ``YYYY-MM-DD``, ``YYYY/MM/DD`` or ``DD.MM.YYYY[.]``, stored as
+  INTEGER Unix seconds at midnight UTC.
+- ``timestamp``: ISO 8601 ``YYYY-MM-DD[T ]HH:MM[:SS][Z|±HH:MM]``, stored as
+  INTEGER Unix seconds (values without an offset are taken as UTC).
+  Timestamps with fractional seconds are kept as text.
+
+Tables are created ``STRICT`` (SQLite 3.37+), so SQLite enforces the
+storage types. The
+kind of every column is recorded in an internal table; later imports into
+the same table convert values the same way, and ``describe`` shows the
+kinds. Dates can be displayed with ``date(col, 'unixepoch')`` and
+``datetime(col, 'unixepoch')``.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
+
+from sqtab.db import INTERNAL_PREFIX, get_conn
+
+COLUMNS_TABLE = f"{INTERNAL_PREFIX}columns"
+
+KINDS = ("integer", "real", "boolean", "date", "timestamp", "text")
+
+# SQLite column type used for each kind.
+STORAGE = {
+    "integer": "INTEGER",
+    "real": "REAL",
+    "boolean": "INTEGER",
+    "date": "INTEGER",
+    "timestamp": "INTEGER",
+    "text": "TEXT",
+}
+
+_BOOLEANS = {"true": 1, "false": 0}
+
+_DATE_FORMATS = (
+    (re.compile(r"^(\d{4})-(\d{2})-(\d{2})$"), (1, 2, 3)),
+    (re.compile(r"^(\d{4})/(\d{2})/(\d{2})$"), (1, 2, 3)),
+    (re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})\.?$"), (3, 2, 1)),
+)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_TIMESTAMP = re.compile(
+    r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2})?(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+# Offsets without a colon (+0200); datetime.fromisoformat before Python
+# 3.11 only reads +02:00, and no Z.
+_COMPACT_OFFSET = re.compile(r"([+-]\d{2})(\d{2})$")
+
+# First SQLite version with STRICT tables.
+STRICT_MIN_VERSION = (3, 37, 0)
+
+
+def require_strict() -> None:
+    """Raise ValueError when the SQLite library cannot create STRICT tables."""
+    if sqlite3.sqlite_version_info < STRICT_MIN_VERSION:
+        raise ValueError(
+            "Typed tables need SQLite 3.37 or newer (STRICT tables); "
+            f"this Python uses SQLite {sqlite3.sqlite_version}."
+        )
+
+
+def detect_kind(value: str) -> Optional[str]:
+    """Return the kind of one raw CSV value, or None for an empty value."""
+    value = value.strip()
+    if value == "":
+        return None
+
+    try:
+        int(value)
+        return "integer"
+    except ValueError:
+        pass
+
+    try:
+        float(value)
+        return "real"
+    except ValueError:
+        pass
+
+    if value.lower() in _BOOLEANS:
+        return "boolean"
+
+    for kind in ("date", "timestamp"):
+        try:
+            convert(kind, value)
+            return kind
+        except ValueError:
+            pass
+
+    return "text"
+
+
+def merge_kinds(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """Return the narrowest kind that can hold values of both kinds."""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    if {a, b} == {"integer", "real"}:
+        return "real"
+    if {a, b} == {"date", "timestamp"}:
+        return "timestamp"
+    return "text"
+
+
+def narrow_kind(current: Optional[str], value: str) -> Optional[str]:
+    """Combine the kind inferred so far with one more raw value."""
+    if current == "text":
+        return current
+    if current is not None:
+        # Most values have the kind already seen; checking that first is
+        # much cheaper than full detection.
+        try:
+            _PARSERS[current](value.strip())
+            return current
+        except (ValueError, KeyError):
+            pass
+    return merge_kinds(current, detect_kind(value))
+
+
+def convert(kind: str, value: str):
+    """
+    Convert a raw CSV value to its stored form for ``kind``.
+
+    Empty values become NULL. Raises ValueError if the value does not fit.
+    """
+    value = value.strip()
+    if value == "":
+        return None
+    return _PARSERS[kind](value)
+
+
+def convert_record(kinds: List[str], record: List[str], columns: Optional[List[str]] = None) -> list:
+    """Convert one CSV record, naming the column in conversion errors."""
+    try:
+        return [convert(kind, value) for kind, value in zip(kinds, record)]
+    except ValueError:
+        for i, (kind, value) in enumerate(zip(kinds, record)):
+            try:
+                convert(kind, value)
+            except ValueError:
+                name = columns[i] if columns else f"#{i + 1}"
+                raise ValueError(f"Value '{value}' in column '{name}' is not a valid {kind}.")
+        raise
+
+
+def save_kinds(cur: sqlite3.Cursor, table: str, columns: List[str], kinds: Optional[List[str]]) -> None:
+    """Record the column kinds of ``table``; None forgets any previous ones."""
+    _ensure_table(cur)
+    cur.execute(f'DELETE FROM "{COLUMNS_TABLE}" WHERE table_name = ?', (table,))
+    if kinds:
+        cur.executemany(
+            f'INSERT INTO "{COLUMNS_TABLE}" (table_name, column_name, kind) VALUES (?, ?, ?)',
+            [(table, column, kind) for column, kind in zip(columns, kinds)],
+        )
+
+
+def load_kinds(cur: sqlite3.Cursor, table: str) -> Optional[Dict[str, str]]:
+    """Return ``{column: kind}`` for a table created in typed mode, else None."""
+    _ensure_table(cur)
+    rows = cur.execute(
+        f'SELECT column_name, kind FROM "{COLUMNS_TABLE}" WHERE table_name = ?', (table,)
+    ).fetchall()
+    return dict(rows) or None
+
+
+def column_kinds(table: str) -> Optional[Dict[str, str]]:
+    """Like load_kinds, opening its own connection."""
+    conn = get_conn()
+    try:
+        return load_kinds(conn.cursor(), table)
+    finally:
+        conn.close()
+
+
+def _parse_boolean(value: str) -> int:
+    try:
+        return _BOOLEANS[value.lower()]
+    except KeyError:
+        raise ValueError(f"'{value}' is not a boolean")
+
+
+def _parse_date(value: str) -> int:
+    if len(value) == 10 and value[4] == "-" and value[7] == "-" and value.replace("-", "").isdigit():
+        day = date.fromisoformat(value)  # fast path for YYYY-MM-DD
+    else:
+        for pattern, (y, m, d) in _DATE_FORMATS:
+            match = pattern.match(value)
+            if match:
+                day = date(int(match.group(y)), int(match.group(m)), int(match.group(d)))
+                break
+        else:
+            raise ValueError(f"'{value}' is not a date")
+    return (day.toordinal() - _EPOCH_ORDINAL) * 86400
+
+
+def _parse_timestamp(value: str) -> int:
+    if not _TIMESTAMP.match(value):
+        raise ValueError(f"'{value}' is not a timestamp")
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    else:
+        value = _COMPACT_OFFSET.sub(r"\1:\2", value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def _parse_date_or_timestamp(value: str) -> int:
+    try:
+        return _parse_date(value)  # a plain date is midnight
+    except ValueError:
+        return _parse_timestamp(value)
+
+
+_PARSERS = {
+    "integer": int,
+    "real": float,
+    "boolean": _parse_boolean,
+    "date": _parse_date,
+    "timestamp": _parse_date_or_timestamp,
+    "text": str,
+}
+
+
+def _ensure_table(cur: sqlite3.Cursor) -> None:
+    cur.execute(f'''
+        CREATE TABLE IF NOT EXISTS "{COLUMNS_TABLE}" (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            PRIMARY KEY (table_name, column_name)
+        )
+    ''')
@@ -0,0 +1,29 @@
+"""
+Keep the database, query cache and log written by the tests out of the
+working directory.
+
+Modules that import DB_PATH by name bind it when they are first imported,
+so the paths are redirected here, before the test modules are collected.
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import sqtab.db
+import sqtab.logger
+
+_TMP_DIR = Path(tempfile.mkdtemp(prefix="sqtab-tests-"))
+
+sqtab.db.DB_PATH = _TMP_DIR / "sqtab.db"
+sqtab.logger.LOG_PATH = _TMP_DIR / ".sqtab.log"
+
+# The query cache lives next to the database (see sqtab.cache.cache_path).
+for _module in list(sys.modules.values()):
+    if getattr(_module, "__name__", "").startswith("sqtab.") and hasattr(_module, "DB_PATH"):
+        _module.DB_PATH = sqtab.db.DB_PATH
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
@@ -0,0 +1,98 @@
+import unittest
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from sqtab import ai_client
+from sqtab.ai_sql import generate_sql_from_nl
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stub",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15},
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers chat completions with the queued (status, body) replies."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(self.path)
+        status, body = self.server.replies.pop(0)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAIClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self.server.replies = []
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        env = {
+            "OPENAI_API_KEY": "sk-test",
+            "SQTAB_AI_BASE_URL": f"http://127.0.0.1:{self.server.server_port}/v1",
+            "SQTAB_AI_MAX_RETRIES": "2",
+            "SQTAB_AI_TIMEOUT": "5",
+        }
+        self.patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(ai_client, "BACKOFF_BASE", 0.01),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retries_rate_limits_and_server_errors(self):
+        error = {"error": {"message": "slow down", "type": "rate_limit"}}
+        self.server.replies = [(429, error), (503, error), (200, _completion("SELECT 1"))]
+
+        self.assertEqual(ai_client.chat([{"role": "user", "content": "hi"}], model="stub"), "SELECT 1")
+        self.assertEqual(self.server.requests, ["/v1/chat/completions"] * 3)
+
+    def test_gives_up_after_max_retries(self):
+        error = {"error": {"message": "down", "type": "server_error"}}
+        self.server.replies = [(500, error)] * 3
+        with self.assertRaises(RuntimeError) as ctx:
+            ai_client.chat([{"role": "user", "content": "hi"}], model="stub")
+        self.assertIn("after 3 attempts", str(ctx.exception))
+
+    def test_client_errors_are_not_retried(self):
+        self.server.replies = [(400, {"error": {"message": "bad request", "type": "invalid_request_error"}})]
+        with self.assertRaises(RuntimeError):
+            ai_client.chat([{"role": "user", "content": "hi"}], model="stub")
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_client_is_reused(self):
+        self.assertIs(ai_client.get_client(), ai_client.get_client())
+
+    def test_sql_generation_uses_shared_client(self):
+        self.server.replies = [(200, _completion("```sql\nSELECT 42;\n```"))]
+        self.assertEqual(generate_sql_from_nl("the answer"), "SELECT 42;")
+
+
+if __name__ == "__main__":
+    unittest.main()
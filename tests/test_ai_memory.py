@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+from typer.testing import CliRunner
+from sqtab import cli
+from sqtab.cli import app
+from sqtab.ai_memory import clear_memory, normalize_question, recall, remember, similar_examples
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestAIMemory(unittest.TestCase):
+
+    TABLE = "test_memory_users"
+
+    def setUp(self):
+        clear_memory()
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}" (id INTEGER, name TEXT, age INTEGER, country TEXT)')
+        conn.execute(f"INSERT INTO \"{self.TABLE}\" VALUES (1, 'Ana', 34, 'HR'), (2, 'Ivo', 25, 'DE')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        clear_memory()
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+    def _sql(self, sql):
+        conn = get_conn()
+        conn.execute(sql)
+        conn.commit()
+        conn.close()
+
+    def test_near_exact_recall(self):
+        sql = f"SELECT * FROM {self.TABLE} WHERE age > 30"
+        remember("Show all users older than 30", sql)
+
+        self.assertEqual(normalize_question("show ALL users, older than 30?"), "show all users older than 30")
+        self.assertEqual(recall("show all users older than 30?"), sql)
+        self.assertIsNone(recall("show all users older than 40"))
+
+        # A schema change makes the stored answer unsafe to reuse blindly.
+        self._sql(f'ALTER TABLE "{self.TABLE}" ADD COLUMN email TEXT')
+        self.assertIsNone(recall("Show all users older than 30"))
+
+    def test_similar_examples(self):
+        remember("users older than 30", f"SELECT * FROM {self.TABLE} WHERE age > 30")
+        remember("count users per country", f"SELECT country, COUNT(*) FROM {self.TABLE} GROUP BY country")
+        remember("average age", f"SELECT AVG(age) FROM {self.TABLE}")
+
+        examples = similar_examples("how many users are there per country")
+        self.assertEqual(examples[0]["question"], "count users per country")
+        self.assertTrue(all(e["score"] >= 0.2 for e in examples))
+
+        # Entries for tables that no longer exist are not used.
+        self._sql(f'DROP TABLE "{self.TABLE}"')
+        self.assertEqual(similar_examples("count users per country"), [])
+
+    def test_sql_ai_learns_and_skips_api(self):
+        sql = f"SELECT name FROM {self.TABLE} WHERE country = 'HR'"
+        generate = mock.Mock(return_value=sql)
+        with mock.patch.object(cli, "is_ai_available", return_value=True), \
+                mock.patch.object(cli, "generate_sql_from_nl", generate):
+            result = runner.invoke(app, ["sql-ai", "users from Croatia"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(generate.call_args.kwargs["examples"], [])
+
+            result = runner.invoke(app, ["sql-ai", "Users from Croatia."])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("SQL from memory", result.output)
+            self.assertIn("Ana", result.output)
+            self.assertEqual(generate.call_count, 1)
+
+            runner.invoke(app, ["sql-ai", "users from Germany"])
+            self.assertEqual(generate.call_args.kwargs["examples"][0]["question"], "users from Croatia")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import csv
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.importer import import_file
+from sqtab.encoding import ENCODINGS_TABLE, dict_table, size_report, storage_table
+from sqtab.db import get_conn, list_tables
+
+runner = CliRunner()
+
+
+class TestDictionaryEncoding(unittest.TestCase):
+
+    TABLE = "test_dict_events"
+    CSV = Path("tests/out_dict_events.csv")
+    MORE = Path("tests/out_dict_more.csv")
+    EXPORT = Path("tests/out_dict_export.csv")
+
+    def setUp(self):
+        with open(self.CSV, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", "country", "status", "note"])
+            for i in range(200):
+                writer.writerow([i, ("Croatia", "Germany", "France")[i % 3], "ok" if i % 10 else "", f"note {i}"])
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP VIEW IF EXISTS "{self.TABLE}"')
+        for table in (storage_table(self.TABLE), dict_table(self.TABLE, "country"), dict_table(self.TABLE, "status")):
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.execute(f'DELETE FROM "{ENCODINGS_TABLE}" WHERE table_name = ?', (self.TABLE,))
+        conn.commit()
+        conn.close()
+
+        for path in (self.CSV, self.MORE, self.EXPORT):
+            if path.exists():
+                path.unlink()
+
+    def _query(self, sql):
+        conn = get_conn()
+        rows = conn.execute(sql).fetchall()
+        conn.close()
+        return rows
+
+    def test_low_cardinality_columns_are_encoded(self):
+        self.assertEqual(import_file(self.CSV, self.TABLE, dict_encode=True), 200)
+
+        report = {r["column"]: r for r in size_report(self.TABLE)}
+        self.assertEqual(set(report), {"country", "status"})  # "note" is unique per row
+        self.assertEqual(report["country"]["values"], 3)
+        self.assertGreater(report["country"]["saved_pct"], 50)
+
+        # The view keeps the original shape.
+        self.assertIn(self.TABLE, list_tables(get_conn()))
+        self.assertEqual(
+            self._query(f'SELECT * FROM "{self.TABLE}" WHERE id IN (0, 1)'),
+            [(0, "Croatia", None, "note 0"), (1, "Germany", "ok", "note 1")],
+        )
+        self.assertEqual(
+            self._query(f'SELECT DISTINCT typeof(country) FROM "{storage_table(self.TABLE)}"'),
+            [("integer",)],
+        )
+
+    def test_appends_and_inserts_reuse_codes(self):
+        import_file(self.CSV, self.TABLE, dict_encode=True)
+
+        self.MORE.write_text("id,country,status,note\n200,Spain,ok,x\n201,Croatia,,y\n", encoding="utf-8")
+        import_file(self.MORE, self.TABLE)
+
+        conn = get_conn()
+        conn.execute(f'INSERT INTO "{self.TABLE}" VALUES (202, \'Spain\', \'late\', \'z\')')
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(
+            self._query(f'SELECT id, country, status FROM "{self.TABLE}" WHERE id >= 200'),
+            [(200, "Spain", "ok"), (201, "Croatia", None), (202, "Spain", "late")],
+        )
+        self.assertEqual(self._query(f'SELECT COUNT(*) FROM "{dict_table(self.TABLE, "country")}"'), [(4,)])
+
+    def test_import_command_reports_and_export_works(self):
+        result = runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--dict-encode", "--no-progress"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Encoded 'country' (3 values)", result.output)
+
+        result = runner.invoke(app, ["export", self.TABLE, str(self.EXPORT), "--no-progress"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        with open(self.EXPORT, encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[:2], [["id", "country", "status", "note"], ["0", "Croatia", "", "note 0"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import csv
+import unittest
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from sqtab.cli import app
+from sqtab.db import get_conn
+from sqtab.diff import diff_tables
+
+runner = CliRunner()
+
+
+class TestDiff(unittest.TestCase):
+
+    OLD = "test_diff_old"
+    NEW = "test_diff_new"
+    OUT = Path("tests/out_diff.csv")
+
+    def setUp(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.OLD}" (id INTEGER PRIMARY KEY, name TEXT, score REAL)')
+        conn.execute(f'CREATE TABLE "{self.NEW}" (id INTEGER PRIMARY KEY, name TEXT, score REAL)')
+        old = [(i, f"name {i}", i * 1.5) for i in range(1, 501)]
+        new = [row for row in old if row[0] not in (10, 250)]             # 2 removed
+        new = [(i, n, -1.0) if i in (5, 300, 499) else (i, n, s) for i, n, s in new]  # 3 changed
+        new += [(1000, "new a", 0.0), (1001, "new b", 0.0)]             # 2 added
+        conn.executemany(f'INSERT INTO "{self.OLD}" VALUES (?, ?, ?)', old)
+        conn.executemany(f'INSERT INTO "{self.NEW}" VALUES (?, ?, ?)', new)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = get_conn()
+        for table in (self.OLD, self.NEW):
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.commit()
+        conn.close()
+
+        if self.OUT.exists():
+            self.OUT.unlink()
+
+    def test_counts_by_primary_key(self):
+        result = diff_tables(self.OLD, self.NEW, chunk_rows=64)
+
+        self.assertEqual(result["key"], ["id"])
+        self.assertEqual(
+            (result["added"], result["removed"], result["changed"], result["unchanged"]),
+            (2, 2, 3, 495),
+        )
+        self.assertLess(result["chunks_differing"], result["chunks"])
+        changed = [row for change, row, _ in result["samples"] if change == "changed"]
+        self.assertIn((5, "name 5", -1.0), changed)
+
+    def test_chunk_size_does_not_change_result(self):
+        counts = {
+            size: tuple(diff_tables(self.OLD, self.NEW, chunk_rows=size)[k] for k in ("added", "removed", "changed"))
+            for size in (1, 7, 10_000)
+        }
+        self.assertEqual(len(set(counts.values())), 1)
+
+    def test_identical_tables(self):
+        result = diff_tables(self.OLD, self.OLD)
+        self.assertEqual(result["unchanged"], 500)
+        self.assertEqual(result["chunks_differing"], 0)
+
+    def test_values_with_equal_hashes(self):
+        # hash(-1) == hash(-2) in CPython; the change must still be found.
+        conn = get_conn()
+        conn.execute(f'DELETE FROM "{self.OLD}"')
+        conn.execute(f'DELETE FROM "{self.NEW}"')
+        conn.execute(f'INSERT INTO "{self.OLD}" VALUES (1, \'a\', -1)')
+        conn.execute(f'INSERT INTO "{self.NEW}" VALUES (1, \'a\', -2)')
+        conn.commit()
+        conn.close()
+
+        result = diff_tables(self.OLD, self.NEW)
+        self.assertEqual((result["changed"], result["unchanged"]), (1, 0))
+        self.assertEqual(result["chunks_differing"], 1)
+
+    def test_whole_rows_without_key(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.OLD}_rows" AS SELECT name, score FROM "{self.OLD}"')
+        conn.execute(f'CREATE TABLE "{self.NEW}_rows" AS SELECT name, score FROM "{self.NEW}"')
+        conn.commit()
+        try:
+            result = diff_tables(f"{self.OLD}_rows", f"{self.NEW}_rows", chunk_rows=50)
+        finally:
+            for table in (f"{self.OLD}_rows", f"{self.NEW}_rows"):
+                conn.execute(f'DROP TABLE "{table}"')
+            conn.commit()
+            conn.close()
+
+        self.assertIsNone(result["key"])
+        # a changed row is a removed and an added row when whole rows are compared
+        self.assertEqual((result["added"], result["removed"], result["changed"]), (5, 5, 0))
+
+    def test_non_unique_key_is_rejected(self):
+        with self.assertRaises(ValueError):
+            diff_tables(self.OLD, self.NEW, key=["score"])
+
+    def test_cli_writes_differences(self):
+        result = runner.invoke(app, ["diff", self.OLD, self.NEW, "--key", "id", "--output", str(self.OUT)])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Added: 2, removed: 2, changed: 3", result.stdout)
+        with open(self.OUT, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 7)
+        changed = [r for r in rows if r["_change"] == "changed"]
+        self.assertEqual({r["_changed_columns"] for r in changed}, {"score"})
+
+    def test_cli_unknown_key(self):
+        result = runner.invoke(app, ["diff", self.OLD, self.NEW, "--key", "nope"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Error:", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import csv
+import json
+import shutil
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.importer import import_file
+from sqtab.exporter import export_csv, export_partitioned
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestQueryExport(unittest.TestCase):
+
+    TABLE = "test_export_query"
+    SOURCE = Path("tests/out_export_query_source.csv")
+    OUTFILE = Path("tests/out_export_query.csv")
+    OUTDIR = Path("tests/out_export_parts")
+
+    def setUp(self):
+        self.SOURCE.write_text(
+            "id,region,amount\n1,EU,10\n2,US,20\n3,EU,30\n4,,40\n5,A/B,50\n",
+            encoding="utf-8",
+        )
+        import_file(self.SOURCE, self.TABLE)
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+        for path in (self.SOURCE, self.OUTFILE):
+            if path.exists():
+                path.unlink()
+        shutil.rmtree(self.OUTDIR, ignore_errors=True)
+
+    def _read(self, path):
+        with open(path, encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_export_query_result(self):
+        rows = export_csv(
+            None, self.OUTFILE, query=f'SELECT id, amount FROM "{self.TABLE}" WHERE amount > 15;'
+        )
+        self.assertEqual(rows, 4)
+        self.assertEqual(self._read(self.OUTFILE)[:2], [["id", "amount"], ["2", "20"]])
+
+    def test_partition_by_column(self):
+        files = export_partitioned(self.TABLE, self.OUTDIR, "region")
+
+        self.assertEqual(
+            {Path(p).name: n for p, n in files.items()},
+            {"region=A%2FB.csv": 1, "region=EU.csv": 2, "region=US.csv": 1, "region=__NULL__.csv": 1},
+        )
+        self.assertEqual(
+            self._read(self.OUTDIR / "region=EU.csv"),
+            [["id", "region", "amount"], ["1", "EU", "10"], ["3", "EU", "30"]],
+        )
+
+    def test_export_command_with_query_and_partitions(self):
+        result = runner.invoke(app, [
+            "export", "--query", f'SELECT region, SUM(amount) AS total FROM "{self.TABLE}" GROUP BY region',
+            str(self.OUTDIR) + ".json", "--partition-by", "region", "--no-progress",
+        ])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        with open(self.OUTDIR / "region=EU.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [{"region": "EU", "total": 40}])
+
+    def test_export_command_query_positional_path(self):
+        result = runner.invoke(app, [
+            "export", "--query", f'SELECT id FROM "{self.TABLE}" ORDER BY id DESC LIMIT 1',
+            str(self.OUTFILE), "--no-progress",
+        ])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self._read(self.OUTFILE), [["id"], ["5"]])
+
+    def test_export_command_unknown_table_with_progress(self):
+        result = runner.invoke(app, ["export", "test_export_nosuch", str(self.OUTFILE)])
+
+        self.assertEqual(result.exit_code, 1, result.output)
+        self.assertIn("Error: no such table", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
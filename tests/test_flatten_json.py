@@ -0,0 +1,137 @@
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from typer.testing import CliRunner
+
+import sqtab.flatten
+from sqtab.cli import app
+from sqtab.db import get_conn
+from sqtab.importer import import_file, merge_file
+
+runner = CliRunner()
+
+RECORDS = [
+    {
+        "id": 1,
+        "customer": {"name": "Ana", "address": {"city": "Novi Sad", "geo": {"lat": 45.2}}},
+        "items": [{"sku": "A1", "qty": 2, "tags": ["x", "y"]}, {"sku": "B2", "qty": 1}],
+        "paid": True,
+    },
+    {"id": 2, "customer": {"name": "Marko"}, "items": [], "note": "later field", "_id": "abc"},
+]
+
+
+class TestFlattenJson(unittest.TestCase):
+
+    TABLE = "test_flatten"
+    JSON = Path("tests/out_flatten.json")
+
+    def setUp(self):
+        self.JSON.write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    def tearDown(self):
+        conn = get_conn()
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?", (f"{self.TABLE}%",)
+        ).fetchall():
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        conn.commit()
+        conn.close()
+
+        if self.JSON.exists():
+            self.JSON.unlink()
+
+    def _query(self, sql):
+        conn = get_conn()
+        try:
+            cur = conn.execute(sql)
+            return [c[0] for c in cur.description], cur.fetchall()
+        finally:
+            conn.close()
+
+    def test_objects_become_columns(self):
+        self.assertEqual(import_file(self.JSON, self.TABLE, flatten=3), 2)
+
+        columns, rows = self._query(f'SELECT * FROM "{self.TABLE}" ORDER BY _id')
+        self.assertEqual(
+            columns,
+            ["_id", "id", "customer__name", "customer__address__city",
+             "customer__address__geo__lat", "paid", "note", "_id_"],
+        )
+        self.assertEqual(rows[0], (1, 1, "Ana", "Novi Sad", 45.2, 1, None, None))
+        self.assertEqual(rows[1][-2:], ("later field", "abc"))
+
+    def test_arrays_become_child_tables(self):
+        import_file(self.JSON, self.TABLE, flatten=3)
+
+        _, items = self._query(
+            f'SELECT o.id, i._index, i.sku, i.qty FROM "{self.TABLE}" o '
+            f'JOIN "{self.TABLE}__items" i ON i._parent_id = o._id ORDER BY i._index'
+        )
+        self.assertEqual(items, [(1, 0, "A1", 2), (1, 1, "B2", 1)])
+
+        _, tags = self._query(
+            f'SELECT i.sku, t.value FROM "{self.TABLE}__items" i '
+            f'JOIN "{self.TABLE}__items__tags" t ON t._parent_id = i._id ORDER BY t._index'
+        )
+        self.assertEqual(tags, [("A1", "x"), ("A1", "y")])
+
+    def test_depth_limit_keeps_json_text(self):
+        import_file(self.JSON, self.TABLE, flatten=1)
+
+        columns, rows = self._query(f'SELECT customer__address FROM "{self.TABLE}" WHERE id = 1')
+        self.assertEqual(json.loads(rows[0][0]), RECORDS[0]["customer"]["address"])
+        _, items = self._query(f'SELECT tags FROM "{self.TABLE}__items" WHERE sku = \'A1\'')
+        self.assertEqual(json.loads(items[0][0]), ["x", "y"])
+
+    def test_appends_continue_ids(self):
+        import_file(self.JSON, self.TABLE, flatten=3)
+        import_file(self.JSON, self.TABLE, flatten=3)
+
+        _, rows = self._query(
+            f'SELECT COUNT(*), COUNT(DISTINCT _id) FROM "{self.TABLE}__items"'
+        )
+        self.assertEqual(rows[0], (4, 4))
+
+    def test_streams_json_lines_in_small_reads(self):
+        self.JSON.write_text("\n".join(json.dumps(r) for r in RECORDS * 50), encoding="utf-8")
+        with mock.patch.object(sqtab.flatten, "READ_SIZE", 64):
+            self.assertEqual(import_file(self.JSON, self.TABLE, flatten=2), 100)
+
+        _, rows = self._query(f'SELECT COUNT(*) FROM "{self.TABLE}__items"')
+        self.assertEqual(rows[0][0], 100)
+
+    def test_rejects_merge_and_csv(self):
+        with self.assertRaises(ValueError):
+            merge_file(self.JSON, self.TABLE, key="id", flatten=3)
+        with self.assertRaises(ValueError):
+            import_file("tests/samples/sample.csv", self.TABLE, flatten=3)
+
+    def test_cli_lists_child_tables(self):
+        result = runner.invoke(app, ["import", str(self.JSON), self.TABLE, "--flatten", "--no-progress"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn(f"Child table '{self.TABLE}__items': 2 rows", result.stdout)
+        self.assertIn("rows imported: 2", result.stdout)
+
+    def test_cli_names_parent_of_array_in_nested_object(self):
+        self.JSON.write_text(json.dumps([{"user": {"tags": ["a", "b"]}}]), encoding="utf-8")
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}__other" (x)')  # same prefix, not a child
+        conn.commit()
+        conn.close()
+
+        result = runner.invoke(app, ["import", str(self.JSON), self.TABLE, "--flatten", "--no-progress"])
+
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn(
+            f"Child table '{self.TABLE}__user__tags': 2 rows (linked by _parent_id -> {self.TABLE}._id)",
+            result.stdout,
+        )
+        self.assertNotIn("__other", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
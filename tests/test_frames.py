@@ -0,0 +1,103 @@
+import importlib.util
+import unittest
+
+import sqtab
+from sqtab.db import get_conn
+
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@unittest.skipUnless(HAS_PANDAS, "pandas is not installed")
+class TestFrames(unittest.TestCase):
+
+    TABLE = "test_frames"
+
+    def setUp(self):
+        import numpy as np
+        import pandas as pd
+
+        self.np, self.pd = np, pd
+        self.frame = pd.DataFrame({
+            "id": [1, 2, 3],
+            "Score": [1.5, np.nan, 3.0],
+            "active": [True, False, True],
+            "joined": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+            "name": ["a", None, "c"],
+        })
+        self.db = sqtab.Session()
+
+    def tearDown(self):
+        self.db.close()
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+    def test_import_frame_stores_nulls_and_kinds(self):
+        counts = self.db.import_frame(self.frame, self.TABLE)
+        self.assertEqual(counts["rows"], 3)
+
+        rows = list(self.db.query(f'SELECT * FROM "{self.TABLE}" ORDER BY id'))
+        self.assertEqual(rows[0], (1, 1.5, 1, 1704067200, "a"))
+        self.assertEqual(rows[1][1], None)
+        self.assertEqual(rows[1][4], None)
+        self.assertEqual(rows[2][3], None)
+
+    def test_import_frame_merges_on_key(self):
+        self.db.import_frame(self.frame, self.TABLE)
+        counts = self.db.import_frame(self.frame.assign(name="z").iloc[1:], self.TABLE, key="id")
+
+        self.assertEqual((counts["inserted"], counts["updated"]), (0, 2))
+
+    def test_import_frame_appends_reordered_columns(self):
+        self.db.import_frame(self.frame[["id", "name"]], self.TABLE)
+        counts = self.db.import_frame(self.pd.DataFrame({"name": ["d"], "id": [4]}), self.TABLE)
+
+        self.assertEqual(counts["inserted"], 1)
+        self.assertEqual(list(self.db.query(f'SELECT id, name FROM "{self.TABLE}" WHERE id = 4')), [(4, "d")])
+
+    def test_frame_round_trip_uses_table_dtypes(self):
+        self.db.import_frame(self.frame, self.TABLE)
+        result = self.db.query_frame(f'SELECT * FROM "{self.TABLE}" ORDER BY id', dtypes=self.TABLE)
+
+        self.assertEqual(str(result["id"].dtype), "int64")
+        self.assertEqual(str(result["active"].dtype), "bool")
+        self.assertEqual(str(result["joined"].dtype), "datetime64[s]")
+        self.assertTrue(self.pd.isna(result["score"][1]))
+        self.assertEqual(result["joined"][0], self.pd.Timestamp("2024-01-01"))
+
+    def test_arrays_infer_dtypes_across_batches(self):
+        self.db.import_rows(
+            ({"n": i, "v": None if i == 7 else i} for i in range(10)), self.TABLE
+        )
+        from sqtab.frames import fetch_arrays
+
+        arrays = fetch_arrays(self.db.conn, f'SELECT n, v FROM "{self.TABLE}" ORDER BY n', batch_size=4)
+
+        self.assertEqual(arrays["n"].dtype, self.np.int64)
+        self.assertEqual(arrays["n"].tolist(), list(range(10)))
+        self.assertEqual(arrays["v"].dtype, self.np.float64)  # NULL in a later batch
+        self.assertTrue(self.np.isnan(arrays["v"][7]))
+
+    def test_empty_result_keeps_columns(self):
+        self.db.import_frame(self.frame, self.TABLE)
+        arrays = self.db.query_arrays(f'SELECT id, score FROM "{self.TABLE}" WHERE id > 9', dtypes=self.TABLE)
+
+        self.assertEqual({k: str(v.dtype) for k, v in arrays.items()}, {"id": "int64", "score": "float64"})
+
+    @unittest.skipUnless(HAS_ARROW, "pyarrow is not installed")
+    def test_arrow_table(self):
+        import pyarrow as pa
+
+        self.db.import_frame(self.frame, self.TABLE)
+        table = self.db.query_arrow(f'SELECT * FROM "{self.TABLE}" ORDER BY id', dtypes=self.TABLE)
+
+        self.assertEqual(table.schema.field("active").type, pa.bool_())
+        self.assertEqual(table.schema.field("joined").type, pa.timestamp("s"))
+        self.assertEqual(table.column("score").null_count, 1)
+        self.assertEqual(table.column("name").to_pylist(), ["a", None, "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.fts import build_index, index_name, indexed_columns, search
+from sqtab.db import get_conn, list_tables
+from sqtab.importer import merge_file
+
+runner = CliRunner()
+
+
+class TestFullTextSearch(unittest.TestCase):
+
+    TABLE = "test_fts_notes"
+    CSV = Path("tests/out_fts_notes.csv")
+    DELTA = Path("tests/out_fts_delta.csv")
+
+    def setUp(self):
+        self.CSV.write_text(
+            "id,title,body\n"
+            "1,Disk alert,the disk is full on server one\n"
+            "2,Weekly report,all systems nominal\n"
+            "3,Disk cleanup,removed old logs to free disk space on the full disk\n",
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{index_name(self.TABLE)}"')
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+        for path in (self.CSV, self.DELTA):
+            if path.exists():
+                path.unlink()
+
+    def test_import_with_fts_and_search(self):
+        result = runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--fts", "title,body", "--no-progress"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(indexed_columns(self.TABLE), ["title", "body"])
+        self.assertNotIn(index_name(self.TABLE), list_tables(get_conn()))
+
+        columns, rows = search(self.TABLE, "disk")
+        self.assertEqual(columns[-2:], ["score", "snippet"])
+        # Row 3 mentions "disk" more often, so BM25 ranks it first.
+        self.assertEqual([row[0] for row in rows], [3, 1])
+        self.assertIn("[disk]", rows[0][-1])
+
+    def test_triggers_keep_index_in_sync(self):
+        runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--no-progress"])
+        self.assertEqual(build_index(self.TABLE, ["title", "body"]), 3)
+
+        conn = get_conn()
+        conn.execute(f'INSERT INTO "{self.TABLE}" VALUES (4, \'Backup\', \'nightly backup finished\')')
+        conn.execute(f'UPDATE "{self.TABLE}" SET body = \'all systems green\' WHERE id = 1')
+        conn.execute(f'DELETE FROM "{self.TABLE}" WHERE id = 3')
+        conn.commit()
+        conn.close()
+
+        self.assertEqual([r[0] for r in search(self.TABLE, "backup")[1]], [4])
+        self.assertEqual([r[0] for r in search(self.TABLE, "disk")[1]], [1])  # title only
+        self.assertEqual(sorted(r[0] for r in search(self.TABLE, "systems")[1]), [1, 2])
+
+    def test_merge_into_indexed_table(self):
+        runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--fts", "title,body", "--no-progress"])
+        # id 1 changes, id 2 stays the same, id 4 is new
+        self.DELTA.write_text(
+            "id,title,body\n"
+            "1,Disk alert,resolved after cleanup\n"
+            "2,Weekly report,all systems nominal\n"
+            "4,Backup,nightly backup finished\n",
+            encoding="utf-8",
+        )
+
+        # The sync triggers write to the index too; only the table's rows count.
+        counts = merge_file(self.DELTA, self.TABLE, key="id")
+        self.assertEqual(counts, {"rows": 3, "inserted": 1, "updated": 1, "unchanged": 1})
+
+        self.assertEqual([r[0] for r in search(self.TABLE, "resolved")[1]], [1])
+        self.assertEqual([r[0] for r in search(self.TABLE, "backup")[1]], [4])
+        self.assertEqual(sorted(r[0] for r in search(self.TABLE, "disk")[1]), [1, 3])
+
+    def test_search_command(self):
+        runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--fts", "body", "--no-progress"])
+
+        result = runner.invoke(app, ["search", self.TABLE, "nominal"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Weekly report", result.output)
+
+    def test_search_without_index_fails(self):
+        runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--no-progress"])
+
+        result = runner.invoke(app, ["search", self.TABLE, "disk"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("no full-text index", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import unittest
+
+from typer.testing import CliRunner
+
+from sqtab.ai_sql import _get_schema
+from sqtab.cli import app
+from sqtab.db import get_conn
+from sqtab.json_index import JSON_INDEX_TABLE, create_json_index, default_name, json_indexes
+
+runner = CliRunner()
+
+
+class TestJsonIndex(unittest.TestCase):
+
+    TABLE = "test_json_events"
+
+    def setUp(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.execute(f'CREATE TABLE "{self.TABLE}" (id INTEGER PRIMARY KEY, payload TEXT)')
+        conn.executemany(
+            f'INSERT INTO "{self.TABLE}" (payload) VALUES (?)',
+            [(json.dumps({"user": {"id": i % 10}, "kind": "click"}),) for i in range(100)] + [("not json",)],
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.execute(f'DELETE FROM "{JSON_INDEX_TABLE}" WHERE table_name = ?', (self.TABLE,))
+        conn.commit()
+        conn.close()
+
+    def test_generated_column_is_indexed(self):
+        result = create_json_index(self.TABLE, "payload", "$.user.id")
+        self.assertEqual(result["column"], "payload_user_id")
+        self.assertEqual(result["rows"], 100)
+
+        conn = get_conn()
+        try:
+            sql = f'SELECT COUNT(*) FROM "{self.TABLE}" WHERE payload_user_id = 3'
+            plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql))
+            self.assertIn(f"USING INDEX {result['index']}", plan)
+            self.assertEqual(conn.execute(sql).fetchone()[0], 10)
+
+            # New rows are covered without rebuilding anything.
+            conn.execute(f'INSERT INTO "{self.TABLE}" (payload) VALUES (?)', ('{"user": {"id": 3}}',))
+            self.assertEqual(conn.execute(sql).fetchone()[0], 11)
+        finally:
+            conn.close()
+
+    def test_listed_in_describe_and_ai_schema(self):
+        create_json_index(self.TABLE, "payload", "$.kind", name="kind")
+        self.assertEqual(
+            json_indexes(self.TABLE),
+            [{"column": "kind", "source": "payload", "path": "$.kind", "index": f"{self.TABLE}__kind"}],
+        )
+
+        result = runner.invoke(app, ["describe", self.TABLE])
+        self.assertIn("JSON index: kind = payload $.kind", result.stdout)
+
+        columns = {c["name"]: c for c in _get_schema()[self.TABLE]}
+        self.assertEqual(columns["kind"]["indexed_json_path"], "payload $.kind")
+        self.assertNotIn("indexed_json_path", columns["payload"])
+
+    def test_strict_table(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE "{self.TABLE}"')
+        conn.execute(f'CREATE TABLE "{self.TABLE}" (id INTEGER PRIMARY KEY, payload TEXT) STRICT')
+        conn.execute(f'INSERT INTO "{self.TABLE}" (payload) VALUES (\'{{"score": 1.5}}\')')
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(create_json_index(self.TABLE, "payload", "$.score")["rows"], 1)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            create_json_index(self.TABLE, "missing", "$.a")
+        with self.assertRaises(ValueError):
+            create_json_index(self.TABLE, "payload", "user.id")
+        with self.assertRaises(ValueError):
+            create_json_index(self.TABLE, "payload", "$.user.id", name="id")
+
+        result = runner.invoke(app, ["json-index", "no_such_table", "payload", "$.a"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Error: Table 'no_such_table' does not exist.", result.stdout)
+
+    def test_cli(self):
+        result = runner.invoke(app, ["json-index", self.TABLE, "payload", "$.user.id"])
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("Column 'payload_user_id'", result.stdout)
+
+    def test_default_name(self):
+        self.assertEqual(default_name("doc", "$.items[0].SKU"), "doc_items_0_sku")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import csv
+import random
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.importer import import_file, merge_file
+from sqtab.keys import KeyTracker, choose_key, table_key
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestKeyTracker(unittest.TestCase):
+
+    def _candidates(self, rows, limit=1000):
+        tracker = KeyTracker(len(rows[0]), limit)
+        for row in rows:
+            tracker.add(row)
+        return tracker.candidates()
+
+    def test_unique_and_non_null_columns(self):
+        rows = [[str(i), f"user{i}", "x" if i % 2 else "", str(i % 3)] for i in range(1, 50)]
+        self.assertEqual(self._candidates(rows), [0, 1])
+
+    def test_shuffled_integers_are_tracked_by_value(self):
+        ids = list(range(500))
+        random.Random(1).shuffle(ids)
+        self.assertEqual(self._candidates([[str(i)] for i in ids]), [0])
+        self.assertEqual(self._candidates([[str(i)] for i in ids + [ids[0]]]), [])
+
+    def test_value_limit(self):
+        rows = [[f"k{i}"] for i in range(20)]
+        self.assertEqual(self._candidates(rows, limit=10), [])
+
+    def test_choose_key_prefers_integers_then_id(self):
+        columns = ["code", "num", "id"]
+        self.assertEqual(choose_key(columns, ["TEXT", "INTEGER", "INTEGER"], [0, 1, 2]), ["id"])
+        self.assertEqual(choose_key(columns, ["TEXT", "INTEGER", "TEXT"], [0, 2]), ["id"])
+        self.assertEqual(choose_key(columns, ["TEXT", "INTEGER", "TEXT"], [0]), ["code"])
+        self.assertIsNone(choose_key(columns, ["TEXT", "INTEGER", "TEXT"], []))
+
+    def test_choose_key_skips_real_columns(self):
+        # 1.5 and 1.50 are different text but the same REAL value.
+        self.assertIsNone(choose_key(["price"], ["REAL"], [0]))
+        self.assertEqual(choose_key(["price", "sku"], ["REAL", "TEXT"], [0, 1]), ["sku"])
+        self.assertIsNone(choose_key(["day"], ["date"], [0]))
+
+
+class TestKeyInference(unittest.TestCase):
+
+    TABLE = "test_key_users"
+    CSV = Path("tests/out_key_users.csv")
+    MORE = Path("tests/out_key_more.csv")
+
+    def setUp(self):
+        with open(self.CSV, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["email", "id", "team"])
+            for i in range(1, 101):
+                writer.writerow([f"user{i}@example.com", i, f"team{i % 4}"])
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+        for path in (self.CSV, self.MORE):
+            if path.exists():
+                path.unlink()
+
+    def _sql(self, sql):
+        conn = get_conn()
+        rows = conn.execute(sql).fetchall()
+        conn.close()
+        return rows
+
+    def test_auto_key_aliases_rowid(self):
+        self.assertEqual(import_file(self.CSV, self.TABLE, auto_key=True), 100)
+        self.assertEqual(table_key(self.TABLE), {"columns": ["id"], "kind": "rowid alias"})
+        self.assertEqual(self._sql(f'SELECT MAX(rowid) = MAX(id) FROM "{self.TABLE}"'), [(1,)])
+
+        plan = self._sql(f'EXPLAIN QUERY PLAN SELECT * FROM "{self.TABLE}" WHERE id = 7')
+        self.assertIn("INTEGER PRIMARY KEY", plan[0][-1])
+
+    def test_composite_key_without_rowid(self):
+        import_file(self.CSV, self.TABLE, primary_key="team,email")
+        self.assertEqual(table_key(self.TABLE), {"columns": ["team", "email"], "kind": "without rowid"})
+
+        # Merging counts inserts by row count; there is no rowid to compare.
+        self.MORE.write_text(
+            "email,id,team\nuser1@example.com,1,team1\nnew@example.com,101,team0\n", encoding="utf-8"
+        )
+        counts = merge_file(self.MORE, self.TABLE, key="team,email")
+        self.assertEqual((counts["inserted"], counts["unchanged"]), (1, 1))
+
+    def test_merge_below_max_key_counts_as_insert(self):
+        self.MORE.write_text("email,id,team\na@example.com,10,team0\nb@example.com,30,team1\n", encoding="utf-8")
+        import_file(self.MORE, self.TABLE, auto_key=True)
+
+        self.MORE.write_text("email,id,team\nc@example.com,20,team2\n", encoding="utf-8")
+        counts = merge_file(self.MORE, self.TABLE, key="id")
+        self.assertEqual((counts["inserted"], counts["updated"]), (1, 0))
+
+    def test_real_column_is_not_a_key(self):
+        self.MORE.write_text("price,label\n1.5,a\n1.50,a\n2.0,b\n", encoding="utf-8")
+        self.assertEqual(import_file(self.MORE, self.TABLE, auto_key=True), 3)
+        self.assertIsNone(table_key(self.TABLE))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            import_file(self.CSV, self.TABLE, primary_key="missing")
+        with self.assertRaises(ValueError):
+            import_file(self.CSV, self.TABLE, auto_key=True, dict_encode=True)
+
+    def test_cli_reports_key_and_describe_shows_it(self):
+        result = runner.invoke(app, ["import", str(self.CSV), self.TABLE, "--auto-key", "--no-progress"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Primary key: id (rowid alias)", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
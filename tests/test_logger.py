@@ -0,0 +1,77 @@
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+from sqtab import logger
+
+
+class TestLogger(unittest.TestCase):
+
+    LOGFILE = Path("tests/out_test.log")
+
+    def setUp(self):
+        self.patches = [
+            mock.patch.object(logger, "LOG_PATH", self.LOGFILE),
+            mock.patch.object(logger, "_settings", {
+                "enabled": True, "threshold": logger.LEVELS["info"],
+                "max_bytes": 10_000, "backups": 2,
+            }),
+        ]
+        for p in self.patches:
+            p.start()
+        logger._buffer.clear()
+
+    def tearDown(self):
+        logger._buffer.clear()
+        for p in self.patches:
+            p.stop()
+        for path in self.LOGFILE.parent.glob(self.LOGFILE.name + "*"):
+            path.unlink()
+
+    def _entries(self):
+        lines = self.LOGFILE.read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_buffered_json_lines_with_levels(self):
+        logger.log("hidden", level="debug")
+        logger.log("kept", rows=3)
+        self.assertFalse(self.LOGFILE.exists())  # still buffered
+
+        logger.flush()
+        entries = self._entries()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["msg"], "kept")
+        self.assertEqual(entries[0]["level"], "info")
+        self.assertEqual(entries[0]["rows"], 3)
+
+    def test_disabled_logging_writes_nothing(self):
+        logger.configure(enabled=False)
+        logger.log("nothing")
+        logger.flush()
+        self.assertFalse(self.LOGFILE.exists())
+
+    def test_command_entry_has_duration(self):
+        with logger.log_command("import", table="t") as stats:
+            stats["rows"] = 10
+        logger.flush()
+
+        entry = self._entries()[0]
+        self.assertEqual(entry["command"], "import")
+        self.assertEqual(entry["status"], "ok")
+        self.assertEqual(entry["rows"], 10)
+        self.assertIn("duration_ms", entry)
+
+    def test_long_values_are_truncated(self):
+        logger.log("sql", sql="SELECT " + "x" * 1000)
+        logger.flush()
+        self.assertLess(len(self._entries()[0]["sql"]), 300)
+
+    def test_rotation_by_size(self):
+        logger.configure(max_bytes=500)
+        for i in range(3):
+            for _ in range(5):
+                logger.log("entry", payload="y" * 10)
+            logger.flush()
+
+        self.assertTrue(Path(f"{self.LOGFILE}.1").exists())
+        self.assertLessEqual(self.LOGFILE.stat().st_size, 500)
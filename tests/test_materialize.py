@@ -0,0 +1,79 @@
+import unittest
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.importer import import_file
+from sqtab.materialize import MATVIEW_TABLE, create_materialized_view, refresh
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestMaterializedViews(unittest.TestCase):
+
+    TABLE = "test_mv_source"
+    FULL = "test_mv_summary"
+    INCREMENTAL = "test_mv_adults"
+    DELTA = Path("tests/out_mv_delta.csv")
+
+    def setUp(self):
+        import_file(Path("tests/samples/sample.csv"), self.TABLE)
+        self.DELTA.write_text("id,name,age\n4,Petar,40\n5,Mia,12\n", encoding="utf-8")
+
+    def tearDown(self):
+        conn = get_conn()
+        for table in (self.TABLE, self.FULL, self.INCREMENTAL):
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.execute(
+            f'DELETE FROM "{MATVIEW_TABLE}" WHERE name IN (?, ?)', (self.FULL, self.INCREMENTAL)
+        )
+        conn.commit()
+        conn.close()
+
+        if self.DELTA.exists():
+            self.DELTA.unlink()
+
+    def _rows(self, table):
+        conn = get_conn()
+        rows = conn.execute(f'SELECT * FROM "{table}" ORDER BY 1').fetchall()
+        conn.close()
+        return rows
+
+    def test_import_refreshes_dependent_views(self):
+        create_materialized_view(
+            self.FULL, f'SELECT COUNT(*) AS n, MAX(age) AS oldest FROM "{self.TABLE}"'
+        )
+        create_materialized_view(
+            self.INCREMENTAL,
+            f'SELECT id, name FROM "{self.TABLE}" WHERE age >= 18',
+            mode="incremental",
+        )
+        self.assertEqual(self._rows(self.FULL), [(3, 30)])
+
+        import_file(self.DELTA, self.TABLE)
+
+        self.assertEqual(self._rows(self.FULL), [(5, 40)])
+        self.assertEqual(
+            self._rows(self.INCREMENTAL),
+            [(1, "Ana"), (2, "Marko"), (3, "Ivana"), (4, "Petar")],
+        )
+
+        # Nothing new since the last refresh
+        self.assertEqual(refresh(self.INCREMENTAL)["rows_added"], 0)
+
+    def test_incremental_rejects_aggregates(self):
+        with self.assertRaises(ValueError):
+            create_materialized_view(
+                self.INCREMENTAL, f'SELECT COUNT(*) FROM "{self.TABLE}"', mode="incremental"
+            )
+
+    def test_cli_materialize_and_refresh(self):
+        result = runner.invoke(app, [
+            "materialize", self.FULL, f'SELECT name FROM "{self.TABLE}"'
+        ])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn(self.TABLE, result.stdout)
+
+        result = runner.invoke(app, ["refresh", self.FULL])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("rows added: 3", result.stdout)
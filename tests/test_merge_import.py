@@ -0,0 +1,98 @@
+import unittest
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.importer import import_file, merge_file
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestMergeImport(unittest.TestCase):
+
+    TABLE = "test_merge"
+    DELTA = Path("tests/out_merge_delta.csv")
+
+    def setUp(self):
+        import_file(Path("tests/samples/sample.csv"), self.TABLE)
+        # id 2 changes, id 3 stays the same, id 4 is new
+        self.DELTA.write_text(
+            "id,name,age\n2,Marko,26\n3,Ivana,28\n4,Petar,40\n",
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}_audit"')
+        conn.commit()
+        conn.close()
+
+        if self.DELTA.exists():
+            self.DELTA.unlink()
+
+    def _rows(self):
+        conn = get_conn()
+        data = conn.execute(f'SELECT * FROM "{self.TABLE}" ORDER BY id').fetchall()
+        conn.close()
+        return data
+
+    def test_upsert_counts(self):
+        counts = merge_file(self.DELTA, self.TABLE, key="id")
+        self.assertEqual(
+            counts, {"rows": 3, "inserted": 1, "updated": 1, "unchanged": 1}
+        )
+        self.assertEqual(self._rows(), [
+            (1, "Ana", 30),
+            (2, "Marko", 26),
+            (3, "Ivana", 28),
+            (4, "Petar", 40),
+        ])
+
+    def test_counts_ignore_trigger_writes(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}_audit" (id INTEGER)')
+        for event in ("INSERT", "UPDATE"):
+            conn.execute(f'''
+                CREATE TRIGGER "{self.TABLE}_{event.lower()}" AFTER {event} ON "{self.TABLE}" BEGIN
+                    INSERT INTO "{self.TABLE}_audit" VALUES (new.id);
+                    INSERT INTO "{self.TABLE}_audit" VALUES (new.id);
+                END
+            ''')
+        conn.commit()
+        conn.close()
+
+        counts = merge_file(self.DELTA, self.TABLE, key="id")
+        self.assertEqual(
+            counts, {"rows": 3, "inserted": 1, "updated": 1, "unchanged": 1}
+        )
+
+    def test_composite_key_counts(self):
+        self.DELTA.write_text(
+            "id,name,age\n2,Marko,26\n3,Ivana,28\n3,Other,50\n",
+            encoding="utf-8",
+        )
+        counts = merge_file(self.DELTA, self.TABLE, key="id,name")
+        # (2, Marko) and (3, Ivana) exist; (3, Other) is new
+        self.assertEqual(
+            counts, {"rows": 3, "inserted": 1, "updated": 1, "unchanged": 1}
+        )
+
+    def test_replace_counts(self):
+        counts = merge_file(self.DELTA, self.TABLE, key="id", mode="replace")
+        self.assertEqual(counts["inserted"], 1)
+        self.assertEqual(counts["updated"], 2)
+        self.assertEqual(counts["unchanged"], 0)
+
+    def test_insert_ignore_keeps_existing(self):
+        counts = merge_file(self.DELTA, self.TABLE, key="id", mode="insert-ignore")
+        self.assertEqual(counts["inserted"], 1)
+        self.assertEqual(counts["unchanged"], 2)
+        self.assertIn((2, "Marko", 25), self._rows())
+
+    def test_cli_unknown_mode(self):
+        result = runner.invoke(app, [
+            "import", str(self.DELTA), self.TABLE, "--key", "id", "--mode", "bogus"
+        ])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("Unknown merge mode", result.stdout)
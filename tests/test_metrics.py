@@ -0,0 +1,50 @@
+import json
+import unittest
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestMetricsOutput(unittest.TestCase):
+
+    TABLE = "test_metrics"
+    IMPORT_METRICS = Path("tests/out_import_metrics.json")
+    EXPORT_METRICS = Path("tests/out_export_metrics.json")
+    OUTFILE = Path("tests/out_metrics_export.csv")
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+        for path in (self.IMPORT_METRICS, self.EXPORT_METRICS, self.OUTFILE):
+            if path.exists():
+                path.unlink()
+
+    def test_import_and_export_write_metrics(self):
+        result = runner.invoke(app, [
+            "import", "tests/samples/sample.csv", self.TABLE,
+            "--metrics-json", str(self.IMPORT_METRICS),
+        ])
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("rows imported: 3", result.stdout)
+
+        data = json.loads(self.IMPORT_METRICS.read_text(encoding="utf-8"))
+        self.assertEqual(data["counters"]["rows"], 3)
+        for phase in ("read", "infer", "create", "insert", "commit"):
+            self.assertIn(phase, data["phases"])
+        self.assertIn("peak_memory_bytes", data)
+
+        result = runner.invoke(app, [
+            "export", self.TABLE, "--path", str(self.OUTFILE),
+            "--metrics-json", str(self.EXPORT_METRICS),
+        ])
+        self.assertEqual(result.exit_code, 0)
+
+        data = json.loads(self.EXPORT_METRICS.read_text(encoding="utf-8"))
+        self.assertEqual(data["counters"]["rows"], 3)
+        self.assertIn("write", data["phases"])
@@ -0,0 +1,94 @@
+import unittest
+import sqlite3
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.maintenance import optimize
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestOptimize(unittest.TestCase):
+
+    TABLE = "test_optimize"
+    COPY = Path("tests/out_optimize_copy.db")
+
+    def setUp(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}" (id INTEGER, payload TEXT)')
+        conn.executemany(
+            f'INSERT INTO "{self.TABLE}" VALUES (?, ?)', [(i, "x" * 500) for i in range(2000)]
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+        if self.COPY.exists():
+            self.COPY.unlink()
+
+    def _pragma(self, name):
+        conn = get_conn()
+        value = conn.execute(f"PRAGMA {name}").fetchone()[0]
+        conn.close()
+        return value
+
+    def test_reclaims_space_of_dropped_table(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+        self.assertGreater(self._pragma("freelist_count"), 0)
+
+        result = optimize()
+
+        self.assertGreater(result["reclaimed_bytes"], 500 * 1000)
+        self.assertEqual(self._pragma("freelist_count"), 0)
+        # Later runs can use the cheap incremental vacuum.
+        self.assertEqual(self._pragma("auto_vacuum"), 2)
+        self.assertIn("incremental_vacuum", optimize(analyze=False)["steps"])
+
+    def test_statistics_do_not_count_as_reclaimed(self):
+        conn = get_conn()
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.TABLE}_id" ON "{self.TABLE}" (id)')
+        conn.commit()
+        conn.close()
+
+        # ANALYZE grows the file; nothing was freed, so nothing was reclaimed.
+        self.assertEqual(optimize(vacuum="none")["reclaimed_bytes"], 0)
+        self.assertGreaterEqual(optimize()["reclaimed_bytes"], 0)
+
+    def test_analyze_collects_statistics(self):
+        conn = get_conn()
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.TABLE}_id" ON "{self.TABLE}" (id)')
+        conn.commit()
+        conn.close()
+
+        optimize(vacuum="none")
+
+        conn = get_conn()
+        stats = conn.execute("SELECT 1 FROM sqlite_stat1 WHERE tbl = ?", (self.TABLE,)).fetchone()
+        conn.close()
+        self.assertIsNotNone(stats)
+
+    def test_vacuum_into_with_page_size(self):
+        result = runner.invoke(app, ["optimize", "--no-analyze", "--into", str(self.COPY), "--page-size", "8192"])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+        copy = sqlite3.connect(self.COPY)
+        self.assertEqual(copy.execute("PRAGMA page_size").fetchone()[0], 8192)
+        self.assertEqual(copy.execute(f'SELECT COUNT(*) FROM "{self.TABLE}"').fetchone()[0], 2000)
+        copy.close()
+
+    def test_invalid_page_size(self):
+        with self.assertRaises(ValueError):
+            optimize(into=self.COPY, page_size=1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import csv
+import unittest
+from pathlib import Path
+from unittest import mock
+from sqtab import csv_parallel
+from sqtab.importer import import_file
+from sqtab.db import get_conn
+
+
+class TestParallelImport(unittest.TestCase):
+
+    SERIAL = "test_parallel_serial"
+    PARALLEL = "test_parallel_workers"
+    INFILE = Path("tests/out_parallel.csv")
+
+    def setUp(self):
+        with open(self.INFILE, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Id", "Note", "Score"])
+            for i in range(500):
+                # quoted commas, quotes and newlines must not split records
+                note = f'line {i}\nwith "quotes", commas' if i % 7 == 0 else f"plain {i}"
+                score = "" if i % 11 == 0 else (i / 2 if i > 250 else i)
+                writer.writerow([i, note, score])
+
+    def tearDown(self):
+        conn = get_conn()
+        for table in (self.SERIAL, self.PARALLEL):
+            conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.commit()
+        conn.close()
+
+        if self.INFILE.exists():
+            self.INFILE.unlink()
+
+    def _dump(self, table):
+        conn = get_conn()
+        schema = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        rows = conn.execute(f'SELECT * FROM "{table}" ORDER BY rowid').fetchall()
+        conn.close()
+        return [c[1:3] for c in schema], rows
+
+    def test_split_ranges_respect_quotes(self):
+        data = self.INFILE.read_bytes()
+        start = data.index(b"\n") + 1
+        ranges = csv_parallel.split_ranges(str(self.INFILE), start, chunk_bytes=64)
+
+        self.assertEqual(ranges[0][0], start)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(data[start:end].count(b'"') % 2, 0)
+
+    def test_parallel_matches_serial(self):
+        import_file(self.INFILE, self.SERIAL)
+        with mock.patch.object(csv_parallel, "CHUNK_BYTES", 256):
+            rows = import_file(self.INFILE, self.PARALLEL, workers=2)
+
+        self.assertEqual(rows, 500)
+        self.assertEqual(self._dump(self.SERIAL), self._dump(self.PARALLEL))
@@ -0,0 +1,63 @@
+import unittest
+from sqtab.analyzer import analyze_table, build_analysis_prompt, column_stats
+from sqtab.prompt_utils import estimate_tokens, samples_to_markdown, truncate_cell
+from sqtab.db import get_conn
+
+TASKS = ["Describe the table."]
+RULES = ["Be brief."]
+
+
+class TestPromptBudget(unittest.TestCase):
+
+    TABLE = "test_prompt_wide"
+
+    def setUp(self):
+        # 40 columns: long text cells, a constant column and a duplicate column.
+        columns = ["id", "source", "id_copy"] + [f"note_{i}" for i in range(37)]
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}" ({", ".join(columns)})')
+        conn.executemany(
+            f'INSERT INTO "{self.TABLE}" VALUES ({", ".join("?" * len(columns))})',
+            [
+                [i, "crm", i] + [f"row {i} col {j} " + "lorem ipsum dolor " * 30 for j in range(37)]
+                for i in range(50)
+            ],
+        )
+        conn.commit()
+        conn.close()
+        self.info = analyze_table(self.TABLE)
+        self.stats = column_stats(self.TABLE, self.info["schema"])
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+    def test_stats_find_redundant_columns(self):
+        self.assertEqual(self.stats["constant"], {"source": "crm"})
+        self.assertEqual(self.stats["duplicates"], {"id_copy": "id"})
+        note = next(c for c in self.stats["columns"] if c["name"] == "note_0")
+        self.assertEqual((note["non_null"], note["distinct"]), (50, 50))
+        self.assertGreater(note["avg_len"], 500)
+
+    def test_prompt_fits_budget(self):
+        raw = samples_to_markdown(self.info["samples"])
+        self.assertGreater(estimate_tokens(raw), 3000)
+
+        for budget in (3000, 1500):
+            prompt, report = build_analysis_prompt(self.TABLE, self.info, self.stats, TASKS, RULES, budget)
+            self.assertLessEqual(estimate_tokens(prompt), budget)
+            self.assertEqual(report["tokens"], estimate_tokens(prompt))
+            self.assertEqual(sorted(report["dropped"]), ["id_copy", "source"])
+            self.assertIn("source = 'crm'", prompt)
+            self.assertIn("note_36", prompt)  # every column is still named
+
+    def test_large_budget_keeps_samples(self):
+        prompt, report = build_analysis_prompt(self.TABLE, self.info, self.stats, TASKS, RULES, 100_000)
+        self.assertEqual((report["sample_rows"], report["omitted"]), (5, []))
+        self.assertIn(truncate_cell(self.info["samples"][0]["note_0"], 80), prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
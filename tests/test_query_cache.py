@@ -0,0 +1,71 @@
+import unittest
+from sqtab.cache import cached_query, normalize_sql, is_cacheable
+from sqtab.db import get_conn
+
+
+class TestQueryCache(unittest.TestCase):
+
+    TABLE = "test_cache"
+
+    def setUp(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.TABLE}" (id INTEGER, name TEXT)')
+        conn.execute(f"INSERT INTO \"{self.TABLE}\" VALUES (1, 'Ana'), (2, 'Marko')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+    def _query(self, sql):
+        conn = get_conn()
+        try:
+            return cached_query(conn, sql)[:3]
+        finally:
+            conn.close()
+
+    def test_hit_then_invalidated_by_write(self):
+        sql = f'SELECT COUNT(*) AS n FROM "{self.TABLE}"'
+
+        columns, rows, hit = self._query(sql)
+        self.assertEqual((columns, rows, hit), (["n"], [(2,)], False))
+
+        # Different whitespace, same normalized statement
+        _, rows, hit = self._query(f'SELECT  COUNT(*) AS n\n FROM "{self.TABLE}";')
+        self.assertEqual((rows, hit), ([(2,)], True))
+
+        conn = get_conn()
+        conn.execute(f"INSERT INTO \"{self.TABLE}\" VALUES (3, 'Ivana')")
+        conn.commit()
+        conn.close()
+
+        _, rows, hit = self._query(sql)
+        self.assertEqual((rows, hit), ([(3,)], False))
+
+    def test_max_rows(self):
+        sql = f'SELECT id FROM "{self.TABLE}" ORDER BY id'
+        conn = get_conn()
+        try:
+            # A cut-off result is returned but not stored.
+            self.assertEqual(cached_query(conn, sql, max_rows=1), (["id"], [(1,)], False, True))
+            self.assertEqual(cached_query(conn, sql, max_rows=1)[2], False)
+
+            cached_query(conn, sql)
+            self.assertEqual(cached_query(conn, sql, max_rows=1), (["id"], [(1,)], True, True))
+        finally:
+            conn.close()
+
+    def test_normalization_keeps_literals(self):
+        self.assertEqual(
+            normalize_sql("SELECT  *\nFROM t WHERE name = 'a   b' ;"),
+            "SELECT * FROM t WHERE name = 'a   b'",
+        )
+
+    def test_only_read_only_statements_are_cacheable(self):
+        self.assertTrue(is_cacheable("select 1"))
+        self.assertTrue(is_cacheable("WITH x AS (SELECT 1) SELECT * FROM x"))
+        self.assertFalse(is_cacheable("DELETE FROM t"))
+        self.assertFalse(is_cacheable("SELECT random()"))
@@ -0,0 +1,127 @@
+import unittest
+import os
+import signal
+import sqlite3
+import threading
+from unittest import mock
+from typer.testing import CliRunner
+from sqtab import cli
+from sqtab.cli import app
+from sqtab.guard import QueryCancelled, QueryGuard, _scan_links, _scanned_table, fetch_rows, plan_warnings
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+ENDLESS = "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r) SELECT COUNT(*) FROM r"
+
+
+class TestQueryGuard(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.executescript("""
+            CREATE TABLE a (id INTEGER PRIMARY KEY, x);
+            CREATE TABLE b (y);
+            INSERT INTO a (x) VALUES (1), (2), (3);
+        """)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_timeout_cancels_and_rolls_back(self):
+        self.conn.execute("INSERT INTO a (x) VALUES (4)")
+        with self.assertRaises(QueryCancelled) as ctx:
+            with QueryGuard(self.conn, timeout=0.2):
+                self.conn.execute(ENDLESS).fetchall()
+        self.assertTrue(ctx.exception.timed_out)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM a").fetchone(), (3,))
+
+    def test_ctrl_c_cancels(self):
+        timer = threading.Timer(0.2, lambda: os.kill(os.getpid(), signal.SIGINT))
+        timer.start()
+        with self.assertRaises(QueryCancelled) as ctx:
+            with QueryGuard(self.conn):
+                self.conn.execute(ENDLESS).fetchall()
+        timer.join()
+        self.assertFalse(ctx.exception.timed_out)
+        self.assertIs(signal.getsignal(signal.SIGINT), signal.default_int_handler)
+
+    def test_fetch_rows_limit(self):
+        cur = self.conn.execute("SELECT x FROM a ORDER BY x")
+        self.assertEqual(fetch_rows(cur, 2), ([(1,), (2,)], True))
+        cur = self.conn.execute("SELECT x FROM a ORDER BY x")
+        self.assertEqual(fetch_rows(cur, 3), ([(1,), (2,), (3,)], False))
+
+    def test_plan_warnings(self):
+        warnings, dangerous = plan_warnings(self.conn, "SELECT * FROM a, b")
+        self.assertTrue(dangerous)
+        self.assertIn("Cartesian product", warnings[0])
+
+        self.assertEqual(plan_warnings(self.conn, "SELECT * FROM a WHERE id = 2"), ([], False))
+        self.assertEqual(plan_warnings(self.conn, "SELECT * FROM a LIMIT 10"), ([], False))
+        warnings, dangerous = plan_warnings(self.conn, "SELECT * FROM a")
+        self.assertFalse(dangerous)
+        self.assertEqual(warnings, ["Full scan of 'a' without LIMIT."])
+
+    def test_joined_full_scans_are_not_a_cartesian_product(self):
+        # After ANALYZE, small tables are joined by scanning both.
+        self.conn.executescript("INSERT INTO b VALUES (1), (2); ANALYZE;")
+        sql = "SELECT * FROM a JOIN b ON a.x = b.y"
+        warnings, dangerous = plan_warnings(self.conn, sql)
+        self.assertFalse(dangerous)
+        self.assertIn("reads each table in full", warnings[0])
+        self.assertEqual(_scan_links(self.conn, sql), (True, 6))
+
+        self.assertTrue(plan_warnings(self.conn, "SELECT * FROM a, b WHERE a.x = 1 AND b.y = 2")[1])
+        with mock.patch("sqtab.guard.CARTESIAN_ROWS", 5):
+            self.assertTrue(plan_warnings(self.conn, sql)[1])
+
+    def test_scanned_table_plan_formats(self):
+        self.assertEqual(_scanned_table("SCAN a"), "a")
+        # SQLite before 3.36
+        self.assertEqual(_scanned_table("SCAN TABLE a"), "a")
+        self.assertEqual(_scanned_table("SCAN TABLE orders AS o USING INDEX ix"), "o")
+        self.assertIsNone(_scanned_table("SEARCH TABLE a USING INTEGER PRIMARY KEY (rowid=?)"))
+
+
+class TestQueryLimitsCommands(unittest.TestCase):
+
+    TABLE = "test_guard_numbers"
+
+    def setUp(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}" (n INTEGER)')
+        conn.executemany(f'INSERT INTO "{self.TABLE}" VALUES (?)', [(i,) for i in range(20)])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+    def test_sql_timeout_and_max_rows(self):
+        result = runner.invoke(app, ["sql", ENDLESS, "--timeout", "0.2"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("timed out", result.output)
+
+        result = runner.invoke(app, ["sql", f"SELECT n FROM {self.TABLE}", "--max-rows", "5"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Showing the first 5 rows", result.output)
+
+    def test_sql_ai_refuses_cartesian_product(self):
+        sql = f"SELECT * FROM {self.TABLE} AS x, {self.TABLE} AS y"
+        with mock.patch.object(cli, "is_ai_available", return_value=True), \
+                mock.patch.object(cli, "generate_sql_from_nl", return_value=sql):
+            result = runner.invoke(app, ["sql-ai", "all pairs", "--no-memory"])
+            self.assertEqual(result.exit_code, 1)
+            self.assertIn("Refusing", result.output)
+
+            result = runner.invoke(app, ["sql-ai", "all pairs", "--no-memory", "--force", "--max-rows", "3"])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("Showing the first 3 rows", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from pathlib import Path
+from unittest import mock
+from sqtab import importer
+from sqtab.importer import import_file
+from sqtab.checkpoint import clear_checkpoint, load_checkpoint
+from sqtab.db import get_conn
+
+
+class TestResumeImport(unittest.TestCase):
+
+    TABLE = "test_resume"
+    INFILE = Path("tests/out_resume.csv")
+
+    def setUp(self):
+        lines = ["id,name"] + [f"{i},name {i}" for i in range(1, 8)]
+        self.INFILE.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        cur = conn.cursor()
+        clear_checkpoint(cur, self.TABLE)
+        conn.commit()
+        conn.close()
+
+        if self.INFILE.exists():
+            self.INFILE.unlink()
+
+    def _ids(self):
+        conn = get_conn()
+        ids = [r[0] for r in conn.execute(f'SELECT id FROM "{self.TABLE}" ORDER BY id')]
+        conn.close()
+        return ids
+
+    def test_resume_after_interruption(self):
+        real_write = importer.write_rows
+        calls = []
+
+        def failing_write(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return real_write(*args, **kwargs)
+
+        with mock.patch.object(importer, "COMMIT_EVERY", 3), \
+                mock.patch.object(importer, "write_rows", failing_write):
+            with self.assertRaises(KeyboardInterrupt):
+                import_file(self.INFILE, self.TABLE)
+
+        # Two chunks were committed together with their checkpoint.
+        self.assertEqual(self._ids(), [1, 2, 3, 4, 5, 6])
+        conn = get_conn()
+        checkpoint = load_checkpoint(conn.cursor(), self.TABLE)
+        conn.close()
+        self.assertEqual(checkpoint["row_number"], 6)
+
+        # A plain re-run refuses to duplicate rows.
+        with self.assertRaises(ValueError):
+            import_file(self.INFILE, self.TABLE)
+
+        rows = import_file(self.INFILE, self.TABLE, resume=True)
+        self.assertEqual(rows, 1)
+        self.assertEqual(self._ids(), [1, 2, 3, 4, 5, 6, 7])
+
+        conn = get_conn()
+        self.assertIsNone(load_checkpoint(conn.cursor(), self.TABLE))
+        conn.close()
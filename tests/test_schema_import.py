@@ -0,0 +1,129 @@
+import unittest
+import csv
+import json
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.importer import import_file, merge_file
+from sqtab.schema import load_schema
+from sqtab.typed import COLUMNS_TABLE
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+SCHEMA = {
+    "columns": [
+        {"name": "id", "type": "integer", "nullable": False},
+        {"name": "Email", "type": "text"},
+        {"name": "signup", "type": "date"},
+        {"name": "score", "type": "real"},
+    ],
+    "primary_key": ["id"],
+}
+
+
+class TestSchemaImport(unittest.TestCase):
+
+    TABLE = "test_schema_users"
+    CSV = Path("tests/out_schema_users.csv")
+    REJECTS = Path("tests/out_schema_users.rejects.csv")
+    SCHEMA_FILE = Path("tests/out_schema.json")
+
+    def setUp(self):
+        self.SCHEMA_FILE.write_text(json.dumps(SCHEMA), encoding="utf-8")
+        # Header order differs from the schema; records are matched by name.
+        self._write([
+            ["score", "id", "email", "signup"],
+            ["1.5", "1", "a@example.com", "2024-01-02"],
+            ["7", "2", "b@example.com", "soon"],
+            ["", "", "c@example.com", "2024-01-03"],
+            ["2", "1", "d@example.com", "2024-01-04"],
+            ["", "3", "", ""],
+        ])
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.execute(f'DELETE FROM "{COLUMNS_TABLE}" WHERE table_name = ?', (self.TABLE,))
+        conn.commit()
+        conn.close()
+        for path in (self.CSV, self.REJECTS, self.SCHEMA_FILE):
+            if path.exists():
+                path.unlink()
+
+    def _write(self, rows):
+        with open(self.CSV, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+
+    def _rows(self):
+        conn = get_conn()
+        rows = conn.execute(f'SELECT * FROM "{self.TABLE}" ORDER BY id').fetchall()
+        conn.close()
+        return rows
+
+    def _rejects(self):
+        with open(self.REJECTS, encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_declared_types_and_rejects(self):
+        self.assertEqual(import_file(self.CSV, self.TABLE, schema=self.SCHEMA_FILE), 2)
+        self.assertEqual(self._rows(), [(1, "a@example.com", 1704153600, 1.5), (3, None, None, None)])
+
+        rejects = self._rejects()
+        self.assertEqual(rejects[0], ["score", "id", "email", "signup", "error"])
+        self.assertEqual([r[1] for r in rejects[1:]], ["2", "", "1"])
+        self.assertIn("not a valid date", rejects[1][-1])
+        self.assertIn("requires a value", rejects[2][-1])
+        self.assertIn("UNIQUE", rejects[3][-1])
+
+    def test_wrong_field_count_is_rejected(self):
+        self._write([
+            ["score", "id", "email", "signup"],
+            ["1.5", "1", "a@example.com", "2024-01-02"],
+            ["2", "2", "b@example.com"],
+            ["3", "3", "c@example.com", "2024-01-03", "extra"],
+        ])
+        self.assertEqual(import_file(self.CSV, self.TABLE, schema=self.SCHEMA_FILE), 1)
+
+        rejects = self._rejects()
+        self.assertEqual(rejects[1], ["2", "2", "b@example.com", "Expected 4 fields, found 3."])
+        self.assertEqual(rejects[2][:5], ["3", "3", "c@example.com", "2024-01-03", "extra"])
+        self.assertEqual(rejects[2][-1], "Expected 4 fields, found 5.")
+
+    def test_types_stay_fixed_across_loads(self):
+        import_file(self.CSV, self.TABLE, schema=SCHEMA)
+        self._write([["id", "email", "signup", "score"], ["10", "x@example.com", "2024-02-01", "3"]])
+        counts = merge_file(self.CSV, self.TABLE, key="id", schema=SCHEMA)
+        self.assertEqual(counts["inserted"], 1)
+
+        conn = get_conn()
+        score_type = conn.execute(f'SELECT typeof(score) FROM "{self.TABLE}" WHERE id = 10').fetchone()[0]
+        conn.close()
+        self.assertEqual(score_type, "real")  # "3" would infer as INTEGER
+        self.assertFalse(self.REJECTS.exists())  # stale reject file removed
+
+    def test_invalid_schemas(self):
+        with self.assertRaises(ValueError):
+            load_schema({"columns": [{"name": "a", "type": "money"}]})
+        with self.assertRaises(ValueError):
+            load_schema({"columns": [{"name": "a"}], "primary_key": ["b"]})
+        with self.assertRaises(ValueError):
+            import_file(self.CSV, self.TABLE, schema={"columns": [{"name": "id"}]})  # undeclared columns
+
+    def test_rejects_requires_schema(self):
+        with self.assertRaises(ValueError):
+            import_file(self.CSV, self.TABLE, rejects=str(self.REJECTS))
+        with self.assertRaises(ValueError):
+            import_file("tests/samples/sample.json", self.TABLE, rejects=str(self.REJECTS))
+
+    def test_import_command(self):
+        result = runner.invoke(
+            app, ["import", str(self.CSV), self.TABLE, "--schema", str(self.SCHEMA_FILE), "--no-progress"]
+        )
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("rows imported: 2", result.output)
+        self.assertIn("Rejected 3 record(s)", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
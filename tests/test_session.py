@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+import unittest
+from datetime import date
+from pathlib import Path
+
+import sqtab
+from sqtab.db import get_conn
+
+
+class TestSession(unittest.TestCase):
+
+    TABLE = "test_session"
+    OUT_CSV = Path("tests/out_session.csv")
+    OUT_JSON = Path("tests/out_session.json")
+
+    def setUp(self):
+        self.db = sqtab.Session()
+
+    def tearDown(self):
+        self.db.close()
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+        for path in (self.OUT_CSV, self.OUT_JSON):
+            if path.exists():
+                path.unlink()
+
+    def _load(self, n=5):
+        rows = ({"id": i, "Name": f"user {i}", "score": i / 2, "joined": date(2024, 1, i + 1)} for i in range(n))
+        return self.db.import_rows(rows, self.TABLE)
+
+    def test_import_creates_typed_table(self):
+        counts = self._load()
+        self.assertEqual(counts["rows"], 5)
+
+        conn = get_conn()
+        info = conn.execute(f'PRAGMA table_info("{self.TABLE}")').fetchall()
+        first = conn.execute(f'SELECT * FROM "{self.TABLE}" WHERE id = 0').fetchone()
+        conn.close()
+
+        self.assertEqual([(c[1], c[2]) for c in info],
+                         [("id", "INTEGER"), ("name", "TEXT"), ("score", "REAL"), ("joined", "TEXT")])
+        self.assertEqual(first, (0, "user 0", 0.0, "2024-01-01"))
+        self.assertIn(self.TABLE, self.db.tables())
+
+    def test_import_sequences_with_key(self):
+        self.db.import_rows([(1, "a"), (2, "b")], self.TABLE, columns=["id", "name"])
+        counts = self.db.import_rows([(2, "B"), (3, "c")], self.TABLE, columns=["id", "name"], key="id")
+
+        self.assertEqual(counts["inserted"], 1)
+        self.assertEqual(counts["updated"], 1)
+        self.assertEqual(list(self.db.query(f'SELECT name FROM "{self.TABLE}" ORDER BY id')),
+                         [("a",), ("B",), ("c",)])
+
+    def test_append_matches_columns_by_name(self):
+        self._load(2)
+        self.db.import_rows([{"joined": "2024-02-01", "score": 9.5, "name": "late", "id": 7}], self.TABLE)
+        self.db.import_rows([{"name": "partial", "id": 8}], self.TABLE)
+
+        rows = list(self.db.query(f'SELECT * FROM "{self.TABLE}" WHERE id > 1 ORDER BY id'))
+        self.assertEqual(rows, [(7, "late", 9.5, "2024-02-01"), (8, "partial", None, None)])
+
+    def test_import_sequences_need_columns(self):
+        with self.assertRaises(ValueError):
+            self.db.import_rows([(1, "a")], self.TABLE)
+
+    def test_import_rejects_unknown_columns(self):
+        self._load()
+        with self.assertRaises(ValueError):
+            self.db.import_rows([{"id": 9, "other": "x"}], self.TABLE)
+
+    def test_query_kinds(self):
+        self._load(5)
+        sql = f'SELECT id, name FROM "{self.TABLE}" WHERE id < ? ORDER BY id'
+
+        self.assertEqual(next(self.db.query(sql, (3,))), (0, "user 0"))
+        self.assertEqual(list(self.db.query(sql, (2,), kind="dicts")),
+                         [{"id": 0, "name": "user 0"}, {"id": 1, "name": "user 1"}])
+        batches = list(self.db.query(sql, (5,), kind="batches", batch_size=2))
+        self.assertEqual([len(b) for b in batches], [2, 2, 1])
+
+        with self.assertRaises(ValueError):
+            self.db.query(sql, kind="frames")
+
+    def test_export_to_paths(self):
+        self._load(3)
+        sql = f'SELECT id, name FROM "{self.TABLE}" ORDER BY id'
+
+        self.assertEqual(self.db.export(sql, self.OUT_CSV), 3)
+        self.assertEqual(self.OUT_CSV.read_text(encoding="utf-8").splitlines()[:2], ["id,name", "0,user 0"])
+
+        self.db.export(sql, str(self.OUT_JSON))
+        self.assertEqual(json.loads(self.OUT_JSON.read_text(encoding="utf-8"))[2], {"id": 2, "name": "user 2"})
+
+    def test_export_to_writer(self):
+        self._load(2)
+        buffer = io.StringIO()
+        count = self.db.export(f'SELECT id FROM "{self.TABLE}" ORDER BY id', csv.writer(buffer))
+
+        self.assertEqual(count, 2)
+        self.assertEqual(buffer.getvalue().split(), ["id", "0", "1"])
+
+    def test_profile(self):
+        self._load(4)
+        stats = self.db.profile(self.TABLE)
+
+        self.assertEqual(stats["row_count"], 4)
+        score = next(c for c in stats["columns"] if c["name"] == "score")
+        self.assertEqual((score["type"], score["min"], score["max"]), ("REAL", 0.0, 1.5))
+
+        with self.assertRaises(ValueError):
+            self.db.profile("no_such_table")
+
+
+if __name__ == "__main__":
+    unittest.main()
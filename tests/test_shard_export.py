@@ -0,0 +1,77 @@
+import unittest
+import csv
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typer.testing import CliRunner
+from sqtab.cli import app
+from sqtab.exporter import export_shards
+from sqtab.db import get_conn
+
+runner = CliRunner()
+
+
+class TestShardedExport(unittest.TestCase):
+
+    TABLE = "test_shard_export"
+    OUTDIR = Path("tests/out_shards")
+
+    def setUp(self):
+        conn = get_conn()
+        conn.execute(f'CREATE TABLE "{self.TABLE}" (id INTEGER, name TEXT)')
+        conn.executemany(
+            f'INSERT INTO "{self.TABLE}" VALUES (?, ?)', [(i, f"name {i}") for i in range(1, 1001)]
+        )
+        # leave gaps in the rowids
+        conn.execute(f'DELETE FROM "{self.TABLE}" WHERE id BETWEEN 100 AND 400')
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.commit()
+        conn.close()
+
+        shutil.rmtree(self.OUTDIR, ignore_errors=True)
+
+    def test_shards_cover_table_once(self):
+        manifest = export_shards(self.TABLE, self.OUTDIR, 3)
+
+        self.assertEqual(manifest["rows"], 699)
+        self.assertEqual(len(manifest["shards"]), 3)
+
+        ids = []
+        for part in manifest["shards"]:
+            path = self.OUTDIR / part["file"]
+            self.assertEqual(hashlib.sha256(path.read_bytes()).hexdigest(), part["sha256"])
+            with open(path, encoding="utf-8") as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0], ["id", "name"])
+            self.assertEqual(len(rows) - 1, part["rows"])
+            ids.extend(int(r[0]) for r in rows[1:])
+
+        self.assertEqual(ids, [i for i in range(1, 1001) if not 100 <= i <= 400])
+
+        with open(self.OUTDIR / "manifest.json", encoding="utf-8") as f:
+            self.assertEqual(json.load(f), manifest)
+
+    def test_more_shards_than_rows(self):
+        conn = get_conn()
+        conn.execute(f'DELETE FROM "{self.TABLE}" WHERE id > 2')
+        conn.commit()
+        conn.close()
+
+        manifest = export_shards(self.TABLE, self.OUTDIR, 4, fmt="json")
+        self.assertEqual([p["rows"] for p in manifest["shards"]], [1, 1])
+
+    def test_export_command_with_shards(self):
+        result = runner.invoke(app, ["export", self.TABLE, str(self.OUTDIR), "--shards", "2", "--no-progress"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue((self.OUTDIR / "part-00001.csv").exists())
+        self.assertIn("699 rows to 2 shards", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
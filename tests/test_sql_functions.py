@@ -0,0 +1,79 @@
+import statistics
+import unittest
+
+from typer.testing import CliRunner
+
+from sqtab.cli import app
+from sqtab.db import get_conn
+from sqtab.functions import EXACT_DISTINCT_LIMIT
+
+runner = CliRunner()
+
+
+class TestSQLFunctions(unittest.TestCase):
+
+    TABLE = "test_sql_functions"
+    VALUES = [3, 1, 4, 1, 5, 9, 2, 6]
+
+    def setUp(self):
+        self.conn = get_conn()
+        self.conn.execute(f'CREATE TABLE "{self.TABLE}" (x, name TEXT)')
+        self.conn.executemany(
+            f'INSERT INTO "{self.TABLE}" VALUES (?, ?)',
+            [(v, f"item-{v}") for v in self.VALUES] + [(None, None), ("n/a", "other")],
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        self.conn.commit()
+        self.conn.close()
+
+    def _one(self, expr):
+        return self.conn.execute(f'SELECT {expr} FROM "{self.TABLE}"').fetchone()[0]
+
+    def test_median_and_percentile(self):
+        self.assertEqual(self._one("median(x)"), statistics.median(self.VALUES))
+        self.assertEqual(self._one("percentile(x, 0)"), 1)
+        self.assertEqual(self._one("percentile(x, 100)"), 9)
+        self.assertAlmostEqual(self._one("percentile(x, 25)"), 1.75)
+
+    def test_percentile_rejects_out_of_range(self):
+        with self.assertRaises(Exception):
+            self._one("percentile(x, 101)")
+
+    def test_stddev_and_variance(self):
+        self.assertAlmostEqual(self._one("stddev(x)"), statistics.stdev(self.VALUES))
+        self.assertAlmostEqual(self._one("variance(x)"), statistics.variance(self.VALUES))
+
+    def test_mode(self):
+        self.assertEqual(self._one("mode(x)"), 1)
+
+    def test_empty_input_is_null(self):
+        row = self.conn.execute(
+            f'SELECT median(x), stddev(x), mode(x), approx_count_distinct(x) FROM "{self.TABLE}" WHERE 0'
+        ).fetchone()
+        self.assertEqual(row, (None, None, None, None))
+
+    def test_regexp(self):
+        self.assertEqual(self._one("SUM(name REGEXP '^item-[0-4]$')"), 5)
+        self.assertIsNone(self.conn.execute("SELECT NULL REGEXP 'a'").fetchone()[0])
+
+    def test_approx_count_distinct(self):
+        self.assertEqual(self._one("approx_count_distinct(x)"), len(set(self.VALUES)) + 1)
+
+        n = EXACT_DISTINCT_LIMIT * 5
+        estimate = self.conn.execute(
+            "WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < ?) "
+            "SELECT approx_count_distinct(i) FROM s", (n,)
+        ).fetchone()[0]
+        self.assertLess(abs(estimate - n) / n, 0.05)
+
+    def test_available_in_sql_command(self):
+        result = runner.invoke(app, ["sql", f'SELECT median(x) AS m FROM "{self.TABLE}"'])
+        self.assertEqual(result.exit_code, 0, result.stdout)
+        self.assertIn("3.5", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
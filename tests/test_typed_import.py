@@ -0,0 +1,128 @@
+import unittest
+import sqlite3
+from pathlib import Path
+from unittest import mock
+from sqtab import csv_parallel
+from sqtab.importer import import_file
+from sqtab.typed import COLUMNS_TABLE, column_kinds, convert, detect_kind, merge_kinds, require_strict
+from sqtab.db import get_conn
+
+
+class TestKindDetection(unittest.TestCase):
+
+    def test_detect_kind(self):
+        self.assertEqual(detect_kind("42"), "integer")
+        self.assertEqual(detect_kind("4.2"), "real")
+        self.assertEqual(detect_kind("TRUE"), "boolean")
+        self.assertEqual(detect_kind("2024-02-29"), "date")
+        self.assertEqual(detect_kind("31.12.2024."), "date")
+        self.assertEqual(detect_kind("2024-02-29T10:30:00Z"), "timestamp")
+        self.assertEqual(detect_kind("2024-02-30"), "text")
+        self.assertIsNone(detect_kind(" "))
+
+    def test_merge_kinds(self):
+        self.assertEqual(merge_kinds("integer", "real"), "real")
+        self.assertEqual(merge_kinds("date", "timestamp"), "timestamp")
+        self.assertEqual(merge_kinds("boolean", "integer"), "text")
+        self.assertEqual(merge_kinds(None, "date"), "date")
+
+    def test_convert(self):
+        self.assertEqual(convert("boolean", "False"), 0)
+        self.assertEqual(convert("date", "1970-01-02"), 86400)
+        self.assertEqual(convert("timestamp", "1970-01-01 01:00:00+01:00"), 0)
+        self.assertEqual(convert("timestamp", "1970-01-02"), 86400)
+        with self.assertRaises(ValueError):
+            convert("date", "yesterday")
+
+    def test_timestamp_offsets(self):
+        # Z and +HHMM are normalized, so Python 3.10 parses them too.
+        self.assertEqual(convert("timestamp", "1970-01-01T01:00Z"), 3600)
+        self.assertEqual(convert("timestamp", "1970-01-01T02:00+0100"), 3600)
+        self.assertEqual(convert("timestamp", "1970-01-01T00:00-01:00"), 3600)
+
+    def test_old_sqlite_is_rejected(self):
+        with mock.patch.object(sqlite3, "sqlite_version_info", (3, 31, 1)):
+            with self.assertRaisesRegex(ValueError, "SQLite 3.37"):
+                require_strict()
+            with self.assertRaisesRegex(ValueError, "SQLite 3.37"):
+                import_file(Path("tests/samples/sample.csv"), "test_typed_old_sqlite", typed=True)
+
+
+class TestTypedImport(unittest.TestCase):
+
+    TABLE = "test_typed_import"
+    CSV = Path("tests/out_typed.csv")
+    MORE = Path("tests/out_typed_more.csv")
+
+    def setUp(self):
+        self.CSV.write_text(
+            "id,active,joined,last_seen,score,note\n"
+            "1,true,2024-01-15,2024-01-15T08:00:00Z,1.5,x\n"
+            "2,false,15.01.2024.,2024-01-16 09:30,2,\n"
+            "3,,,2024-01-17,,y\n",
+            encoding="utf-8",
+        )
+
+    def tearDown(self):
+        conn = get_conn()
+        conn.execute(f'DROP TABLE IF EXISTS "{self.TABLE}"')
+        conn.execute(f'DELETE FROM "{COLUMNS_TABLE}" WHERE table_name = ?', (self.TABLE,))
+        conn.commit()
+        conn.close()
+
+        for path in (self.CSV, self.MORE):
+            if path.exists():
+                path.unlink()
+
+    def _rows(self):
+        conn = get_conn()
+        rows = conn.execute(f'SELECT * FROM "{self.TABLE}" ORDER BY id').fetchall()
+        conn.close()
+        return rows
+
+    def test_typed_import_creates_strict_table(self):
+        self.assertEqual(import_file(self.CSV, self.TABLE, typed=True), 3)
+
+        self.assertEqual(column_kinds(self.TABLE), {
+            "id": "integer", "active": "boolean", "joined": "date",
+            "last_seen": "timestamp", "score": "real", "note": "text",
+        })
+        self.assertEqual(self._rows(), [
+            (1, 1, 1705276800, 1705305600, 1.5, "x"),
+            (2, 0, 1705276800, 1705397400, 2.0, None),
+            (3, None, None, 1705449600, None, "y"),
+        ])
+
+        conn = get_conn()
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (self.TABLE,)).fetchone()[0]
+        with self.assertRaises(sqlite3.IntegrityError):
+            conn.execute(f'INSERT INTO "{self.TABLE}" (id, active) VALUES (4, \'maybe\')')
+        conn.close()
+        self.assertTrue(sql.rstrip().endswith("STRICT"))
+
+    def test_append_uses_recorded_kinds(self):
+        import_file(self.CSV, self.TABLE, typed=True)
+
+        self.MORE.write_text("id,active,joined,last_seen,score,note\n4,TRUE,2024/02/01,,3,z\n", encoding="utf-8")
+        import_file(self.MORE, self.TABLE)
+        self.assertEqual(self._rows()[-1], (4, 1, 1706745600, None, 3.0, "z"))
+
+        self.MORE.write_text("id,active,joined,last_seen,score,note\n5,yes,,,,\n", encoding="utf-8")
+        with self.assertRaises(ValueError) as ctx:
+            import_file(self.MORE, self.TABLE)
+        self.assertIn("'active'", str(ctx.exception))
+
+    def test_parallel_matches_serial(self):
+        original = csv_parallel.CHUNK_BYTES
+        csv_parallel.CHUNK_BYTES = 64
+        try:
+            import_file(self.CSV, self.TABLE, typed=True, workers=2)
+        finally:
+            csv_parallel.CHUNK_BYTES = original
+
+        self.assertEqual(column_kinds(self.TABLE)["last_seen"], "timestamp")
+        self.assertEqual([r[3] for r in self._rows()], [1705305600, 1705397400, 1705449600])
+
+
+if __name__ == "__main__":
+    unittest.main()